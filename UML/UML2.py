@@ -1,76 +1,62 @@
 # generate_uml.py
-import subprocess
-import os
+import plantuml_batch
+import scene
 
-def generate_use_case_diagram():
-    # PlantUML 代码
-    plantuml_code = """@startuml
-left to right direction
-
-skinparam ActorBorderColor black
-skinparam UseCaseBorderColor black
-skinparam RectangleBorderColor orange
-skinparam ArrowColor #757575
-
-actor Player #4CAF50
-actor "Contract Owner" as Owner #4CAF50
-
-rectangle "Minority Wins Game System" #FF9800 {
-  usecase "Connect Wallet" as UC1 #2196F3
-  usecase "Start Game" as UC2 #2196F3
-  usecase "Commit Bet" as UC3 #2196F3
-  usecase "Reveal Choice" as UC4 #2196F3
-  usecase "Finalize Game" as UC5 #2196F3
-  usecase "Claim Reward" as UC6 #2196F3
-  usecase "Get Game Info" as UC7 #2196F3
-  usecase "Calculate Reward" as UC8 #2196F3
-  usecase "Check Participants" as UC9 #2196F3
-}
+def generate_use_case_diagram(render=True):
+    """写出 use_case_diagram.puml, render 为 True 时立即渲染; 返回 .puml 路径"""
+    # 用例图的内容只在 scene.py 里定义一次, 这里只负责写成 PlantUML 文本
+    scene.write_plantuml(scene.USE_CASE_SCENE, 'use_case_diagram.puml')
+    
+    print("✅ PlantUML 文件已创建: use_case_diagram.puml")
 
-Player --> UC1
-Player --> UC3
-Player --> UC4
-Player --> UC6
-Player --> UC7
-Player --> UC8
-Player --> UC9
+    if render:
+        render_puml_files(['use_case_diagram.puml'])
+    return 'use_case_diagram.puml'
 
-Owner --> UC2
-Owner --> UC5
-Owner --> UC7
 
-UC3 ..> UC4 : <<extend>>
-UC4 ..> UC5 : <<extend>>
-UC5 ..> UC6 : <<extend>>
-@enduml
-"""
-    
-    # 写入文件
-    with open('use_case_diagram.puml', 'w') as f:
-        f.write(plantuml_code)
-    
-    print("✅ PlantUML 文件已创建: use_case_diagram.puml")
-    
-    # 尝试使用 plantuml 命令
+def render_puml_files(paths):
+    """用常驻的 plantuml 进程批量渲染 .puml 文件 (见 plantuml_batch.py), 所有文件只启动一次 JVM"""
     try:
-        result = subprocess.run(['plantuml', 'use_case_diagram.puml'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✅ 用例图已生成: use_case_diagram.png")
-        else:
-            print("❌ PlantUML 命令执行失败")
-            print("错误信息:", result.stderr)
-            suggest_alternative_methods()
+        results = plantuml_batch.render_files(paths)
     except FileNotFoundError:
-        print("❌ 未找到 plantuml 命令")
+        print("❌ 未找到 plantuml 命令, 改用内置的 Python 渲染器 (puml.py)")
+        return render_puml_files_builtin(paths)
+    ok = True
+    for path, outputs, elapsed, error in results:
+        if error:
+            ok = False
+            print(f"❌ PlantUML 渲染失败: {path}")
+            print("错误信息:", error)
+        else:
+            print(f"✅ 图片已生成: {', '.join(outputs)} ({elapsed:.2f}s)")
+    if not ok:
+        suggest_alternative_methods()
+    return ok
+
+def render_puml_files_builtin(paths):
+    """不用 Java, 用 puml.py 在进程内解析 .puml 并用 matplotlib 渲染"""
+    import puml
+
+    ok = True
+    for path in paths:
+        try:
+            outputs = puml.render_file(path)
+        except (OSError, ValueError) as e:
+            ok = False
+            print(f"❌ 渲染失败: {path}")
+            print("错误信息:", e)
+        else:
+            print(f"✅ 图片已生成: {', '.join(outputs)}")
+    if not ok:
         suggest_alternative_methods()
+    return ok
 
 def suggest_alternative_methods():
     print("\n🔧 替代方案:")
     print("1. 使用在线 PlantUML 工具: http://www.plantuml.com/plantuml/")
     print("2. 安装 Graphviz: brew install graphviz (Mac) 或 apt-get install graphviz (Linux)")
     print("3. 使用 Docker: docker run -v $(pwd):/data plantuml/plantuml use_case_diagram.puml")
-    print("4. 使用我之前提供的 matplotlib 代码生成图片")
+    print("4. 使用内置的 matplotlib 渲染器: python puml.py use_case_diagram.puml")
 
 def generate_enhanced_use_case_diagram():
     """生成包含改进功能的增强版用例图"""
@@ -149,10 +135,12 @@ endlegend
         f.write(plantuml_code)
     
     print("✅ 增强版用例图文件已创建: enhanced_use_case_diagram.puml")
+    return 'enhanced_use_case_diagram.puml'
 
 if __name__ == "__main__":
-    generate_use_case_diagram()
-    generate_enhanced_use_case_diagram()
+    # 先写出所有 .puml, 再一起渲染
+    sources = [generate_use_case_diagram(render=False), generate_enhanced_use_case_diagram()]
+    render_puml_files(sources)
     
     print("\n📋 下一步:")
     print("如果 plantuml 命令不可用，请复制 .puml 文件内容到: http://www.plantuml.com/plantuml/")
\ No newline at end of file
@@ -9,6 +9,9 @@ pip install matplotlib pillow
 python diagrams.py
 """
 
+import fonts
+import render_cache
+
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.patches import FancyBboxPatch, FancyArrowPatch, Circle, Rectangle
@@ -18,6 +21,7 @@ import matplotlib.patches as mpatches
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
+fonts.apply(plt.rcParams)
 
 # ============= 用例图 (Use Case Diagram) =============
 def draw_use_case_diagram():
@@ -759,5 +763,8 @@ def draw_wireframes():
 
 
 if __name__ == "__main__":
-    draw_use_case_diagram()
-    draw_wireframes()
\ No newline at end of file
+    # 输入没有变化时直接使用渲染缓存里的图片
+    for draw, output in [(draw_use_case_diagram, 'use_case_diagram.png'),
+                         (draw_wireframes, 'wireframes.png')]:
+        if render_cache.cached_render(draw, __file__, draw.__name__, [output]):
+            print(f"⚡ '{output}' is up to date (render cache hit)")
\ No newline at end of file
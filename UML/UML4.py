@@ -1,668 +1,654 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, FancyArrowPatch, Circle, Rectangle
-from matplotlib.lines import Line2D
-import matplotlib.patches as mpatches
+import argparse
+import gc
+import os
+import sys
+import time
+
+import diagram_spec
+import profiling
+import render_cache
+
+# matplotlib / numpy / PIL 在第一次绘图时才导入 (见 _import_matplotlib),
+# 只查询注册表或命中渲染缓存的运行不需要付出导入的开销
+np = Image = mpimg = plt = FancyBboxPatch = Rectangle = batching = icons = tiled = None
 
 # 设置中文字体
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+RC_PARAMS = {
+    'font.sans-serif': ['Arial Unicode MS', 'SimHei', 'DejaVu Sans'],
+    'axes.unicode_minus': False,
+}
+
+BATCHING_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'batching.py')
+FONTS_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts.py')
+ICONS_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icons.py')
+ROUTING_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'routing.py')
+TILED_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tiled.py')
+
+# 设置后按这么多像素行一条分块光栅化 PNG (见 tiled.py); 用环境变量传递,
+# 进程池里的工作进程也能看到
+TILE_ROWS_ENV = 'UML_TILE_ROWS'
+
+
+def tile_rows(output=None):
+    """分块光栅化的条带高度; 未启用或输出不是 PNG 时返回 None"""
+    value = os.environ.get(TILE_ROWS_ENV)
+    if not value or int(value) <= 0:
+        return None
+    if output is not None and not output.lower().endswith('.png'):
+        return None
+    return int(value)
+
+
+def _import_matplotlib():
+    """导入绘图用到的模块; 没有人先导入 pyplot 时强制使用非交互的 Agg 后端"""
+    global np, Image, mpimg, plt, FancyBboxPatch, Rectangle, batching, icons, tiled
+    if plt is not None:
+        return
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use('Agg')
+    import numpy as np
+    from PIL import Image
+    import matplotlib.image as mpimg
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import FancyBboxPatch, Rectangle
+    import batching
+    import fonts
+    import icons
+    import tiled
+    plt.rcParams.update(RC_PARAMS)
+    # 字体预检: 只使用已安装且确实用得到的字体 (结果缓存在磁盘上, 见 fonts.py)
+    fonts.apply(plt.rcParams)
+
+
+def warm_up():
+    """导入 matplotlib, 并画一次中英文文字, 让字体文件提前加载 (常驻进程启动时调用)"""
+    _import_matplotlib()
+    fig = plt.figure(figsize=(1, 1), dpi=72)
+    fig.text(0.5, 0.5, 'Minority 少数派', weight='bold')
+    fig.text(0.5, 0.2, 'Minority 少数派')
+    fig.canvas.draw()
+    plt.close(fig)
+
 
 # ============= 用例图 (Use Case Diagram) =============
-def draw_use_case_diagram():
-    fig, ax = plt.subplots(figsize=(16, 12))
-    ax.set_xlim(0, 16)
-    ax.set_ylim(0, 12)
-    ax.axis('off')
-    
-    # 标题
-    ax.text(8, 11.5, 'Minority Wins Game - Use Case Diagram', 
-            fontsize=20, weight='bold', ha='center')
-    ax.text(8, 11, '少数派获胜游戏 - 用例图', 
-            fontsize=16, ha='center', color='gray')
-    
-    # 系统边界
-    system_box = FancyBboxPatch((3, 1), 10, 9, 
-                                boxstyle="round,pad=0.1", 
-                                edgecolor='#2196F3', 
-                                facecolor='#E3F2FD', 
-                                linewidth=3)
-    ax.add_patch(system_box)
-    ax.text(8, 9.5, 'Minority Wins Smart Contract', 
-            fontsize=14, weight='bold', ha='center')
-    
-    # Actor 1: Player (玩家)
-    player_circle = Circle((1.5, 6), 0.3, color='#FF9800', zorder=10)
-    ax.add_patch(player_circle)
-    ax.plot([1.5, 1.5], [5.7, 4.8], 'k-', linewidth=2)
-    ax.plot([1.2, 1.8], [5.2, 5.2], 'k-', linewidth=2)
-    ax.plot([1.5, 1.2], [4.8, 4.2], 'k-', linewidth=2)
-    ax.plot([1.5, 1.8], [4.8, 4.2], 'k-', linewidth=2)
-    ax.text(1.5, 3.8, 'Player\n玩家', fontsize=11, ha='center', weight='bold')
-    
-    # Actor 2: Owner (合约所有者)
-    owner_circle = Circle((14.5, 8), 0.3, color='#4CAF50', zorder=10)
-    ax.add_patch(owner_circle)
-    ax.plot([14.5, 14.5], [7.7, 6.8], 'k-', linewidth=2)
-    ax.plot([14.2, 14.8], [7.2, 7.2], 'k-', linewidth=2)
-    ax.plot([14.5, 14.2], [6.8, 6.2], 'k-', linewidth=2)
-    ax.plot([14.5, 14.8], [6.8, 6.2], 'k-', linewidth=2)
-    ax.text(14.5, 5.8, 'Owner\n所有者', fontsize=11, ha='center', weight='bold')
-    
-    # Use Cases - Player Actions
-    use_cases_player = [
-        (5.5, 8, 'Connect Wallet\n连接钱包'),
-        (5.5, 7, 'View Game Info\n查看游戏信息'),
-        (5.5, 6, 'Submit Commit\n提交承诺'),
-        (5.5, 5, 'Submit Reveal\n揭示选择'),
-        (5.5, 4, 'Claim Reward\n领取奖励'),
-        (5.5, 3, 'Check History\n查看历史'),
-    ]
-    
-    # Use Cases - Owner Actions
-    use_cases_owner = [
-        (10.5, 8, 'Start New Game\n开始新游戏'),
-        (10.5, 7, 'Finalize Game\n结算游戏'),
-    ]
-    
-    # Use Cases - System Actions
-    use_cases_system = [
-        (8, 2.5, 'Verify Commit Hash\n验证承诺哈希'),
-        (10.5, 5.5, 'Calculate Deposit\n计算押金'),
-        (10.5, 4.5, 'Determine Winner\n判定赢家'),
-        (10.5, 3.5, 'Distribute Rewards\n分配奖励'),
-    ]
-    
-    player_ellipses = []
-    # Draw Player Use Cases
-    for x, y, label in use_cases_player:
-        ellipse = patches.Ellipse((x, y), 1.6, 0.6, 
-                                 facecolor='#FFF9C4', 
-                                 edgecolor='#F57C00', 
-                                 linewidth=2)
-        ax.add_patch(ellipse)
-        player_ellipses.append((x, y))
-        lines = label.split('\n')
-        ax.text(x, y+0.1, lines[0], fontsize=9, ha='center', weight='bold')
-        ax.text(x, y-0.15, lines[1], fontsize=8, ha='center', color='gray')
-    
-    owner_ellipses = []
-    # Draw Owner Use Cases
-    for x, y, label in use_cases_owner:
-        ellipse = patches.Ellipse((x, y), 1.6, 0.6, 
-                                 facecolor='#C8E6C9', 
-                                 edgecolor='#2E7D32', 
-                                 linewidth=2)
-        ax.add_patch(ellipse)
-        owner_ellipses.append((x, y))
-        lines = label.split('\n')
-        ax.text(x, y+0.1, lines[0], fontsize=9, ha='center', weight='bold')
-        ax.text(x, y-0.15, lines[1], fontsize=8, ha='center', color='gray')
-    
-    system_ellipses = []
-    # Draw System Use Cases
-    for x, y, label in use_cases_system:
-        ellipse = patches.Ellipse((x, y), 1.6, 0.6, 
-                                 facecolor='#E1BEE7', 
-                                 edgecolor='#6A1B9A', 
-                                 linewidth=2)
-        ax.add_patch(ellipse)
-        system_ellipses.append((x, y))
-        lines = label.split('\n')
-        ax.text(x, y+0.1, lines[0], fontsize=9, ha='center', weight='bold')
-        ax.text(x, y-0.15, lines[1], fontsize=8, ha='center', color='gray')
-    
-    # Draw connections from Player to Use Cases
-    for x, y in player_ellipses:
-        ax.plot([1.5, x-0.8], [6, y], 'k-', linewidth=1.5, alpha=0.6)
-    
-    # Draw connections from Owner to Use Cases
-    for x, y in owner_ellipses:
-        ax.plot([14.5, x+0.8], [8, y], 'k-', linewidth=1.5, alpha=0.6)
-    
-    # Draw <<include>> relationships
-    # Submit Commit includes Calculate Deposit
-    arrow1 = FancyArrowPatch((5.5, 5.7), (10, 5.5),
-                            arrowstyle='->', mutation_scale=20,
-                            linestyle='--', color='#9C27B0', linewidth=1.5)
-    ax.add_patch(arrow1)
-    ax.text(7.5, 5.8, '<<include>>', fontsize=8, style='italic', color='#9C27B0')
-    
-    # Submit Reveal includes Verify Commit Hash
-    arrow2 = FancyArrowPatch((5.8, 4.7), (7.5, 2.8),
-                            arrowstyle='->', mutation_scale=20,
-                            linestyle='--', color='#9C27B0', linewidth=1.5)
-    ax.add_patch(arrow2)
-    ax.text(6.5, 3.5, '<<include>>', fontsize=8, style='italic', color='#9C27B0')
-    
-    # Finalize Game includes Determine Winner
-    arrow3 = FancyArrowPatch((10.5, 6.7), (10.5, 5.8),
-                            arrowstyle='->', mutation_scale=20,
-                            linestyle='--', color='#9C27B0', linewidth=1.5)
-    ax.add_patch(arrow3)
-    ax.text(11, 6.2, '<<include>>', fontsize=8, style='italic', color='#9C27B0')
-    
-    # Claim Reward includes Distribute Rewards
-    arrow4 = FancyArrowPatch((6.3, 3.8), (9.7, 3.6),
-                            arrowstyle='->', mutation_scale=20,
-                            linestyle='--', color='#9C27B0', linewidth=1.5)
-    ax.add_patch(arrow4)
-    ax.text(8, 4, '<<include>>', fontsize=8, style='italic', color='#9C27B0')
-    
-    # Legend
-    legend_elements = [
-        Line2D([0], [0], color='#FF9800', linewidth=3, label='Player Actions'),
-        Line2D([0], [0], color='#4CAF50', linewidth=3, label='Owner Actions'),
-        Line2D([0], [0], color='#6A1B9A', linewidth=3, label='System Actions'),
-        Line2D([0], [0], color='#9C27B0', linewidth=2, linestyle='--', label='Include Relationship')
-    ]
-    ax.legend(handles=legend_elements, loc='upper right', fontsize=9)
-    
-    plt.tight_layout()
-    plt.savefig('use_case_diagram.png', dpi=300, bbox_inches='tight', facecolor='white')
-    print("✓ Use Case Diagram saved as 'use_case_diagram.png'")
-    plt.close()
+def _save_figure(name, fig, ax, output, dpi):
+    """布局、合并图元并保存, 每一步单独计时"""
+    with profiling.phase(name, 'tight_layout', fig):
+        fig.tight_layout()
+    # 布局确定之后再合并图元
+    with profiling.phase(name, 'batch', fig):
+        batching.batch_artists(ax)
+    with profiling.phase(name, 'savefig', fig):
+        band_rows = tile_rows(output)
+        if band_rows:
+            tiled.save_tiled(fig, output, dpi, band_rows, facecolor='white')
+        else:
+            fig.savefig(output, dpi=dpi, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+
+
+# 用例图、流程图和架构图的坐标与文字都在 specs/*.json 里, 这里只负责渲染
+def draw_use_case_diagram(output='use_case_diagram.png', dpi=300):
+    _import_matplotlib()
+    with profiling.phase('use_case', 'build'):
+        fig, ax = diagram_spec.build_figure(diagram_spec.load_plan(diagram_spec.spec_path('use_case')))
+    _save_figure('use_case', fig, ax, output, dpi)
+    print(f"✓ Use Case Diagram saved as '{output}'")
 
 
 # ============= 原型图 (Wireframe) =============
-def draw_wireframes():
-    fig = plt.figure(figsize=(20, 24))
-    
-    # ===== Screen 1: Commit Phase =====
-    ax1 = plt.subplot(3, 2, 1)
-    ax1.set_xlim(0, 10)
-    ax1.set_ylim(0, 16)
-    ax1.axis('off')
+# 界面上随对局和玩家变化的文字 (局号、人数、剩余时间、下注、押金、奖励……),
+# 模板里的 {字段} 从这里取值; 批量生成个性化界面时只替换这些文字, 见 personalize.py
+_ROUND_DATA = {
+    'game': '42', 'next_game': '43', 'next_in': '05:32',
+    'winner': 'Option A', 'banner': 'OPTION A', 'winner_players': '45', 'winner_stake': '67.5',
+    'loser': 'Option B', 'loser_players': '111', 'loser_stake': '166.5',
+    'winner_icon': '🅰️', 'loser_icon': '🅱️',
+}
+WIREFRAME_DATA = {
+    'commit': dict(game='42', time_left='45:23', participants='156', bet='1.5', deposit='0.75', deposit_pct='50%'),
+    'reveal': dict(time_left='15:47', choice='Option A', bet='1.5', deposit='0.75',
+                   revealed='89', participants='156', a_reveals='45', b_reveals='44', progress='57%'),
+    'results': dict(_ROUND_DATA, bet='1.5', deposit='0.75', share='3.7', reward='5.95', roi='+296.7%'),
+    # 结果文件确定不了输家是否揭示时, personalize 把押金说明换成有条件的说法
+    'lost': dict(_ROUND_DATA, choice='Option B', bet='2.0', deposit='1.0', net='-1.0',
+                 deposit_label='Deposit Returned', deposit_note='Your deposit is returned because',
+                 deposit_reason='you successfully revealed your choice.'),
+    'failed_reveal': dict(_ROUND_DATA, commit='0x7a4f...b39e', deposit='0.75'),
+}
+# 除了文字还会改变图形的字段 (揭示进度条的长度); personalize 按这些字段的值分别建模板
+WIREFRAME_LAYOUT_FIELDS = {'reveal': ('progress',)}
+
+
+def option_icon(index):
+    """第 index 个选项的图标: 🅰️ 🅱️ 🅲 🅳 ..."""
+    return ('🅰️', '🅱️')[index] if index < 2 else chr(0x1F170 + index)
+
+
+def _data_text(ax, slots, data, x, y, template, **kwargs):
+    """画一段带数据字段的文字, 并把 (Text, 模板) 记进 slots 供之后替换"""
+    text = ax.text(x, y, template.format_map(data), **kwargs)
+    slots.append((text, template))
+    return text
+
+
+def _draw_commit_screen(ax, data=None):
+    """Screen 1: Commit Phase"""
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 16)
+    ax.axis('off')
+    data = data or WIREFRAME_DATA['commit']
+    slots = []
     
     # Header
     header = Rectangle((0, 15), 10, 1, facecolor='#1976D2', edgecolor='black', linewidth=2)
-    ax1.add_patch(header)
-    ax1.text(0.5, 15.5, '☰', fontsize=24, color='white', va='center')
-    ax1.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
-             color='white', ha='center', va='center')
-    ax1.text(9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
+    ax.add_patch(header)
+    icons.add_glyph(ax, 0.5, 15.5, '☰', fontsize=24, color='white', va='center')
+    ax.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
+            color='white', ha='center', va='center')
+    icons.add_glyph(ax, 9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
     
     # Title
-    ax1.text(5, 14, 'Commit Phase - 提交阶段', fontsize=16, weight='bold', ha='center')
+    ax.text(5, 14, 'Commit Phase - 提交阶段', fontsize=16, weight='bold', ha='center')
     
     # Timer Box
     timer_box = FancyBboxPatch((2, 12.5), 6, 1, boxstyle="round,pad=0.1",
                                facecolor='#FFF3E0', edgecolor='#FF6F00', linewidth=2)
-    ax1.add_patch(timer_box)
-    ax1.text(5, 13, '⏱ Time Remaining: 45:23', fontsize=12, ha='center', weight='bold')
+    ax.add_patch(timer_box)
+    _data_text(ax, slots, data, 5, 13, '⏱ Time Remaining: {time_left}', fontsize=12, ha='center', weight='bold')
     
     # Game Info Box
     info_box = Rectangle((1, 10), 8, 2, facecolor='#E8F5E9', edgecolor='#388E3C', linewidth=2)
-    ax1.add_patch(info_box)
-    ax1.text(5, 11.5, 'Game #42', fontsize=13, weight='bold', ha='center')
-    ax1.text(2, 11, '👥 Participants: 156', fontsize=10, ha='left')
-    ax1.text(2, 10.5, '💰 Total Staked: ???', fontsize=10, ha='left')
-    ax1.text(5, 10.2, '(Hidden during commit phase)', fontsize=8, 
-             ha='center', style='italic', color='gray')
+    ax.add_patch(info_box)
+    _data_text(ax, slots, data, 5, 11.5, 'Game #{game}', fontsize=13, weight='bold', ha='center')
+    _data_text(ax, slots, data, 2, 11, '👥 Participants: {participants}', fontsize=10, ha='left')
+    ax.text(2, 10.5, '💰 Total Staked: ???', fontsize=10, ha='left')
+    ax.text(5, 10.2, '(Hidden during commit phase)', fontsize=8, 
+            ha='center', style='italic', color='gray')
     
     # Choice Buttons
-    ax1.text(5, 9.3, 'Select Your Choice:', fontsize=12, weight='bold', ha='center')
+    ax.text(5, 9.3, 'Select Your Choice:', fontsize=12, weight='bold', ha='center')
     
     option_a = FancyBboxPatch((1.5, 7.5), 3, 1.3, boxstyle="round,pad=0.1",
                               facecolor='#FFEBEE', edgecolor='#D32F2F', linewidth=3)
-    ax1.add_patch(option_a)
-    ax1.text(3, 8.5, '🅰️ Option A', fontsize=13, weight='bold', ha='center')
-    ax1.text(3, 8, 'Red Team', fontsize=10, ha='center', color='gray')
+    ax.add_patch(option_a)
+    ax.text(3, 8.5, '🅰️ Option A', fontsize=13, weight='bold', ha='center')
+    ax.text(3, 8, 'Red Team', fontsize=10, ha='center', color='gray')
     
     option_b = FancyBboxPatch((5.5, 7.5), 3, 1.3, boxstyle="round,pad=0.1",
                               facecolor='#E3F2FD', edgecolor='#1976D2', linewidth=3)
-    ax1.add_patch(option_b)
-    ax1.text(7, 8.5, '🅱️ Option B', fontsize=13, weight='bold', ha='center')
-    ax1.text(7, 8, 'Blue Team', fontsize=10, ha='center', color='gray')
+    ax.add_patch(option_b)
+    ax.text(7, 8.5, '🅱️ Option B', fontsize=13, weight='bold', ha='center')
+    ax.text(7, 8, 'Blue Team', fontsize=10, ha='center', color='gray')
     
     # Bet Amount Input
-    ax1.text(5, 6.8, 'Bet Amount:', fontsize=12, weight='bold', ha='center')
+    ax.text(5, 6.8, 'Bet Amount:', fontsize=12, weight='bold', ha='center')
     amount_input = Rectangle((2, 5.8), 6, 0.7, facecolor='white', 
                              edgecolor='#757575', linewidth=2)
-    ax1.add_patch(amount_input)
-    ax1.text(2.3, 6.2, '1.5', fontsize=14, va='center')
-    ax1.text(7.7, 6.2, 'BNB', fontsize=11, va='center', ha='right', color='gray')
+    ax.add_patch(amount_input)
+    _data_text(ax, slots, data, 2.3, 6.2, '{bet}', fontsize=14, va='center')
+    ax.text(7.7, 6.2, 'BNB', fontsize=11, va='center', ha='right', color='gray')
     
     # Deposit Info
     deposit_box = Rectangle((2, 4.8), 6, 0.6, facecolor='#FFF9C4', 
                             edgecolor='#F57F17', linewidth=1)
-    ax1.add_patch(deposit_box)
-    ax1.text(5, 5.1, '💰 Deposit Required: 0.75 BNB (50%)', 
-             fontsize=9, ha='center')
+    ax.add_patch(deposit_box)
+    _data_text(ax, slots, data, 5, 5.1, '💰 Deposit Required: {deposit} BNB ({deposit_pct})', 
+            fontsize=9, ha='center')
     
     # Submit Button
     submit_btn = FancyBboxPatch((2.5, 3.5), 5, 0.8, boxstyle="round,pad=0.1",
                                 facecolor='#4CAF50', edgecolor='#2E7D32', linewidth=2)
-    ax1.add_patch(submit_btn)
-    ax1.text(5, 3.9, 'COMMIT YOUR CHOICE', fontsize=13, weight='bold', 
-             ha='center', color='white')
+    ax.add_patch(submit_btn)
+    ax.text(5, 3.9, 'COMMIT YOUR CHOICE', fontsize=13, weight='bold', 
+            ha='center', color='white')
     
     # Warning Box
     warning_box = Rectangle((1, 2), 8, 1, facecolor='#FFF3E0', 
                            edgecolor='#F57C00', linewidth=2)
-    ax1.add_patch(warning_box)
-    ax1.text(5, 2.7, '⚠️ Important:', fontsize=10, weight='bold', ha='center')
-    ax1.text(5, 2.35, 'Your choice is hidden. Remember to reveal later!', 
-             fontsize=9, ha='center')
-    ax1.text(5, 2, 'Failure to reveal will result in deposit loss.', 
-             fontsize=8, ha='center', color='red')
+    ax.add_patch(warning_box)
+    ax.text(5, 2.7, '⚠️ Important:', fontsize=10, weight='bold', ha='center')
+    ax.text(5, 2.35, 'Your choice is hidden. Remember to reveal later!', 
+            fontsize=9, ha='center')
+    ax.text(5, 2, 'Failure to reveal will result in deposit loss.', 
+            fontsize=8, ha='center', color='red')
     
     # Info Section
-    ax1.text(5, 1.3, 'ℹ️ How it works:', fontsize=10, weight='bold', ha='center')
-    ax1.text(5, 0.9, '1. Choose A or B and enter bet amount', fontsize=8, ha='center')
-    ax1.text(5, 0.6, '2. Pay deposit (30-70% of bet)', fontsize=8, ha='center')
-    ax1.text(5, 0.3, '3. Wait for reveal phase to disclose choice', fontsize=8, ha='center')
-    
-    # ===== Screen 2: Reveal Phase =====
-    ax2 = plt.subplot(3, 2, 2)
-    ax2.set_xlim(0, 10)
-    ax2.set_ylim(0, 16)
-    ax2.axis('off')
+    ax.text(5, 1.3, 'ℹ️ How it works:', fontsize=10, weight='bold', ha='center')
+    ax.text(5, 0.9, '1. Choose A or B and enter bet amount', fontsize=8, ha='center')
+    ax.text(5, 0.6, '2. Pay deposit (30-70% of bet)', fontsize=8, ha='center')
+    ax.text(5, 0.3, '3. Wait for reveal phase to disclose choice', fontsize=8, ha='center')
+    return slots
+
+
+def _draw_reveal_screen(ax, data=None):
+    """Screen 2: Reveal Phase"""
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 16)
+    ax.axis('off')
+    data = data or WIREFRAME_DATA['reveal']
+    slots = []
     
     # Header
     header = Rectangle((0, 15), 10, 1, facecolor='#1976D2', edgecolor='black', linewidth=2)
-    ax2.add_patch(header)
-    ax2.text(0.5, 15.5, '☰', fontsize=24, color='white', va='center')
-    ax2.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
-             color='white', ha='center', va='center')
-    ax2.text(9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
+    ax.add_patch(header)
+    icons.add_glyph(ax, 0.5, 15.5, '☰', fontsize=24, color='white', va='center')
+    ax.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
+            color='white', ha='center', va='center')
+    icons.add_glyph(ax, 9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
     
     # Title
-    ax2.text(5, 14, 'Reveal Phase - 揭示阶段', fontsize=16, weight='bold', ha='center')
+    ax.text(5, 14, 'Reveal Phase - 揭示阶段', fontsize=16, weight='bold', ha='center')
     
     # Timer Box
     timer_box = FancyBboxPatch((2, 12.5), 6, 1, boxstyle="round,pad=0.1",
                                facecolor='#FFEBEE', edgecolor='#D32F2F', linewidth=2)
-    ax2.add_patch(timer_box)
-    ax2.text(5, 13, '⏱ Time Remaining: 15:47', fontsize=12, ha='center', weight='bold')
+    ax.add_patch(timer_box)
+    _data_text(ax, slots, data, 5, 13, '⏱ Time Remaining: {time_left}', fontsize=12, ha='center', weight='bold')
     
     # Your Commit Info
     commit_box = Rectangle((1, 10), 8, 2.2, facecolor='#E8EAF6', 
                            edgecolor='#3F51B5', linewidth=2)
-    ax2.add_patch(commit_box)
-    ax2.text(5, 11.7, '✅ Your Commit Found', fontsize=13, weight='bold', ha='center')
-    ax2.text(2, 11.2, '🔐 Choice: Option A (Hidden)', fontsize=10, ha='left')
-    ax2.text(2, 10.8, '💵 Bet Amount: 1.5 BNB', fontsize=10, ha='left')
-    ax2.text(2, 10.4, '💰 Deposit Paid: 0.75 BNB', fontsize=10, ha='left')
-    ax2.text(5, 10, 'Status: Waiting for Reveal', fontsize=9, 
-             ha='center', style='italic', color='gray')
+    ax.add_patch(commit_box)
+    ax.text(5, 11.7, '✅ Your Commit Found', fontsize=13, weight='bold', ha='center')
+    _data_text(ax, slots, data, 2, 11.2, '🔐 Choice: {choice} (Hidden)', fontsize=10, ha='left')
+    _data_text(ax, slots, data, 2, 10.8, '💵 Bet Amount: {bet} BNB', fontsize=10, ha='left')
+    _data_text(ax, slots, data, 2, 10.4, '💰 Deposit Paid: {deposit} BNB', fontsize=10, ha='left')
+    ax.text(5, 10, 'Status: Waiting for Reveal', fontsize=9, 
+            ha='center', style='italic', color='gray')
     
     # Current Stats (Partial)
     stats_box = Rectangle((1, 8), 8, 1.5, facecolor='#FFF9C4', 
                           edgecolor='#F57F17', linewidth=2)
-    ax2.add_patch(stats_box)
-    ax2.text(5, 9.3, '📊 Current Stats (Live)', fontsize=12, weight='bold', ha='center')
-    ax2.text(2, 8.8, '👥 Revealed: 89 / 156', fontsize=10, ha='left')
-    ax2.text(2, 8.4, '🅰️ Option A: 45 reveals', fontsize=10, ha='left')
-    ax2.text(2, 8, '🅱️ Option B: 44 reveals', fontsize=10, ha='left')
+    ax.add_patch(stats_box)
+    ax.text(5, 9.3, '📊 Current Stats (Live)', fontsize=12, weight='bold', ha='center')
+    _data_text(ax, slots, data, 2, 8.8, '👥 Revealed: {revealed} / {participants}', fontsize=10, ha='left')
+    _data_text(ax, slots, data, 2, 8.4, '🅰️ Option A: {a_reveals} reveals', fontsize=10, ha='left')
+    _data_text(ax, slots, data, 2, 8, '🅱️ Option B: {b_reveals} reveals', fontsize=10, ha='left')
     
     # Reveal Button
     reveal_btn = FancyBboxPatch((2, 6.5), 6, 1, boxstyle="round,pad=0.1",
                                 facecolor='#FF5722', edgecolor='#BF360C', linewidth=2)
-    ax2.add_patch(reveal_btn)
-    ax2.text(5, 7, 'REVEAL MY CHOICE NOW', fontsize=13, weight='bold', 
-             ha='center', color='white')
+    ax.add_patch(reveal_btn)
+    ax.text(5, 7, 'REVEAL MY CHOICE NOW', fontsize=13, weight='bold', 
+            ha='center', color='white')
     
     # Warning
     warning_box = Rectangle((1.5, 5), 7, 1.2, facecolor='#FFEBEE', 
                            edgecolor='#D32F2F', linewidth=2)
-    ax2.add_patch(warning_box)
-    ax2.text(5, 5.9, '⚠️ CRITICAL WARNING', fontsize=11, weight='bold', 
-             ha='center', color='#D32F2F')
-    ax2.text(5, 5.5, 'You MUST reveal before time expires!', fontsize=9, ha='center')
-    ax2.text(5, 5.2, 'Otherwise, your 0.75 BNB deposit will be lost forever.', 
-             fontsize=8, ha='center', color='#D32F2F')
+    ax.add_patch(warning_box)
+    ax.text(5, 5.9, '⚠️ CRITICAL WARNING', fontsize=11, weight='bold', 
+            ha='center', color='#D32F2F')
+    ax.text(5, 5.5, 'You MUST reveal before time expires!', fontsize=9, ha='center')
+    _data_text(ax, slots, data, 5, 5.2, 'Otherwise, your {deposit} BNB deposit will be lost forever.', 
+            fontsize=8, ha='center', color='#D32F2F')
     
     # Info Box
     info_box = Rectangle((1, 3), 8, 1.7, facecolor='#E1F5FE', 
                         edgecolor='#0277BD', linewidth=1)
-    ax2.add_patch(info_box)
-    ax2.text(5, 4.3, 'ℹ️ What happens when you reveal:', fontsize=10, 
-             weight='bold', ha='center')
-    ax2.text(5, 3.9, '• Your choice becomes public', fontsize=8, ha='center')
-    ax2.text(5, 3.6, '• Contract verifies your commit hash', fontsize=8, ha='center')
-    ax2.text(5, 3.3, '• Your bet is added to the total pool', fontsize=8, ha='center')
-    ax2.text(5, 3, '• You become eligible for rewards if you win', fontsize=8, ha='center')
+    ax.add_patch(info_box)
+    ax.text(5, 4.3, 'ℹ️ What happens when you reveal:', fontsize=10, 
+            weight='bold', ha='center')
+    ax.text(5, 3.9, '• Your choice becomes public', fontsize=8, ha='center')
+    ax.text(5, 3.6, '• Contract verifies your commit hash', fontsize=8, ha='center')
+    ax.text(5, 3.3, '• Your bet is added to the total pool', fontsize=8, ha='center')
+    ax.text(5, 3, '• You become eligible for rewards if you win', fontsize=8, ha='center')
     
     # Strategy Note
-    ax2.text(5, 2.3, '💡 Strategy Tip:', fontsize=10, weight='bold', ha='center')
-    ax2.text(5, 1.9, 'Even if your option seems to be losing,', fontsize=8, ha='center')
-    ax2.text(5, 1.6, 'ALWAYS reveal to get your deposit back!', fontsize=8, ha='center')
-    ax2.text(5, 1.3, 'Others might be waiting to reveal at the last moment.', 
-             fontsize=8, ha='center', style='italic', color='gray')
+    ax.text(5, 2.3, '💡 Strategy Tip:', fontsize=10, weight='bold', ha='center')
+    ax.text(5, 1.9, 'Even if your option seems to be losing,', fontsize=8, ha='center')
+    ax.text(5, 1.6, 'ALWAYS reveal to get your deposit back!', fontsize=8, ha='center')
+    ax.text(5, 1.3, 'Others might be waiting to reveal at the last moment.', 
+            fontsize=8, ha='center', style='italic', color='gray')
     
     # Progress Bar
-    ax2.text(5, 0.8, 'Reveal Progress:', fontsize=9, weight='bold', ha='center')
+    ax.text(5, 0.8, 'Reveal Progress:', fontsize=9, weight='bold', ha='center')
     progress_bg = Rectangle((2, 0.4), 6, 0.25, facecolor='#E0E0E0', 
                            edgecolor='#757575', linewidth=1)
-    ax2.add_patch(progress_bg)
-    progress_fill = Rectangle((2, 0.4), 3.42, 0.25, facecolor='#4CAF50', 
-                             edgecolor='none')
-    ax2.add_patch(progress_fill)
-    ax2.text(5, 0.25, '57%', fontsize=8, ha='center')
-    
-    # ===== Screen 3: Results =====
-    ax3 = plt.subplot(3, 2, 3)
-    ax3.set_xlim(0, 10)
-    ax3.set_ylim(0, 16)
-    ax3.axis('off')
+    ax.add_patch(progress_bg)
+    # 进度条长度随 progress 变化, 不只是文字, 见 WIREFRAME_LAYOUT_FIELDS
+    progress_fill = Rectangle((2, 0.4), 6 * float(data['progress'].rstrip('%')) / 100, 0.25,
+                              facecolor='#4CAF50', edgecolor='none')
+    ax.add_patch(progress_fill)
+    _data_text(ax, slots, data, 5, 0.25, '{progress}', fontsize=8, ha='center')
+    return slots
+
+
+def _draw_results_screen(ax, data=None):
+    """Screen 3: Results"""
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 16)
+    ax.axis('off')
+    data = data or WIREFRAME_DATA['results']
+    slots = []
     
     # Header
     header = Rectangle((0, 15), 10, 1, facecolor='#1976D2', edgecolor='black', linewidth=2)
-    ax3.add_patch(header)
-    ax3.text(0.5, 15.5, '☰', fontsize=24, color='white', va='center')
-    ax3.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
-             color='white', ha='center', va='center')
-    ax3.text(9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
+    ax.add_patch(header)
+    icons.add_glyph(ax, 0.5, 15.5, '☰', fontsize=24, color='white', va='center')
+    ax.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
+            color='white', ha='center', va='center')
+    icons.add_glyph(ax, 9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
     
     # Title
-    ax3.text(5, 14, 'Game Results - 游戏结果', fontsize=16, weight='bold', ha='center')
-    ax3.text(5, 13.5, 'Game #42 - Finalized', fontsize=11, ha='center', color='gray')
+    ax.text(5, 14, 'Game Results - 游戏结果', fontsize=16, weight='bold', ha='center')
+    _data_text(ax, slots, data, 5, 13.5, 'Game #{game} - Finalized', fontsize=11, ha='center', color='gray')
     
     # Winner Banner
     winner_box = FancyBboxPatch((1, 11.5), 8, 1.8, boxstyle="round,pad=0.1",
                                 facecolor='#C8E6C9', edgecolor='#2E7D32', linewidth=3)
-    ax3.add_patch(winner_box)
-    ax3.text(5, 12.8, '🎉 OPTION A WINS! 🎉', fontsize=15, weight='bold', 
-             ha='center', color='#1B5E20')
-    ax3.text(5, 12.3, '(Minority Option)', fontsize=11, ha='center', color='#388E3C')
-    ax3.text(5, 11.8, 'Option A chose the path less traveled!', 
-             fontsize=9, ha='center', style='italic')
+    ax.add_patch(winner_box)
+    _data_text(ax, slots, data, 5, 12.8, '🎉 {banner} WINS! 🎉', fontsize=15, weight='bold', 
+            ha='center', color='#1B5E20')
+    ax.text(5, 12.3, '(Minority Option)', fontsize=11, ha='center', color='#388E3C')
+    _data_text(ax, slots, data, 5, 11.8, '{winner} chose the path less traveled!', 
+            fontsize=9, ha='center', style='italic')
     
     # Final Stats
     stats_box = Rectangle((1, 9), 8, 2.2, facecolor='#F5F5F5', 
                           edgecolor='#616161', linewidth=2)
-    ax3.add_patch(stats_box)
-    ax3.text(5, 10.8, '📊 Final Statistics', fontsize=12, weight='bold', ha='center')
+    ax.add_patch(stats_box)
+    ax.text(5, 10.8, '📊 Final Statistics', fontsize=12, weight='bold', ha='center')
     
     # Option A (Winner)
-    ax3.text(2.5, 10.3, '🅰️ Option A', fontsize=10, weight='bold', ha='left', color='#D32F2F')
-    ax3.text(2.5, 9.9, '45 players', fontsize=9, ha='left')
-    ax3.text(2.5, 9.5, '67.5 BNB', fontsize=10, ha='left', weight='bold')
-    ax3.text(2.5, 9.2, '(Minority - Winners!)', fontsize=8, ha='left', color='#2E7D32')
+    _data_text(ax, slots, data, 2.5, 10.3, '{winner_icon} {winner}', fontsize=10, weight='bold', ha='left', color='#D32F2F')
+    _data_text(ax, slots, data, 2.5, 9.9, '{winner_players} players', fontsize=9, ha='left')
+    _data_text(ax, slots, data, 2.5, 9.5, '{winner_stake} BNB', fontsize=10, ha='left', weight='bold')
+    ax.text(2.5, 9.2, '(Minority - Winners!)', fontsize=8, ha='left', color='#2E7D32')
     
     # VS
-    ax3.text(5, 9.7, 'VS', fontsize=12, weight='bold', ha='center', color='gray')
+    ax.text(5, 9.7, 'VS', fontsize=12, weight='bold', ha='center', color='gray')
     
     # Option B (Loser)
-    ax3.text(7.5, 10.3, '🅱️ Option B', fontsize=10, weight='bold', ha='right', color='#1976D2')
-    ax3.text(7.5, 9.9, '111 players', fontsize=9, ha='right')
-    ax3.text(7.5, 9.5, '166.5 BNB', fontsize=10, ha='right', weight='bold')
-    ax3.text(7.5, 9.2, '(Majority - Lost)', fontsize=8, ha='right', color='#D32F2F')
+    _data_text(ax, slots, data, 7.5, 10.3, '{loser_icon} {loser}', fontsize=10, weight='bold', ha='right', color='#1976D2')
+    _data_text(ax, slots, data, 7.5, 9.9, '{loser_players} players', fontsize=9, ha='right')
+    _data_text(ax, slots, data, 7.5, 9.5, '{loser_stake} BNB', fontsize=10, ha='right', weight='bold')
+    ax.text(7.5, 9.2, '(Majority - Lost)', fontsize=8, ha='right', color='#D32F2F')
     
     # Your Result - Winner
     your_result_box = FancyBboxPatch((1, 6.5), 8, 2.2, boxstyle="round,pad=0.1",
                                      facecolor='#E8F5E9', edgecolor='#4CAF50', linewidth=3)
-    ax3.add_patch(your_result_box)
-    ax3.text(5, 8.3, '✨ YOU WON! ✨', fontsize=14, weight='bold', 
-             ha='center', color='#1B5E20')
-    ax3.text(2, 7.8, '💵 Your Bet: 1.5 BNB', fontsize=10, ha='left')
-    ax3.text(2, 7.4, '💰 Your Deposit: 0.75 BNB', fontsize=10, ha='left')
-    ax3.text(2, 7.0, '🎁 Your Share: 3.7 BNB', fontsize=10, ha='left', color='#2E7D32')
-    ax3.text(2, 6.6, '💎 Total Reward: 5.95 BNB', fontsize=11, ha='left', 
-             weight='bold', color='#1B5E20')
+    ax.add_patch(your_result_box)
+    ax.text(5, 8.3, '✨ YOU WON! ✨', fontsize=14, weight='bold', 
+            ha='center', color='#1B5E20')
+    _data_text(ax, slots, data, 2, 7.8, '💵 Your Bet: {bet} BNB', fontsize=10, ha='left')
+    _data_text(ax, slots, data, 2, 7.4, '💰 Your Deposit: {deposit} BNB', fontsize=10, ha='left')
+    _data_text(ax, slots, data, 2, 7.0, '🎁 Your Share: {share} BNB', fontsize=10, ha='left', color='#2E7D32')
+    _data_text(ax, slots, data, 2, 6.6, '💎 Total Reward: {reward} BNB', fontsize=11, ha='left', 
+            weight='bold', color='#1B5E20')
     
     # Calculation Explanation
     calc_box = Rectangle((1, 4.8), 8, 1.5, facecolor='#FFF9C4', 
                          edgecolor='#F57F17', linewidth=1)
-    ax3.add_patch(calc_box)
-    ax3.text(5, 6.0, '🧮 Reward Calculation:', fontsize=10, weight='bold', ha='center')
-    ax3.text(5, 5.6, 'Share = (Your Bet / Total Minority) × Total Majority', 
-             fontsize=8, ha='center')
-    ax3.text(5, 5.3, '= (1.5 / 67.5) × 166.5 = 3.7 BNB', fontsize=8, ha='center')
-    ax3.text(5, 5.0, 'Total = Bet + Deposit + Share = 5.95 BNB', fontsize=8, ha='center')
+    ax.add_patch(calc_box)
+    ax.text(5, 6.0, '🧮 Reward Calculation:', fontsize=10, weight='bold', ha='center')
+    ax.text(5, 5.6, 'Share = (Your Bet / Total Minority) × Total Majority', 
+            fontsize=8, ha='center')
+    _data_text(ax, slots, data, 5, 5.3, '= ({bet} / {winner_stake}) × {loser_stake} = {share} BNB', fontsize=8, ha='center')
+    _data_text(ax, slots, data, 5, 5.0, 'Total = Bet + Deposit + Share = {reward} BNB', fontsize=8, ha='center')
     
     # Claim Button
     claim_btn = FancyBboxPatch((2, 3.5), 6, 0.9, boxstyle="round,pad=0.1",
                                facecolor='#FF9800', edgecolor='#E65100', linewidth=2)
-    ax3.add_patch(claim_btn)
-    ax3.text(5, 3.95, 'CLAIM YOUR REWARD', fontsize=13, weight='bold', 
-             ha='center', color='white')
+    ax.add_patch(claim_btn)
+    ax.text(5, 3.95, 'CLAIM YOUR REWARD', fontsize=13, weight='bold', 
+            ha='center', color='white')
     
     # Additional Info
-    ax3.text(5, 2.8, '📈 ROI: +296.7%', fontsize=11, weight='bold', 
-             ha='center', color='#1B5E20')
-    ax3.text(5, 2.4, 'Congratulations on choosing wisely!', fontsize=9, 
-             ha='center', style='italic')
+    _data_text(ax, slots, data, 5, 2.8, '📈 ROI: {roi}', fontsize=11, weight='bold', 
+            ha='center', color='#1B5E20')
+    ax.text(5, 2.4, 'Congratulations on choosing wisely!', fontsize=9, 
+            ha='center', style='italic')
     
     # Next Game Info
     next_game_box = Rectangle((1.5, 1), 7, 0.8, facecolor='#E3F2FD', 
                              edgecolor='#1976D2', linewidth=1)
-    ax3.add_patch(next_game_box)
-    ax3.text(5, 1.5, '🎮 Next Game starts in: 05:32', fontsize=10, ha='center')
-    ax3.text(5, 1.15, 'Get ready for Game #43!', fontsize=8, ha='center', color='gray')
+    ax.add_patch(next_game_box)
+    _data_text(ax, slots, data, 5, 1.5, '🎮 Next Game starts in: {next_in}', fontsize=10, ha='center')
+    _data_text(ax, slots, data, 5, 1.15, 'Get ready for Game #{next_game}!', fontsize=8, ha='center', color='gray')
     
     # Buttons
-    ax3.text(2.5, 0.5, '📜 View Details', fontsize=9, ha='center', 
-             bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
-    ax3.text(5, 0.5, '📊 History', fontsize=9, ha='center',
-             bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
-    ax3.text(7.5, 0.5, '🔄 Play Again', fontsize=9, ha='center',
-             bbox=dict(boxstyle='round', facecolor='#4CAF50', edgecolor='#2E7D32'))
-    
-    # ===== Screen 4: Lost Scenario =====
-    ax4 = plt.subplot(3, 2, 4)
-    ax4.set_xlim(0, 10)
-    ax4.set_ylim(0, 16)
-    ax4.axis('off')
+    ax.text(2.5, 0.5, '📜 View Details', fontsize=9, ha='center', 
+            bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
+    ax.text(5, 0.5, '📊 History', fontsize=9, ha='center',
+            bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
+    ax.text(7.5, 0.5, '🔄 Play Again', fontsize=9, ha='center',
+            bbox=dict(boxstyle='round', facecolor='#4CAF50', edgecolor='#2E7D32'))
+    return slots
+
+
+def _draw_lost_screen(ax, data=None):
+    """Screen 4: Lost Scenario"""
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 16)
+    ax.axis('off')
+    data = data or WIREFRAME_DATA['lost']
+    slots = []
     
     # Header
     header = Rectangle((0, 15), 10, 1, facecolor='#1976D2', edgecolor='black', linewidth=2)
-    ax4.add_patch(header)
-    ax4.text(0.5, 15.5, '☰', fontsize=24, color='white', va='center')
-    ax4.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
-             color='white', ha='center', va='center')
-    ax4.text(9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
+    ax.add_patch(header)
+    icons.add_glyph(ax, 0.5, 15.5, '☰', fontsize=24, color='white', va='center')
+    ax.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
+            color='white', ha='center', va='center')
+    icons.add_glyph(ax, 9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
     
     # Title
-    ax4.text(5, 14, 'Game Results - 游戏结果', fontsize=16, weight='bold', ha='center')
-    ax4.text(5, 13.5, 'Game #42 - Finalized', fontsize=11, ha='center', color='gray')
+    ax.text(5, 14, 'Game Results - 游戏结果', fontsize=16, weight='bold', ha='center')
+    _data_text(ax, slots, data, 5, 13.5, 'Game #{game} - Finalized', fontsize=11, ha='center', color='gray')
     
     # Winner Banner (same as before)
     winner_box = FancyBboxPatch((1, 11.5), 8, 1.8, boxstyle="round,pad=0.1",
                                 facecolor='#FFEBEE', edgecolor='#D32F2F', linewidth=3)
-    ax4.add_patch(winner_box)
-    ax4.text(5, 12.8, '🅰️ OPTION A WINS!', fontsize=15, weight='bold', 
-             ha='center', color='#B71C1C')
-    ax4.text(5, 12.3, '(Minority Option)', fontsize=11, ha='center', color='#D32F2F')
-    ax4.text(5, 11.8, 'The minority prevailed this round!', 
-             fontsize=9, ha='center', style='italic')
+    ax.add_patch(winner_box)
+    _data_text(ax, slots, data, 5, 12.8, '{winner_icon} {banner} WINS!', fontsize=15, weight='bold', 
+            ha='center', color='#B71C1C')
+    ax.text(5, 12.3, '(Minority Option)', fontsize=11, ha='center', color='#D32F2F')
+    ax.text(5, 11.8, 'The minority prevailed this round!', 
+            fontsize=9, ha='center', style='italic')
     
     # Final Stats (same numbers)
     stats_box = Rectangle((1, 9), 8, 2.2, facecolor='#F5F5F5', 
                           edgecolor='#616161', linewidth=2)
-    ax4.add_patch(stats_box)
-    ax4.text(5, 10.8, '📊 Final Statistics', fontsize=12, weight='bold', ha='center')
+    ax.add_patch(stats_box)
+    ax.text(5, 10.8, '📊 Final Statistics', fontsize=12, weight='bold', ha='center')
     
-    ax4.text(2.5, 10.3, '🅰️ Option A', fontsize=10, weight='bold', ha='left', color='#D32F2F')
-    ax4.text(2.5, 9.9, '45 players', fontsize=9, ha='left')
-    ax4.text(2.5, 9.5, '67.5 BNB', fontsize=10, ha='left', weight='bold')
-    ax4.text(2.5, 9.2, '(Minority - Winners!)', fontsize=8, ha='left', color='#2E7D32')
+    _data_text(ax, slots, data, 2.5, 10.3, '{winner_icon} {winner}', fontsize=10, weight='bold', ha='left', color='#D32F2F')
+    _data_text(ax, slots, data, 2.5, 9.9, '{winner_players} players', fontsize=9, ha='left')
+    _data_text(ax, slots, data, 2.5, 9.5, '{winner_stake} BNB', fontsize=10, ha='left', weight='bold')
+    ax.text(2.5, 9.2, '(Minority - Winners!)', fontsize=8, ha='left', color='#2E7D32')
     
-    ax4.text(5, 9.7, 'VS', fontsize=12, weight='bold', ha='center', color='gray')
+    ax.text(5, 9.7, 'VS', fontsize=12, weight='bold', ha='center', color='gray')
     
-    ax4.text(7.5, 10.3, '🅱️ Option B', fontsize=10, weight='bold', ha='right', color='#1976D2')
-    ax4.text(7.5, 9.9, '111 players', fontsize=9, ha='right')
-    ax4.text(7.5, 9.5, '166.5 BNB', fontsize=10, ha='right', weight='bold')
-    ax4.text(7.5, 9.2, '(Majority - Lost)', fontsize=8, ha='right', color='#D32F2F')
+    _data_text(ax, slots, data, 7.5, 10.3, '{loser_icon} {loser}', fontsize=10, weight='bold', ha='right', color='#1976D2')
+    _data_text(ax, slots, data, 7.5, 9.9, '{loser_players} players', fontsize=9, ha='right')
+    _data_text(ax, slots, data, 7.5, 9.5, '{loser_stake} BNB', fontsize=10, ha='right', weight='bold')
+    ax.text(7.5, 9.2, '(Majority - Lost)', fontsize=8, ha='right', color='#D32F2F')
     
     # Your Result - Loser
     your_result_box = FancyBboxPatch((1, 6.5), 8, 2.2, boxstyle="round,pad=0.1",
                                      facecolor='#FFEBEE', edgecolor='#D32F2F', linewidth=3)
-    ax4.add_patch(your_result_box)
-    ax4.text(5, 8.3, '😔 You Lost This Round', fontsize=14, weight='bold', 
-             ha='center', color='#B71C1C')
-    ax4.text(2, 7.8, '💵 Your Bet: 2.0 BNB', fontsize=10, ha='left')
-    ax4.text(2, 7.4, '💰 Deposit Returned: 1.0 BNB', fontsize=10, ha='left', color='#2E7D32')
-    ax4.text(2, 7.0, '❌ Bet Lost: -2.0 BNB', fontsize=10, ha='left', color='#D32F2F')
-    ax4.text(2, 6.6, '💔 Net Result: -1.0 BNB', fontsize=11, ha='left', 
-             weight='bold', color='#B71C1C')
+    ax.add_patch(your_result_box)
+    ax.text(5, 8.3, '😔 You Lost This Round', fontsize=14, weight='bold', 
+            ha='center', color='#B71C1C')
+    _data_text(ax, slots, data, 2, 7.8, '💵 Your Bet: {bet} BNB', fontsize=10, ha='left')
+    _data_text(ax, slots, data, 2, 7.4, '💰 {deposit_label}: {deposit} BNB', fontsize=10, ha='left', color='#2E7D32')
+    _data_text(ax, slots, data, 2, 7.0, '❌ Bet Lost: -{bet} BNB', fontsize=10, ha='left', color='#D32F2F')
+    _data_text(ax, slots, data, 2, 6.6, '💔 Net Result: {net} BNB', fontsize=11, ha='left', 
+            weight='bold', color='#B71C1C')
     
     # Explanation
     explain_box = Rectangle((1, 4.8), 8, 1.5, facecolor='#FFF9C4', 
                            edgecolor='#F57F17', linewidth=1)
-    ax4.add_patch(explain_box)
-    ax4.text(5, 6.0, 'ℹ️ What Happened:', fontsize=10, weight='bold', ha='center')
-    ax4.text(5, 5.6, 'You chose Option B (majority), so your bet was distributed', 
-             fontsize=8, ha='center')
-    ax4.text(5, 5.3, 'to Option A winners. Your deposit is returned because', 
-             fontsize=8, ha='center')
-    ax4.text(5, 5.0, 'you successfully revealed your choice.', fontsize=8, ha='center')
+    ax.add_patch(explain_box)
+    ax.text(5, 6.0, 'ℹ️ What Happened:', fontsize=10, weight='bold', ha='center')
+    _data_text(ax, slots, data, 5, 5.6, 'You chose {choice} (majority), so your bet was distributed', 
+            fontsize=8, ha='center')
+    _data_text(ax, slots, data, 5, 5.3, 'to {winner} winners. {deposit_note}', 
+            fontsize=8, ha='center')
+    _data_text(ax, slots, data, 5, 5.0, '{deposit_reason}', fontsize=8, ha='center')
     
     # No Claim Button (Nothing to claim)
     no_claim_box = Rectangle((2, 3.5), 6, 0.9, facecolor='#E0E0E0', 
                             edgecolor='#9E9E9E', linewidth=2)
-    ax4.add_patch(no_claim_box)
-    ax4.text(5, 3.95, 'NOTHING TO CLAIM', fontsize=13, weight='bold', 
-             ha='center', color='#616161')
+    ax.add_patch(no_claim_box)
+    ax.text(5, 3.95, 'NOTHING TO CLAIM', fontsize=13, weight='bold', 
+            ha='center', color='#616161')
     
     # Encouragement
-    ax4.text(5, 2.8, '💪 Don\'t Give Up!', fontsize=11, weight='bold', ha='center')
-    ax4.text(5, 2.4, 'Better luck in the next game!', fontsize=9, 
-             ha='center', style='italic')
-    ax4.text(5, 2.0, 'Remember: Predicting the minority is the key!', 
-             fontsize=8, ha='center', color='gray')
+    ax.text(5, 2.8, '💪 Don\'t Give Up!', fontsize=11, weight='bold', ha='center')
+    ax.text(5, 2.4, 'Better luck in the next game!', fontsize=9, 
+            ha='center', style='italic')
+    ax.text(5, 2.0, 'Remember: Predicting the minority is the key!', 
+            fontsize=8, ha='center', color='gray')
     
     # Next Game Info
     next_game_box = Rectangle((1.5, 1), 7, 0.8, facecolor='#E3F2FD', 
                              edgecolor='#1976D2', linewidth=1)
-    ax4.add_patch(next_game_box)
-    ax4.text(5, 1.5, '🎮 Next Game starts in: 05:32', fontsize=10, ha='center')
-    ax4.text(5, 1.15, 'Ready for revenge in Game #43?', fontsize=8, ha='center', color='gray')
+    ax.add_patch(next_game_box)
+    _data_text(ax, slots, data, 5, 1.5, '🎮 Next Game starts in: {next_in}', fontsize=10, ha='center')
+    _data_text(ax, slots, data, 5, 1.15, 'Ready for revenge in Game #{next_game}?', fontsize=8, ha='center', color='gray')
     
     # Buttons
-    ax4.text(2.5, 0.5, '📜 View Details', fontsize=9, ha='center', 
-             bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
-    ax4.text(5, 0.5, '📊 History', fontsize=9, ha='center',
-             bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
-    ax4.text(7.5, 0.5, '🔄 Try Again', fontsize=9, ha='center',
-             bbox=dict(boxstyle='round', facecolor='#FF9800', edgecolor='#E65100'))
-    
-    # ===== Screen 5: Failed to Reveal =====
-    ax5 = plt.subplot(3, 2, 5)
-    ax5.set_xlim(0, 10)
-    ax5.set_ylim(0, 16)
-    ax5.axis('off')
+    ax.text(2.5, 0.5, '📜 View Details', fontsize=9, ha='center', 
+            bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
+    ax.text(5, 0.5, '📊 History', fontsize=9, ha='center',
+            bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
+    ax.text(7.5, 0.5, '🔄 Try Again', fontsize=9, ha='center',
+            bbox=dict(boxstyle='round', facecolor='#FF9800', edgecolor='#E65100'))
+    return slots
+
+
+def _draw_failed_reveal_screen(ax, data=None):
+    """Screen 5: Failed to Reveal"""
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 16)
+    ax.axis('off')
+    data = data or WIREFRAME_DATA['failed_reveal']
+    slots = []
     
     # Header
     header = Rectangle((0, 15), 10, 1, facecolor='#1976D2', edgecolor='black', linewidth=2)
-    ax5.add_patch(header)
-    ax5.text(0.5, 15.5, '☰', fontsize=24, color='white', va='center')
-    ax5.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
-             color='white', ha='center', va='center')
-    ax5.text(9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
+    ax.add_patch(header)
+    icons.add_glyph(ax, 0.5, 15.5, '☰', fontsize=24, color='white', va='center')
+    ax.text(5, 15.5, 'Minority Wins Game', fontsize=14, weight='bold', 
+            color='white', ha='center', va='center')
+    icons.add_glyph(ax, 9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
     
     # Title
-    ax5.text(5, 14, 'Game Results - 游戏结果', fontsize=16, weight='bold', ha='center')
-    ax5.text(5, 13.5, 'Game #42 - Finalized', fontsize=11, ha='center', color='gray')
+    ax.text(5, 14, 'Game Results - 游戏结果', fontsize=16, weight='bold', ha='center')
+    _data_text(ax, slots, data, 5, 13.5, 'Game #{game} - Finalized', fontsize=11, ha='center', color='gray')
     
     # Critical Warning Banner
     warning_banner = FancyBboxPatch((0.5, 11.5), 9, 2, boxstyle="round,pad=0.1",
                                     facecolor='#B71C1C', edgecolor='#000000', linewidth=3)
-    ax5.add_patch(warning_banner)
-    ax5.text(5, 12.9, '⚠️ DEPOSIT CONFISCATED ⚠️', fontsize=15, weight='bold', 
-             ha='center', color='white')
-    ax5.text(5, 12.4, 'You failed to reveal your choice!', fontsize=12, 
-             ha='center', color='white')
-    ax5.text(5, 11.9, 'Your deposit has been permanently lost.', fontsize=10, 
-             ha='center', color='#FFCDD2')
+    ax.add_patch(warning_banner)
+    ax.text(5, 12.9, '⚠️ DEPOSIT CONFISCATED ⚠️', fontsize=15, weight='bold', 
+            ha='center', color='white')
+    ax.text(5, 12.4, 'You failed to reveal your choice!', fontsize=12, 
+            ha='center', color='white')
+    ax.text(5, 11.9, 'Your deposit has been permanently lost.', fontsize=10, 
+            ha='center', color='#FFCDD2')
     
     # Your Loss Box
     loss_box = FancyBboxPatch((1, 8.5), 8, 2.5, boxstyle="round,pad=0.1",
                               facecolor='#FFEBEE', edgecolor='#D32F2F', linewidth=3)
-    ax5.add_patch(loss_box)
-    ax5.text(5, 10.5, '💸 YOUR LOSS', fontsize=14, weight='bold', 
-             ha='center', color='#B71C1C')
-    ax5.text(2, 9.9, '🔐 Commit Hash: 0x7a4f...b39e', fontsize=9, ha='left', 
-             family='monospace')
-    ax5.text(2, 9.5, '💰 Deposit Paid: 0.75 BNB', fontsize=10, ha='left')
-    ax5.text(2, 9.1, '❌ Status: NOT REVEALED', fontsize=10, ha='left', 
-             weight='bold', color='#D32F2F')
-    ax5.text(2, 8.7, '💔 Lost Forever: 0.75 BNB', fontsize=11, ha='left', 
-             weight='bold', color='#B71C1C')
+    ax.add_patch(loss_box)
+    ax.text(5, 10.5, '💸 YOUR LOSS', fontsize=14, weight='bold', 
+            ha='center', color='#B71C1C')
+    _data_text(ax, slots, data, 2, 9.9, '🔐 Commit Hash: {commit}', fontsize=9, ha='left', 
+            family='monospace')
+    _data_text(ax, slots, data, 2, 9.5, '💰 Deposit Paid: {deposit} BNB', fontsize=10, ha='left')
+    ax.text(2, 9.1, '❌ Status: NOT REVEALED', fontsize=10, ha='left', 
+            weight='bold', color='#D32F2F')
+    _data_text(ax, slots, data, 2, 8.7, '💔 Lost Forever: {deposit} BNB', fontsize=11, ha='left', 
+            weight='bold', color='#B71C1C')
     
     # Explanation Box
     explain_box = Rectangle((1, 6), 8, 2.2, facecolor='#FFF3E0', 
                            edgecolor='#F57C00', linewidth=2)
-    ax5.add_patch(explain_box)
-    ax5.text(5, 7.8, '📋 What Went Wrong:', fontsize=11, weight='bold', ha='center')
-    ax5.text(5, 7.4, '1. You submitted a commit during the commit phase', 
-             fontsize=9, ha='center')
-    ax5.text(5, 7.1, '2. You paid a deposit of 0.75 BNB', fontsize=9, ha='center')
-    ax5.text(5, 6.8, '3. You did NOT reveal during the reveal phase', 
-             fontsize=9, ha='center', color='#D32F2F', weight='bold')
-    ax5.text(5, 6.5, '4. Your deposit was confiscated as penalty', 
-             fontsize=9, ha='center', color='#D32F2F')
-    ax5.text(5, 6.2, '(This prevents manipulation and ensures fairness)', 
-             fontsize=8, ha='center', style='italic', color='gray')
+    ax.add_patch(explain_box)
+    ax.text(5, 7.8, '📋 What Went Wrong:', fontsize=11, weight='bold', ha='center')
+    ax.text(5, 7.4, '1. You submitted a commit during the commit phase', 
+            fontsize=9, ha='center')
+    _data_text(ax, slots, data, 5, 7.1, '2. You paid a deposit of {deposit} BNB', fontsize=9, ha='center')
+    ax.text(5, 6.8, '3. You did NOT reveal during the reveal phase', 
+            fontsize=9, ha='center', color='#D32F2F', weight='bold')
+    ax.text(5, 6.5, '4. Your deposit was confiscated as penalty', 
+            fontsize=9, ha='center', color='#D32F2F')
+    ax.text(5, 6.2, '(This prevents manipulation and ensures fairness)', 
+            fontsize=8, ha='center', style='italic', color='gray')
     
     # Timeline Visualization
-    ax5.text(5, 5.5, '⏱ Timeline:', fontsize=10, weight='bold', ha='center')
+    ax.text(5, 5.5, '⏱ Timeline:', fontsize=10, weight='bold', ha='center')
     
     # Timeline line
-    ax5.plot([2, 8], [5, 5], 'k-', linewidth=2)
+    ax.plot([2, 8], [5, 5], 'k-', linewidth=2)
     
     # Commit point
-    ax5.plot(2.5, 5, 'go', markersize=12)
-    ax5.text(2.5, 4.6, 'Commit\n✅', fontsize=8, ha='center', color='#2E7D32')
+    ax.plot(2.5, 5, 'go', markersize=12)
+    ax.text(2.5, 4.6, 'Commit\n✅', fontsize=8, ha='center', color='#2E7D32')
     
     # Reveal missed
-    ax5.plot(5, 5, 'ro', markersize=12)
-    ax5.text(5, 4.6, 'Reveal\n❌', fontsize=8, ha='center', color='#D32F2F')
+    ax.plot(5, 5, 'ro', markersize=12)
+    ax.text(5, 4.6, 'Reveal\n❌', fontsize=8, ha='center', color='#D32F2F')
     
     # Finalized
-    ax5.plot(7.5, 5, 'ko', markersize=12)
-    ax5.text(7.5, 4.6, 'Finalized\n⏹', fontsize=8, ha='center')
+    ax.plot(7.5, 5, 'ko', markersize=12)
+    ax.text(7.5, 4.6, 'Finalized\n⏹', fontsize=8, ha='center')
     
     # Lessons Learned
     lesson_box = Rectangle((1, 2.5), 8, 1.5, facecolor='#E8EAF6', 
                           edgecolor='#3F51B5', linewidth=2)
-    ax5.add_patch(lesson_box)
-    ax5.text(5, 3.7, '💡 Lessons for Next Time:', fontsize=10, weight='bold', ha='center')
-    ax5.text(5, 3.3, '• Set reminders during the reveal phase', fontsize=8, ha='center')
-    ax5.text(5, 3.0, '• ALWAYS reveal, even if you think you\'ll lose', fontsize=8, ha='center')
-    ax5.text(5, 2.7, '• You get your deposit back when you reveal!', 
-             fontsize=8, ha='center', color='#2E7D32', weight='bold')
+    ax.add_patch(lesson_box)
+    ax.text(5, 3.7, '💡 Lessons for Next Time:', fontsize=10, weight='bold', ha='center')
+    ax.text(5, 3.3, '• Set reminders during the reveal phase', fontsize=8, ha='center')
+    ax.text(5, 3.0, '• ALWAYS reveal, even if you think you\'ll lose', fontsize=8, ha='center')
+    ax.text(5, 2.7, '• You get your deposit back when you reveal!', 
+            fontsize=8, ha='center', color='#2E7D32', weight='bold')
     
     # Next Game
     next_game_box = Rectangle((1.5, 1.3), 7, 0.8, facecolor='#E3F2FD', 
                              edgecolor='#1976D2', linewidth=1)
-    ax5.add_patch(next_game_box)
-    ax5.text(5, 1.8, '🎮 Next Game starts in: 05:32', fontsize=10, ha='center')
-    ax5.text(5, 1.45, 'Don\'t make the same mistake!', fontsize=8, ha='center', color='#D32F2F')
+    ax.add_patch(next_game_box)
+    _data_text(ax, slots, data, 5, 1.8, '🎮 Next Game starts in: {next_in}', fontsize=10, ha='center')
+    ax.text(5, 1.45, 'Don\'t make the same mistake!', fontsize=8, ha='center', color='#D32F2F')
     
     # Buttons
-    ax5.text(3.3, 0.5, '📊 History', fontsize=9, ha='center',
-             bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
-    ax5.text(6.7, 0.5, '🔄 Play Again', fontsize=9, ha='center',
-             bbox=dict(boxstyle='round', facecolor='#FF9800', edgecolor='#E65100'))
-    
-    # ===== Screen 6: Game History =====
-    ax6 = plt.subplot(3, 2, 6)
-    ax6.set_xlim(0, 10)
-    ax6.set_ylim(0, 16)
-    ax6.axis('off')
+    ax.text(3.3, 0.5, '📊 History', fontsize=9, ha='center',
+            bbox=dict(boxstyle='round', facecolor='white', edgecolor='#757575'))
+    ax.text(6.7, 0.5, '🔄 Play Again', fontsize=9, ha='center',
+            bbox=dict(boxstyle='round', facecolor='#FF9800', edgecolor='#E65100'))
+    return slots
+
+
+def _draw_history_screen(ax):
+    """Screen 6: Game History"""
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 16)
+    ax.axis('off')
     
     # Header
     header = Rectangle((0, 15), 10, 1, facecolor='#1976D2', edgecolor='black', linewidth=2)
-    ax6.add_patch(header)
-    ax6.text(0.5, 15.5, '←', fontsize=24, color='white', va='center')
-    ax6.text(5, 15.5, 'Game History', fontsize=14, weight='bold', 
-             color='white', ha='center', va='center')
-    ax6.text(9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
+    ax.add_patch(header)
+    icons.add_glyph(ax, 0.5, 15.5, '←', fontsize=24, color='white', va='center')
+    ax.text(5, 15.5, 'Game History', fontsize=14, weight='bold', 
+            color='white', ha='center', va='center')
+    icons.add_glyph(ax, 9.5, 15.5, '👤', fontsize=20, color='white', va='center', ha='right')
     
     # Stats Summary
     stats_summary = Rectangle((0.5, 13), 9, 1.5, facecolor='#E8F5E9', 
                              edgecolor='#4CAF50', linewidth=2)
-    ax6.add_patch(stats_summary)
-    ax6.text(5, 14.2, '📊 Your Statistics', fontsize=13, weight='bold', ha='center')
-    ax6.text(2, 13.7, '🎮 Games Played: 27', fontsize=9, ha='left')
-    ax6.text(2, 13.35, '✅ Wins: 12 (44%)', fontsize=9, ha='left', color='#2E7D32')
-    ax6.text(6, 13.7, '💰 Total Earned: 23.4 BNB', fontsize=9, ha='left', color='#1B5E20')
-    ax6.text(6, 13.35, '📈 Best Win: 8.2 BNB', fontsize=9, ha='left')
+    ax.add_patch(stats_summary)
+    ax.text(5, 14.2, '📊 Your Statistics', fontsize=13, weight='bold', ha='center')
+    ax.text(2, 13.7, '🎮 Games Played: 27', fontsize=9, ha='left')
+    ax.text(2, 13.35, '✅ Wins: 12 (44%)', fontsize=9, ha='left', color='#2E7D32')
+    ax.text(6, 13.7, '💰 Total Earned: 23.4 BNB', fontsize=9, ha='left', color='#1B5E20')
+    ax.text(6, 13.35, '📈 Best Win: 8.2 BNB', fontsize=9, ha='left')
     
     # Recent Games Title
-    ax6.text(5, 12.5, 'Recent Games:', fontsize=12, weight='bold', ha='center')
+    ax.text(5, 12.5, 'Recent Games:', fontsize=12, weight='bold', ha='center')
     
     # Game History Items
     games = [
@@ -679,46 +665,46 @@ def draw_wireframes():
                             facecolor=game['color'], 
                             edgecolor=game['border'], 
                             linewidth=2)
-        ax6.add_patch(game_box)
+        ax.add_patch(game_box)
         
         # Game ID
-        ax6.text(1.2, y_pos, f"Game #{game['id']}", fontsize=10, 
-                weight='bold', va='center')
+        ax.text(1.2, y_pos, f"Game #{game['id']}", fontsize=10, 
+               weight='bold', va='center')
         
         # Result
         result_color = '#2E7D32' if 'WIN' in game['result'] else '#D32F2F'
-        ax6.text(4, y_pos, game['result'], fontsize=10, 
-                weight='bold', ha='center', color=result_color, va='center')
+        ax.text(4, y_pos, game['result'], fontsize=10, 
+               weight='bold', ha='center', color=result_color, va='center')
         
         # Amount
-        ax6.text(8.7, y_pos, f"{game['amount']} BNB", fontsize=11, 
-                weight='bold', ha='right', color=result_color, va='center')
+        ax.text(8.7, y_pos, f"{game['amount']} BNB", fontsize=11, 
+               weight='bold', ha='right', color=result_color, va='center')
         
         # View details button
-        ax6.text(1.2, y_pos-0.3, '📋 Details', fontsize=7, va='center',
-                bbox=dict(boxstyle='round,pad=0.3', facecolor='white', 
-                         edgecolor='gray', linewidth=0.5))
+        ax.text(1.2, y_pos-0.3, '📋 Details', fontsize=7, va='center',
+               bbox=dict(boxstyle='round,pad=0.3', facecolor='white', 
+                        edgecolor='gray', linewidth=0.5))
         
         y_pos -= 1.5
     
     # Load More Button
     load_more = FancyBboxPatch((2.5, 3.5), 5, 0.7, boxstyle="round,pad=0.1",
                                facecolor='#E0E0E0', edgecolor='#757575', linewidth=1)
-    ax6.add_patch(load_more)
-    ax6.text(5, 3.85, 'Load More Games...', fontsize=10, ha='center')
+    ax.add_patch(load_more)
+    ax.text(5, 3.85, 'Load More Games...', fontsize=10, ha='center')
     
     # Charts/Analytics Teaser
     analytics_box = Rectangle((0.8, 1.5), 8.4, 1.5, facecolor='#E3F2FD', 
                              edgecolor='#1976D2', linewidth=2)
-    ax6.add_patch(analytics_box)
-    ax6.text(5, 2.6, '📈 Performance Analytics', fontsize=11, weight='bold', ha='center')
-    ax6.text(5, 2.2, 'Win Rate Trend:', fontsize=9, ha='center')
+    ax.add_patch(analytics_box)
+    ax.text(5, 2.6, '📈 Performance Analytics', fontsize=11, weight='bold', ha='center')
+    ax.text(5, 2.2, 'Win Rate Trend:', fontsize=9, ha='center')
     
     # Simple trend line
     trend_x = [2, 3, 4, 5, 6, 7, 8]
     trend_y = [1.8, 1.85, 1.82, 1.9, 1.88, 1.92, 1.95]
-    ax6.plot(trend_x, trend_y, 'b-', linewidth=2)
-    ax6.fill_between(trend_x, 1.6, trend_y, alpha=0.3, color='#2196F3')
+    ax.plot(trend_x, trend_y, 'b-', linewidth=2)
+    ax.fill_between(trend_x, 1.6, trend_y, alpha=0.3, color='#2196F3')
     
     # Bottom Navigation
     nav_buttons = [
@@ -735,389 +721,490 @@ def draw_wireframes():
         
         btn = Rectangle((button_x, 0.3), 1.5, 0.6, facecolor=btn_color, 
                        edgecolor='#757575', linewidth=1)
-        ax6.add_patch(btn)
-        ax6.text(button_x+0.75, 0.7, icon, fontsize=14, ha='center', va='center')
-        ax6.text(button_x+0.75, 0.4, label, fontsize=7, ha='center', 
-                va='center', color=text_color)
+        ax.add_patch(btn)
+        ax.text(button_x+0.75, 0.7, icon, fontsize=14, ha='center', va='center')
+        ax.text(button_x+0.75, 0.4, label, fontsize=7, ha='center', 
+               va='center', color=text_color)
         button_x += 2
-    
-    plt.tight_layout()
-    plt.savefig('wireframes.png', dpi=300, bbox_inches='tight', facecolor='white')
-    print("✓ Wireframes saved as 'wireframes.png'")
-    plt.close()
+
+
+# 六个界面按原来 subplot(3, 2, i) 的顺序排列
+WIREFRAME_SCREENS = [
+    ('commit', _draw_commit_screen),
+    ('reveal', _draw_reveal_screen),
+    ('results', _draw_results_screen),
+    ('lost', _draw_lost_screen),
+    ('failed_reveal', _draw_failed_reveal_screen),
+    ('history', _draw_history_screen),
+]
+WIREFRAME_GRID = (3, 2)
+# 原图 20x24 英寸, 每个界面占 10x8 英寸
+WIREFRAME_SCREEN_SIZE = (10, 8)
+
+
+def render_wireframe_screen(name, dpi=300, data=None):
+    """单独渲染一个界面, 返回 (height, width, 4) 的 RGBA uint8 数组
+
+    可以在工作进程中调用, 返回的数组直接作为拼图的一个格子。
+    data 只对 WIREFRAME_DATA 里的界面有效, 替换其中的数据字段。
+    """
+    _import_matplotlib()
+    draw = dict(WIREFRAME_SCREENS)[name]
+    key = f'wireframes/{name}'
+    with profiling.phase(key, 'build'):
+        fig = plt.figure(figsize=WIREFRAME_SCREEN_SIZE, dpi=dpi, facecolor='white')
+        ax = fig.add_subplot(1, 1, 1)
+        if data is None:
+            draw(ax)
+        else:
+            draw(ax, data)
+    with profiling.phase(key, 'tight_layout', fig):
+        fig.tight_layout()
+    with profiling.phase(key, 'batch', fig):
+        batching.batch_artists(ax)
+    with profiling.phase(key, 'rasterize', fig):
+        fig.canvas.draw()
+        rgba = np.array(fig.canvas.buffer_rgba())
+    plt.close(fig)
+    return rgba
+
+
+def _render_screen_task(name, dpi, profile=False):
+    """进程池任务: 渲染一个界面, 连同计时记录一起返回"""
+    with profiling.session(profile) as records:
+        rgba = render_wireframe_screen(name, dpi)
+    return rgba, records
+
+
+def wireframe_screen_path(name, output='wireframes.png'):
+    """单个界面的独立图片路径, 例如 wireframes_commit.png"""
+    root, ext = os.path.splitext(output)
+    return f"{root}_{name}{ext}"
+
+
+def _content_bounds(rgba):
+    """非纯白像素的范围 (top, bottom, left, right), 不含 bottom/right; 全白时返回 None"""
+    # 按 uint32 比较整个像素, 比逐通道比较快得多
+    pixels = np.ascontiguousarray(rgba).view(np.uint32)[:, :, 0]
+    ink = pixels != np.array([255, 255, 255, 255], dtype=np.uint8).view(np.uint32)[0]
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if rows.size == 0:
+        return None
+    return int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+
+def _crop_to_content(rgba, pad):
+    """模仿 bbox_inches='tight': 裁掉四周的纯白边, 保留 pad 像素留白"""
+    bounds = _content_bounds(rgba)
+    if bounds is None:
+        return rgba
+    top, bottom, left, right = bounds
+    return rgba[max(top - pad, 0):min(bottom + pad, rgba.shape[0]),
+                max(left - pad, 0):min(right + pad, rgba.shape[1])]
+
+
+def composite_wireframes(panels):
+    """把六个界面的 RGBA 缓冲区按 3x2 网格拼成一张图"""
+    _import_matplotlib()
+    rows, cols = WIREFRAME_GRID
+    height, width = panels[0].shape[:2]
+    sheet = np.full((rows * height, cols * width, 4), 255, dtype=np.uint8)
+    for i, panel in enumerate(panels):
+        r, c = divmod(i, cols)
+        h, w = panel.shape[:2]
+        sheet[r * height:r * height + h, c * width:c * width + w] = panel
+    return sheet
+
+
+def _screen_pixels(dpi):
+    """一个界面的 (高, 宽) 像素"""
+    return round(WIREFRAME_SCREEN_SIZE[1] * dpi), round(WIREFRAME_SCREEN_SIZE[0] * dpi)
+
+
+def _load_screen(path):
+    with Image.open(path) as im:
+        return np.asarray(im.convert('RGBA'))
+
+
+def _save_screen(name, dpi, path, raw_path):
+    """渲染一个界面, 保存为独立图片, 同时把未压缩的像素写到 raw_path; 返回内容范围"""
+    rgba = render_wireframe_screen(name, dpi)
+    with profiling.phase(f'wireframes/{name}', 'save_screen'):
+        mpimg.imsave(path, rgba, dpi=dpi)
+        rgba.tofile(raw_path)
+    bounds = _content_bounds(rgba)
+    # 关闭的 figure 和画布之间有循环引用, 不主动回收的话六张画布会一直占着内存
+    del rgba
+    gc.collect()
+    return bounds
+
+
+def _save_screen_task(name, dpi, path, raw_path, profile=False):
+    """进程池任务 (分块模式): 像素写到磁盘, 不传回主进程"""
+    with profiling.session(profile) as records:
+        bounds = _save_screen(name, dpi, path, raw_path)
+    return bounds, records
+
+
+def _read_raw_rows(raw_path, width, start, stop):
+    """从未压缩的界面像素文件中读出 [start, stop) 行"""
+    with open(raw_path, 'rb') as f:
+        f.seek(start * width * 4)
+        rows = np.fromfile(f, dtype=np.uint8, count=(stop - start) * width * 4)
+    return rows.reshape(stop - start, width, 4)
+
+
+def _draw_wireframes_tiled(output, dpi, jobs, names, stale, pad, band_rows):
+    """分块模式: 界面逐个渲染, 像素先写进临时文件, 拼图再分条带读出写入 PNG
+
+    内存中最多同时有一个界面的画布和一条条带, 而不是六个界面加整张拼图;
+    拼接只是像素复制, 结果和一次性拼接完全相同。
+    """
+    import tempfile
+
+    paths = {name: wireframe_screen_path(name, output) for name in names}
+    size = _screen_pixels(dpi)
+    bounds = {}
+    with tempfile.TemporaryDirectory(prefix='wireframes-') as tmp:
+        raws = {name: os.path.join(tmp, f'{name}.rgba') for name in names}
+        if jobs > 1 and len(stale) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = {name: pool.submit(_save_screen_task, name, dpi, paths[name], raws[name],
+                                             profiling.enabled())
+                           for name in stale}
+                for name, future in futures.items():
+                    bounds[name], records = future.result()
+                    profiling.extend(records)
+        else:
+            for name in stale:
+                bounds[name] = _save_screen(name, dpi, paths[name], raws[name])
+
+        for name in names:
+            if name in bounds:
+                continue
+            with profiling.phase('wireframes', 'load_screens'):
+                panel = _load_screen(paths[name])
+            if panel.shape[:2] != size:
+                # 上次用不同 dpi 保存的, 只能重新渲染
+                del panel
+                bounds[name] = _save_screen(name, dpi, paths[name], raws[name])
+                continue
+            bounds[name] = _content_bounds(panel)
+            panel.tofile(raws[name])
+            del panel
+
+        with profiling.phase('wireframes', 'composite'):
+            _stream_wireframe_sheet(output, dpi, [raws[name] for name in names],
+                                    [bounds[name] for name in names], size, pad, band_rows)
+
+
+def _stream_wireframe_sheet(output, dpi, raws, bounds, size, pad, band_rows):
+    """和 _crop_to_content(composite_wireframes(...)) 相同的拼图, 按条带写入 PNG"""
+    rows, cols = WIREFRAME_GRID
+    height, width = size
+    # 整张拼图的内容范围 = 各界面内容范围平移到网格位置后的并集
+    placed = []
+    for i, b in enumerate(bounds):
+        if b is not None:
+            r, c = divmod(i, cols)
+            placed.append((b[0] + r * height, b[1] + r * height, b[2] + c * width, b[3] + c * width))
+    if placed:
+        top = max(min(b[0] for b in placed) - pad, 0)
+        bottom = min(max(b[1] for b in placed) + pad, rows * height)
+        left = max(min(b[2] for b in placed) - pad, 0)
+        right = min(max(b[3] for b in placed) + pad, cols * width)
+    else:
+        top, bottom, left, right = 0, rows * height, 0, cols * width
+
+    with tiled.PNGWriter(output, right - left, bottom - top, dpi) as png:
+        y = top
+        while y < bottom:
+            # 条带不跨越网格行, 每条只涉及同一行的界面
+            r = y // height
+            y_end = min(y + band_rows, bottom, (r + 1) * height)
+            band = np.full((y_end - y, right - left, 4), 255, dtype=np.uint8)
+            for c in range(cols):
+                i = r * cols + c
+                x0, x1 = max(left, c * width), min(right, (c + 1) * width)
+                if i >= len(raws) or x0 >= x1:
+                    continue
+                part = _read_raw_rows(raws[i], width, y - r * height, y_end - r * height)
+                band[:, x0 - left:x1 - left] = part[:, x0 - c * width:x1 - c * width]
+            png.write_rows(band)
+            y = y_end
+
+
+def draw_wireframes(output='wireframes.png', dpi=300, jobs=None, screens=None):
+    """渲染六个界面并拼接成 wireframes.png
+
+    每个界面在独立进程中渲染到自己的 RGBA 缓冲区, 同时另存为
+    wireframes_<screen>.png。传入 screens 时只重新渲染这些界面,
+    其余界面直接读取上次保存的独立图片, 改一个界面只需一个界面的渲染时间。
+    设置了 UML_TILE_ROWS 时拼图按条带流式写出, 见 _draw_wireframes_tiled。
+    jobs 为 None 时每个界面一个进程 (不超过 CPU 数); 本身已经在进程池的工作
+    进程里时 (render_all -j N、渲染守护进程) 按顺序渲染, 不再嵌套进程池。
+    """
+    import multiprocessing
+
+    _import_matplotlib()
+    names = [name for name, _ in WIREFRAME_SCREENS]
+    stale = [name for name in names
+             if screens is None or name in screens
+             or not os.path.exists(wireframe_screen_path(name, output))]
+    if not jobs:
+        jobs = 1 if multiprocessing.parent_process() else min(len(stale), os.cpu_count() or 1)
+    pad = int(round(0.1 * dpi))
+    band_rows = tile_rows(output)
+    if band_rows:
+        _draw_wireframes_tiled(output, dpi, jobs, names, stale, pad, band_rows)
+        print(f"✓ Wireframes saved as '{output}' ({len(stale)}/{len(names)} screens rendered, tiled)")
+        return
+
+    rendered = {}
+    if jobs > 1 and len(stale) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {name: pool.submit(_render_screen_task, name, dpi, profiling.enabled())
+                       for name in stale}
+            for name, future in futures.items():
+                rendered[name], records = future.result()
+                profiling.extend(records)
+    else:
+        rendered = {name: render_wireframe_screen(name, dpi) for name in stale}
+
+    size = _screen_pixels(dpi)
+    panels = []
+    for name in names:
+        path = wireframe_screen_path(name, output)
+        if name in rendered:
+            panel = rendered[name]
+            with profiling.phase('wireframes', 'save_screens'):
+                mpimg.imsave(path, panel, dpi=dpi)
+        else:
+            with profiling.phase('wireframes', 'load_screens'):
+                panel = _load_screen(path)
+            if panel.shape[:2] != size:
+                # 上次用不同 dpi 保存的, 只能重新渲染
+                panel = render_wireframe_screen(name, dpi)
+                mpimg.imsave(path, panel, dpi=dpi)
+        panels.append(panel)
+
+    with profiling.phase('wireframes', 'composite'):
+        sheet = _crop_to_content(composite_wireframes(panels), pad)
+    with profiling.phase('wireframes', 'savefig'):
+        mpimg.imsave(output, sheet, dpi=dpi)
+    print(f"✓ Wireframes saved as '{output}' ({len(rendered)}/{len(names)} screens rendered)")
 
 
 # ============= 系统流程图 (System Flow Diagram) =============
-def draw_system_flow():
-    fig, ax = plt.subplots(figsize=(16, 20))
-    ax.set_xlim(0, 16)
-    ax.set_ylim(0, 20)
-    ax.axis('off')
-    
-    # Title
-    ax.text(8, 19.5, 'Minority Wins Game - System Flow', 
-            fontsize=20, weight='bold', ha='center')
-    ax.text(8, 19, '少数派获胜游戏 - 系统流程图', 
-            fontsize=16, ha='center', color='gray')
-    
-    def draw_box(ax, x, y, w, h, text, color='#E3F2FD', edge='#1976D2'):
-        box = FancyBboxPatch((x, y), w, h, boxstyle="round,pad=0.1",
-                            facecolor=color, edgecolor=edge, linewidth=2)
-        ax.add_patch(box)
-        lines = text.split('\n')
-        y_text = y + h/2 + 0.15*(len(lines)-1)
-        for line in lines:
-            ax.text(x + w/2, y_text, line, fontsize=9, ha='center', va='center', weight='bold')
-            y_text -= 0.3
-    
-    def draw_diamond(ax, x, y, w, h, text, color='#FFF9C4', edge='#F57C00'):
-        diamond = mpatches.FancyBboxPatch((x, y), w, h, boxstyle="round,pad=0.05",
-                                         facecolor=color, edgecolor=edge, linewidth=2,
-                                         transform=ax.transData)
-        ax.add_patch(diamond)
-        ax.text(x + w/2, y + h/2, text, fontsize=9, ha='center', va='center', weight='bold')
-    
-    def draw_arrow(ax, x1, y1, x2, y2, label=''):
-        arrow = FancyArrowPatch((x1, y1), (x2, y2),
-                               arrowstyle='->', mutation_scale=20,
-                               color='#424242', linewidth=2)
-        ax.add_patch(arrow)
-        if label:
-            mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-            ax.text(mid_x + 0.3, mid_y, label, fontsize=8, style='italic',
-                   bbox=dict(boxstyle='round,pad=0.3', facecolor='white', 
-                            edgecolor='none'))
-    
-    # Start
-    start_circle = Circle((8, 18), 0.4, color='#4CAF50', zorder=10)
-    ax.add_patch(start_circle)
-    ax.text(8, 18, 'START', fontsize=10, ha='center', va='center', 
-           weight='bold', color='white')
-    
-    # Owner starts game
-    draw_box(ax, 5.5, 16.5, 5, 0.8, 'Owner: Start New Game\nstartGame()', '#C8E6C9', '#4CAF50')
-    draw_arrow(ax, 8, 17.6, 8, 17.3)
-    
-    # Game initialized
-    draw_box(ax, 5.5, 15.3, 5, 0.8, 'Game Initialized\nStage = COMMITTING', '#E3F2FD', '#1976D2')
-    draw_arrow(ax, 8, 16.5, 8, 16.1)
-    
-    # Commit Phase Box
-    commit_phase = Rectangle((1, 11), 14, 4, facecolor='#FFF3E0', 
-                            edgecolor='#FF6F00', linewidth=3, linestyle='--')
-    ax.add_patch(commit_phase)
-    ax.text(1.5, 14.7, 'COMMIT PHASE (1 hour)', fontsize=11, weight='bold', color='#E65100')
-    
-    # Player connects
-    draw_box(ax, 2, 13.8, 3.5, 0.7, 'Player:\nConnect Wallet', '#FFEBEE', '#F44336')
-    draw_arrow(ax, 8, 15.3, 3.7, 14.5)
-    
-    # Generate secret
-    draw_box(ax, 6.5, 13.8, 3.5, 0.7, 'Frontend:\nGenerate Secret', '#E1BEE7', '#9C27B0')
-    draw_arrow(ax, 3.7, 14.1, 6.5, 14.1)
-    
-    # Calculate hash
-    draw_box(ax, 11, 13.8, 3.5, 0.7, 'Calculate:\ncommitHash', '#E1BEE7', '#9C27B0')
-    draw_arrow(ax, 6.5, 14.1, 11, 14.1)
-    
-    # Submit commit
-    draw_box(ax, 6, 12.8, 4, 0.7, 'Player: Submit Commit\ncommit()', '#FFEBEE', '#F44336')
-    draw_arrow(ax, 8, 13.8, 8, 13.5)
-    
-    # Store commit data
-    draw_box(ax, 6, 11.8, 4, 0.7, 'Contract: Store\ncommitHash & deposit', '#E3F2FD', '#1976D2')
-    draw_arrow(ax, 8, 12.8, 8, 12.5)
-    
-    # Check commit time
-    draw_diamond(ax, 6, 10.5, 4, 0.8, 'Commit Phase\nEnded?', '#FFF9C4', '#F57C00')
-    draw_arrow(ax, 8, 11.8, 8, 11.3)
-    
-    # No - wait for more commits
-    draw_arrow(ax, 5, 10.5, 2, 13.8, 'No\nWait for commits')
-    
-    # Yes - move to reveal phase
-    draw_box(ax, 6, 9.2, 4, 0.7, 'Start Reveal Phase\nstartRevealPhase()', '#C8E6C9', '#4CAF50')
-    draw_arrow(ax, 8, 10.5, 8, 9.9)
-    
-    # Reveal Phase Box
-    reveal_phase = Rectangle((1, 5), 14, 3.5, facecolor='#E8F5E9', 
-                           edgecolor='#4CAF50', linewidth=3, linestyle='--')
-    ax.add_patch(reveal_phase)
-    ax.text(1.5, 8.2, 'REVEAL PHASE (30 minutes)', fontsize=11, weight='bold', color='#2E7D32')
-    
-    # Player reveals
-    draw_box(ax, 2, 7.5, 3.5, 0.7, 'Player: Submit Reveal\nreveal()', '#FFEBEE', '#F44336')
-    draw_arrow(ax, 8, 9.2, 3.7, 8.2)
-    
-    # Verify hash
-    draw_diamond(ax, 6.5, 7.5, 3, 0.8, 'Verify\ncommitHash?', '#FFF9C4', '#F57C00')
-    draw_arrow(ax, 3.7, 7.9, 6.5, 7.9)
-    
-    # Hash mismatch
-    draw_box(ax, 11, 8.5, 3.5, 0.7, 'Error:\nHash Mismatch', '#FFCDD2', '#D32F2F')
-    draw_arrow(ax, 9.5, 7.9, 11, 8.2, 'No')
-    
-    # Hash match - verify deposit
-    draw_diamond(ax, 6.5, 6.5, 3, 0.8, 'Valid\ndeposit?', '#FFF9C4', '#F57C00')
-    draw_arrow(ax, 8, 7.5, 8, 7.3, 'Yes')
-    
-    # Invalid deposit
-    draw_box(ax, 11, 6.5, 3.5, 0.7, 'Error:\nInvalid Deposit', '#FFCDD2', '#D32F2F')
-    draw_arrow(ax, 9.5, 6.5, 11, 6.5, 'No')
-    
-    # Valid - update game state
-    draw_box(ax, 6, 5.5, 4, 0.7, 'Update Game:\nAdd bet to total', '#E3F2FD', '#1976D2')
-    draw_arrow(ax, 8, 6.5, 8, 6.2, 'Yes')
-    
-    # Check reveal time
-    draw_diamond(ax, 6, 4.2, 4, 0.8, 'Reveal Phase\nEnded?', '#FFF9C4', '#F57C00')
-    draw_arrow(ax, 8, 5.5, 8, 5.0)
-    
-    # No - wait for more reveals
-    draw_arrow(ax, 5, 4.2, 2, 7.5, 'No\nWait for reveals')
-    
-    # Finalize Phase
-    draw_box(ax, 6, 3.0, 4, 0.7, 'Finalize Game\nfinalizeGame()', '#C8E6C9', '#4CAF50')
-    draw_arrow(ax, 8, 4.2, 8, 3.7, 'Yes')
-    
-    # Determine winner
-    draw_diamond(ax, 6, 2.0, 4, 0.8, 'Compare\nOption A vs B', '#FFF9C4', '#F57C00')
-    draw_arrow(ax, 8, 3.0, 8, 2.8)
-    
-    # Option A wins
-    draw_box(ax, 2, 1.0, 3.5, 0.7, 'Option A Wins\n(Minority)', '#C8E6C9', '#4CAF50')
-    draw_arrow(ax, 6, 2.0, 3.7, 1.7, 'A < B')
-    
-    # Option B wins
-    draw_box(ax, 8.5, 1.0, 3.5, 0.7, 'Option B Wins\n(Minority)', '#C8E6C9', '#4CAF50')
-    draw_arrow(ax, 10, 2.0, 10, 1.7, 'B < A')
-    
-    # Tie
-    draw_box(ax, 5.5, 0.2, 5, 0.7, 'Tie Game\nReturn deposits', '#FFF9C4', '#F57C00')
-    draw_arrow(ax, 8, 2.0, 8, 1.2, 'A = B')
-    
-    # Claiming Phase
-    draw_box(ax, 6, -0.8, 4, 0.7, 'Move to\nCLAIMING Phase', '#E3F2FD', '#1976D2')
-    draw_arrow(ax, 8, 1.0, 8, -0.5)
-    draw_arrow(ax, 8, 1.0, 8, -0.5)
-    draw_arrow(ax, 8, 0.2, 8, -0.5)
-    
-    # Player claims reward
-    draw_box(ax, 2, -1.8, 3.5, 0.7, 'Player: Claim\nclaimReward()', '#FFEBEE', '#F44336')
-    draw_arrow(ax, 8, -0.8, 3.7, -1.5)
-    
-    # Calculate reward
-    draw_diamond(ax, 6, -1.8, 4, 0.8, 'Calculate\nReward', '#FFF9C4', '#F57C00')
-    draw_arrow(ax, 3.7, -1.8, 6, -1.8)
-    
-    # No reward
-    draw_box(ax, 2, -2.8, 3.5, 0.7, 'No Reward\n(Lost or not revealed)', '#FFCDD2', '#D32F2F')
-    draw_arrow(ax, 6, -2.2, 3.7, -2.5, 'No')
-    
-    # Has reward
-    draw_box(ax, 8.5, -2.8, 3.5, 0.7, 'Transfer\nReward', '#C8E6C9', '#4CAF50')
-    draw_arrow(ax, 10, -2.2, 10, -2.5, 'Yes')
-    
-    # End
-    end_circle = Circle((8, -3.5), 0.4, color='#F44336', zorder=10)
-    ax.add_patch(end_circle)
-    ax.text(8, -3.5, 'END', fontsize=10, ha='center', va='center', 
-           weight='bold', color='white')
-    draw_arrow(ax, 8, -2.8, 8, -3.1)
-    draw_arrow(ax, 8, -2.8, 8, -3.1)
-    
-    # Legend
-    legend_elements = [
-        mpatches.Patch(facecolor='#C8E6C9', edgecolor='#4CAF50', label='Owner Actions'),
-        mpatches.Patch(facecolor='#FFEBEE', edgecolor='#F44336', label='Player Actions'),
-        mpatches.Patch(facecolor='#E3F2FD', edgecolor='#1976D2', label='Contract Actions'),
-        mpatches.Patch(facecolor='#E1BEE7', edgecolor='#9C27B0', label='Frontend Actions'),
-        mpatches.Patch(facecolor='#FFF9C4', edgecolor='#F57C00', label='Decisions'),
-        mpatches.Patch(facecolor='#FFCDD2', edgecolor='#D32F2F', label='Errors/Exceptions'),
-        Line2D([0], [0], color='#424242', linewidth=2, label='Flow Direction')
-    ]
-    
-    ax.legend(handles=legend_elements, loc='upper right', bbox_to_anchor=(0.98, 0.98),
-              fontsize=10, framealpha=0.9)
-    
-    plt.tight_layout()
-    plt.savefig('system_flow_diagram.png', dpi=300, bbox_inches='tight', facecolor='white')
-    print("✓ System Flow Diagram saved as 'system_flow_diagram.png'")
-    plt.close()
+def draw_system_flow(output='system_flow_diagram.png', dpi=300):
+    _import_matplotlib()
+    with profiling.phase('system_flow', 'build'):
+        fig, ax = diagram_spec.build_figure(diagram_spec.load_plan(diagram_spec.spec_path('system_flow')))
+    _save_figure('system_flow', fig, ax, output, dpi)
+    print(f"✓ System Flow Diagram saved as '{output}'")
 
 
 # ============= 架构图 (Architecture Diagram) =============
-def draw_architecture_diagram():
-    fig, ax = plt.subplots(figsize=(18, 12))
-    ax.set_xlim(0, 18)
-    ax.set_ylim(0, 12)
-    ax.axis('off')
-    
-    # Title
-    ax.text(9, 11.5, 'Minority Wins Game - System Architecture', 
-            fontsize=20, weight='bold', ha='center')
-    ax.text(9, 11, '少数派获胜游戏 - 系统架构图', 
-            fontsize=16, ha='center', color='gray')
-    
-    def draw_service(ax, x, y, w, h, title, components, color='#E3F2FD', edge='#1976D2'):
-        # Main service box
-        service_box = FancyBboxPatch((x, y), w, h, boxstyle="round,pad=0.1",
-                                   facecolor=color, edgecolor=edge, linewidth=3)
-        ax.add_patch(service_box)
-        
-        # Service title
-        ax.text(x + w/2, y + h - 0.3, title, fontsize=12, weight='bold', 
-               ha='center', va='center')
-        
-        # Components
-        comp_y = y + h - 1.2
-        for comp in components:
-            comp_box = Rectangle((x + 0.3, comp_y - 0.25), w - 0.6, 0.5,
-                               facecolor='white', edgecolor=edge, linewidth=1)
-            ax.add_patch(comp_box)
-            ax.text(x + w/2, comp_y, comp, fontsize=9, ha='center', va='center')
-            comp_y -= 0.7
-    
-    def draw_database(ax, x, y, w, h, title, color='#C8E6C9', edge='#4CAF50'):
-        # Database symbol (cylinder)
-        cylinder_bottom = Ellipse((x + w/2, y), w, h/3, 
-                                 facecolor=color, edgecolor=edge, linewidth=2)
-        cylinder_top = Ellipse((x + w/2, y + h), w, h/3, 
-                              facecolor=color, edgecolor=edge, linewidth=2)
-        cylinder_body = Rectangle((x, y + h/6), w, h*2/3,
-                                facecolor=color, edgecolor=edge, linewidth=2)
-        
-        ax.add_patch(cylinder_body)
-        ax.add_patch(cylinder_bottom)
-        ax.add_patch(cylinder_top)
-        
-        ax.text(x + w/2, y + h/2, title, fontsize=10, weight='bold', 
-               ha='center', va='center')
-    
-    def draw_arrow_connection(ax, x1, y1, x2, y2, label='', style='-'):
-        arrow = FancyArrowPatch((x1, y1), (x2, y2),
-                               arrowstyle='->', mutation_scale=20,
-                               color='#757575', linewidth=2, linestyle=style)
-        ax.add_patch(arrow)
-        if label:
-            mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-            ax.text(mid_x, mid_y, label, fontsize=8,
-                   bbox=dict(boxstyle='round,pad=0.2', facecolor='white', 
-                            edgecolor='none'))
-    
-    # Frontend Layer
-    draw_service(ax, 1, 8, 4, 3, 'Frontend (React)', 
-                ['Web3 Integration', 'UI Components', 'State Management'], 
-                '#FFEBEE', '#F44336')
-    
-    # Wallet Layer
-    draw_service(ax, 6, 8, 4, 3, 'MetaMask Wallet', 
-                ['Account Management', 'Transaction Signing', 'Network Switch'], 
-                '#FFF9C4', '#FF9800')
-    
-    # Backend/API Layer
-    draw_service(ax, 11, 8, 4, 3, 'Backend API (Optional)', 
-                ['Game Statistics', 'User Profiles', 'Notification Service'], 
-                '#E1BEE7', '#9C27B0')
-    
-    # Smart Contract Layer
-    draw_service(ax, 4, 4, 6, 3, 'Smart Contract (Solidity)', 
-                ['Game Logic', 'Fund Management', 'Event Emission'], 
-                '#E3F2FD', '#1976D2')
-    
-    # Blockchain Layer
-    draw_service(ax, 11, 4, 4, 3, 'Blockchain Network', 
-                ['BSC Testnet', 'Transaction Execution', 'State Storage'], 
-                '#C8E6C9', '#4CAF50')
-    
-    # Database Layer
-    draw_database(ax, 1, 1, 4, 2, 'Local Storage', '#FFF9C4', '#FF9800')
-    draw_database(ax, 7, 1, 4, 2, 'IPFS (Optional)', '#E1BEE7', '#9C27B0')
-    draw_database(ax, 13, 1, 4, 2, 'Blockchain State', '#C8E6C9', '#4CAF50')
-    
-    # Connections
-    # Frontend -> Wallet
-    draw_arrow_connection(ax, 5, 9.5, 6, 9.5, 'Web3 Provider')
-    
-    # Wallet -> Contract
-    draw_arrow_connection(ax, 10, 9.5, 10, 7, 'Signed Transactions')
-    
-    # Frontend -> Backend
-    draw_arrow_connection(ax, 5, 8.5, 11, 8.5, 'REST API', '--')
-    
-    # Backend -> Blockchain
-    draw_arrow_connection(ax, 15, 8.5, 15, 7, 'Web3 Calls', '--')
-    
-    # Contract -> Blockchain
-    draw_arrow_connection(ax, 10, 7, 11, 7, 'Deployed & Executed')
-    
-    # Frontend -> Local Storage
-    draw_arrow_connection(ax, 3, 8, 3, 3, 'commitData Storage')
-    
-    # Frontend -> IPFS
-    draw_arrow_connection(ax, 5, 8, 9, 3, 'Metadata (Optional)', '--')
-    
-    # Blockchain -> Frontend
-    draw_arrow_connection(ax, 13, 7, 13, 8, 'Event Listening', '-')
-    
-    # Data flow labels
-    ax.text(1.5, 6.5, 'User\nInteraction', fontsize=9, ha='center', 
-           bbox=dict(boxstyle='round', facecolor='white', edgecolor='gray'))
-    ax.text(9, 6.5, 'Smart Contract\nExecution', fontsize=9, ha='center',
-           bbox=dict(boxstyle='round', facecolor='white', edgecolor='gray'))
-    ax.text(15, 6.5, 'Blockchain\nConsensus', fontsize=9, ha='center',
-           bbox=dict(boxstyle='round', facecolor='white', edgecolor='gray'))
-    
-    # Technology Stack Labels
-    ax.text(1, 0.3, '📱 Client-Side', fontsize=10, weight='bold', ha='left')
-    ax.text(7, 0.3, '🗄️  Decentralized Storage', fontsize=10, weight='bold', ha='center')
-    ax.text(15, 0.3, '⛓️  Blockchain Layer', fontsize=10, weight='bold', ha='right')
-    
-    plt.tight_layout()
-    plt.savefig('architecture_diagram.png', dpi=300, bbox_inches='tight', facecolor='white')
-    print("✓ Architecture Diagram saved as 'architecture_diagram.png'")
-    plt.close()
+def draw_architecture_diagram(output='architecture_diagram.png', dpi=300):
+    _import_matplotlib()
+    with profiling.phase('architecture', 'build'):
+        fig, ax = diagram_spec.build_figure(diagram_spec.load_plan(diagram_spec.spec_path('architecture')))
+    _save_figure('architecture', fig, ax, output, dpi)
+    print(f"✓ Architecture Diagram saved as '{output}'")
+
+
+# ============= 图表注册表 (Diagram Registry) =============
+# name -> (icon, title, output file, 中文说明, draw function)
+DIAGRAMS = {
+    'use_case': ('📊', 'Use Case Diagram', 'use_case_diagram.png', '用例图', draw_use_case_diagram),
+    'wireframes': ('📱', 'Wireframes', 'wireframes.png', '界面原型图', draw_wireframes),
+    'system_flow': ('🔧', 'System Flow Diagram', 'system_flow_diagram.png', '系统流程图', draw_system_flow),
+    'architecture': ('🏗️ ', 'Architecture Diagram', 'architecture_diagram.png', '系统架构图', draw_architecture_diagram),
+}
+
+
+def diagram_inputs(name, output=None):
+    """图表绘制时用到的其他文件, 计入渲染缓存的键; 原型图仍然是代码绘制"""
+    inputs = [BATCHING_SOURCE, FONTS_SOURCE, ICONS_SOURCE]
+    if name != 'wireframes':
+        inputs += [diagram_spec.__file__, ROUTING_SOURCE, diagram_spec.spec_path(name)]
+    if tile_rows(output or DIAGRAMS[name][2]):
+        inputs.append(TILED_SOURCE)
+    return inputs
+
+
+def diagram_settings(name, output=None, overrides=None):
+    """除 dpi 和格式之外影响输出的设置, 计入渲染缓存的键; 没有时返回 None
+
+    overrides 是这次渲染临时使用的 matplotlib rcParams。
+    """
+    settings = {}
+    # 分块输出的 PNG 字节和 savefig 不同, 单独缓存
+    band_rows = tile_rows(output or DIAGRAMS[name][2])
+    if band_rows:
+        settings['tile_rows'] = band_rows
+    if overrides:
+        settings['rc'] = overrides
+    return settings or None
+
+
+def diagram_outputs(name, output=None):
+    """一个图表生成的所有文件, 第一个是主输出 (默认是注册表里的文件名)"""
+    output = output or DIAGRAMS[name][2]
+    if name == 'wireframes':
+        return [output] + [wireframe_screen_path(screen, output) for screen, _ in WIREFRAME_SCREENS]
+    return [output]
+
+
+def _draw_with_overrides(draw, output, dpi, overrides, jobs=None):
+    # 只有原型图自己会开进程池, 其他图表没有 jobs 参数
+    kwargs = {'jobs': jobs} if jobs and draw is draw_wireframes else {}
+    if not overrides:
+        return draw(output, dpi, **kwargs)
+    _import_matplotlib()
+    with plt.rc_context(overrides):
+        return draw(output, dpi, **kwargs)
+
+
+def render_diagram(name, dpi=300, use_cache=True, profile=False, output=None, overrides=None, jobs=None):
+    """渲染单个图表, 返回 (name, 耗时秒数, 错误信息或 None, 是否命中缓存, 计时记录)
+
+    作为进程池的任务函数使用, 异常在这里捕获并以字符串返回,
+    这样一个图表失败不会影响其他图表。输入没有变化时直接从
+    渲染缓存复制上次的结果。profile 为 True 时收集各阶段的计时记录。
+    output 指定主输出文件 (扩展名决定格式), overrides 是临时的 rcParams。
+    jobs 是图表内部可以使用的进程数 (目前只有原型图用到)。
+    """
+    draw = DIAGRAMS[name][4]
+    outputs = diagram_outputs(name, output)
+    start = time.perf_counter()
+    with profiling.session(profile) as records:
+        try:
+            with profiling.phase(name, 'total'):
+                if use_cache:
+                    hit = render_cache.cached_render(
+                        lambda: _draw_with_overrides(draw, outputs[0], dpi, overrides, jobs), __file__,
+                        draw.__name__, outputs, dpi, inputs=diagram_inputs(name, outputs[0]),
+                        settings=diagram_settings(name, outputs[0], overrides))
+                else:
+                    _draw_with_overrides(draw, outputs[0], dpi, overrides, jobs)
+                    hit = False
+        except Exception as e:
+            return name, time.perf_counter() - start, f"{type(e).__name__}: {e}", False, records
+    return name, time.perf_counter() - start, None, hit, records
+
+
+def render_all(names, jobs=1, dpi=300, use_cache=True, profile=False):
+    """按顺序 (jobs=1) 或在进程池中并行渲染多个图表, 返回 {name: (耗时, 错误, 命中缓存)}
+
+    profile 为 True 时各图表的计时记录合并到当前的 profiling 会话。
+    按顺序渲染时 jobs 个进程都交给图表内部使用 (原型图的各个界面); 并行渲染时
+    每个工作进程内部按顺序渲染, 总进程数不超过 jobs。
+    """
+    results = {}
+    if jobs <= 1 or len(names) <= 1:
+        for name in names:
+            icon, title = DIAGRAMS[name][:2]
+            print(f"{icon} Generating {title}...")
+            result = render_diagram(name, dpi, use_cache, profile, jobs=max(jobs, 1))
+            results[name] = result[1:4]
+            profiling.extend(result[4])
+        return results
+
+    print(f"⚡ Rendering {len(names)} diagrams with {jobs} worker processes...")
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=min(jobs, len(names))) as pool:
+        futures = {pool.submit(render_diagram, name, dpi, use_cache, profile, jobs=1): name
+                   for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # 工作进程崩溃 (例如被 OOM killer 杀掉) 时走这里
+                results[name] = (0.0, f"{type(e).__name__}: {e}", False)
+            else:
+                results[name] = result[1:4]
+                profiling.extend(result[4])
+    return results
 
 
 # ============= 主函数 =============
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate UML diagrams for Minority Wins Game')
+    parser.add_argument('diagrams', nargs='*', metavar='DIAGRAM',
+                        help=f"diagrams to render: {', '.join(DIAGRAMS)} (default: all)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes, 0 = one per CPU (default: 1)')
+    parser.add_argument('--dpi', type=int, default=300, help='output resolution (default: 300)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always re-render, ignoring the render cache')
+    parser.add_argument('--tile-rows', type=int, metavar='N',
+                        help='rasterize PNGs in bands of N pixel rows to bound peak memory')
+    parser.add_argument('--profile', metavar='FILE', nargs='?', const='render_profile.json',
+                        help='write per-phase timings as JSON (default file: render_profile.json)')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='also write the timings in Chrome trace-event format')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.diagrams if name not in DIAGRAMS]
+    if unknown:
+        parser.error(f"unknown diagram(s): {', '.join(unknown)}")
+    names = args.diagrams or list(DIAGRAMS)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.tile_rows:
+        os.environ[TILE_ROWS_ENV] = str(args.tile_rows)
+
     print("🚀 Generating UML Diagrams for Minority Wins Game...")
     print("=" * 50)
-    
-    try:
-        # # 生成用例图
-        # print("📊 Generating Use Case Diagram...")
-        # draw_use_case_diagram()
-        
-        # # 生成原型图
-        # print("📱 Generating Wireframes...")
-        # draw_wireframes()
-        
-        # 生成系统流程图
-        print("🔧 Generating System Flow Diagram...")
-        draw_system_flow()
-        
-        # 生成架构图
-        print("🏗️  Generating Architecture Diagram...")
-        draw_architecture_diagram()
-        
-        print("=" * 50)
-        print("✅ All diagrams generated successfully!")
-        print("\n📁 Generated Files:")
-        print("  • use_case_diagram.png     - 用例图")
-        print("  • wireframes.png          - 界面原型图") 
-        print("  • system_flow_diagram.png - 系统流程图")
-        print("  • architecture_diagram.png - 系统架构图")
-        print("\n🎯 Use these diagrams for:")
-        print("  • Project documentation")
-        print("  • Development planning")
-        print("  • Team communication")
-        print("  • User experience design")
-        
-    except Exception as e:
-        print(f"❌ Error generating diagrams: {e}")
+
+    profile = bool(args.profile or args.trace)
+    start = time.perf_counter()
+    with profiling.session(profile) as records:
+        results = render_all(names, jobs, args.dpi, not args.no_cache, profile)
+    total = time.perf_counter() - start
+
+    print("=" * 50)
+    failed = [name for name in names if results[name][1]]
+    for name in names:
+        elapsed, error, hit = results[name]
+        if error:
+            print(f"❌ {name}: {error}")
+        else:
+            print(f"✓ {name}: {elapsed:.2f}s{' (cached)' if hit else ''}")
+    print(f"⏱  Total: {total:.2f}s")
+    if not args.no_cache:
+        print(f"📦 {render_cache.format_stats(render_cache.RenderCache().stats())}")
+    if profile:
+        print(profiling.format_summary(records))
+    if args.profile:
+        profiling.write_report(args.profile, records, dpi=args.dpi, jobs=jobs,
+                               cached=[name for name in names if results[name][2]])
+        print(f"📊 Profile written to '{args.profile}'")
+    if args.trace:
+        profiling.write_trace(args.trace, records)
+        print(f"📊 Trace written to '{args.trace}'")
+
+    if failed:
+        print(f"❌ {len(failed)} diagram(s) failed: {', '.join(failed)}")
         print("💡 Make sure you have matplotlib installed: pip install matplotlib")
+        return 1
+
+    print("✅ All diagrams generated successfully!")
+    print("\n📁 Generated Files:")
+    for name in names:
+        output, note = DIAGRAMS[name][2:4]
+        print(f"  • {output:<26} - {note}")
+    print("\n🎯 Use these diagrams for:")
+    print("  • Project documentation")
+    print("  • Development planning")
+    print("  • Team communication")
+    print("  • User experience design")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Minority Wins Game - 系统流程动画 (System Flow Walkthrough)
+
+把系统流程图做成一段入门动画: 从 START 开始, 沿着提交、揭示、结算、
+领取的主线一步步走到 END, 当前步骤的框和刚走过的连线高亮显示,
+走过的路线留下淡色轨迹。
+
+16x20 英寸的流程图完整重画一次要几百毫秒, 这里只在开始时画一次静态
+背景, 之后每一帧都是 restore_region (把背景像素拷回去) + draw_artist
+(只画高亮的框、连线和说明文字), 再直接取画布的像素; 走过的轨迹画进
+背景里, 每帧的绘制量不随步数增加。帧率受编码速度限制, 而不是 matplotlib。
+
+输出格式按扩展名选择:
+    .gif          Pillow, 所有帧共用一个调色板
+    .png / .apng  Pillow, 动画 PNG (同样是调色板图像)
+    .mp4          通过管道把原始像素交给 ffmpeg (需要 ffmpeg 在 PATH 上), 逐帧写出不占内存
+
+使用方法 (在 UML 目录下):
+    python animate.py                            # system_flow.gif
+    python animate.py -o onboarding.mp4 --fps 24 --dpi 80
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import diagram_spec
+
+# 主线上的步骤: (框的 id, 所属阶段); 相邻两步之间必须有 connector
+WALKTHROUGH = [
+    ('start', 'Setup'), ('start_game', 'Setup'), ('initialized', 'Setup'),
+    ('connect_wallet', 'Commit Phase'), ('generate_secret', 'Commit Phase'), ('calc_hash', 'Commit Phase'),
+    ('submit_commit', 'Commit Phase'), ('store_commit', 'Commit Phase'), ('commit_ended', 'Commit Phase'),
+    ('start_reveal', 'Reveal Phase'), ('submit_reveal', 'Reveal Phase'), ('verify_hash', 'Reveal Phase'),
+    ('valid_deposit', 'Reveal Phase'), ('update_game', 'Reveal Phase'), ('reveal_ended', 'Reveal Phase'),
+    ('finalize', 'Finalize'), ('compare', 'Finalize'), ('a_wins', 'Finalize'),
+    ('claiming', 'Claim'), ('claim', 'Claim'), ('calc_reward', 'Claim'), ('transfer', 'Claim'), ('end', 'Claim'),
+]
+
+HIGHLIGHT = '#FF1744'
+TRAIL = '#FF8A80'
+FPS = 12
+TRAVEL_FRAMES = 6   # 沿连线前进的帧数
+HOLD_FRAMES = 12    # 每一步停留的帧数
+DPI = 50
+FORMATS = ('gif', 'png', 'apng', 'mp4')
+
+
+# ============= 几何 (Geometry) =============
+def _partial(points, t):
+    """折线从起点走到全长 t (0-1) 处的部分"""
+    lengths = np.hypot(*np.diff(points, axis=0).T)
+    done = np.cumsum(lengths)
+    target = t * done[-1]
+    k = int(np.searchsorted(done, target))  # 终点落在第 k 段上
+    if k >= len(lengths):
+        return points
+    frac = (target - (done[k] - lengths[k])) / lengths[k] if lengths[k] else 1.0
+    tip = points[k] + frac * (points[k + 1] - points[k])
+    return np.vstack([points[:k + 1], tip])
+
+
+def walkthrough(spec):
+    """[(id, 阶段, 轮廓, 从上一步过来的折线 或 None)]; 主线和描述文件对不上时抛出 ValueError"""
+    outlines, connectors = diagram_spec.flow_geometry(spec, spec.get('name', 'spec'))
+    routes = {(a, b): points for a, b, points in connectors}
+    steps = []
+    previous = None
+    for name, phase in WALKTHROUGH:
+        if name not in outlines:
+            raise ValueError(f"walkthrough step '{name}' is not a shape in the spec")
+        route = None
+        if previous is not None:
+            route = routes.get((previous, name))
+            if route is None:
+                raise ValueError(f"no connector from '{previous}' to '{name}' in the spec")
+        steps.append((name, phase, outlines[name], route))
+        previous = name
+    return steps
+
+
+def _caption(spec, name):
+    """步骤的说明文字: 框里文字的第一行"""
+    for element in spec['elements']:
+        if element.get('id') == name:
+            return element.get('text', name.upper()).split('\n')[0]
+    return name
+
+
+# ============= 逐帧绘制 (Blitting) =============
+class Walkthrough:
+    """静态背景只画一次, 每一帧只重画高亮的 artist"""
+
+    def __init__(self, spec, dpi=DPI):
+        from matplotlib.lines import Line2D
+        from matplotlib.patches import Rectangle
+        import UML4
+
+        UML4._import_matplotlib()
+        self.spec = spec
+        self.steps = walkthrough(spec)
+        plan = diagram_spec.compile_spec(spec, spec['name'])
+        self.fig, self.ax = diagram_spec.build_figure(plan)
+        self.fig.set_dpi(dpi)
+        self.fig.tight_layout()
+
+        # animated=True 的 artist 不参与整张图的绘制, 只由 draw_artist 画
+        self.box = Rectangle((0, 0), 1, 1, fill=False, edgecolor=HIGHLIGHT, linewidth=4,
+                             zorder=20, animated=True)
+        self.line = Line2D([], [], color=HIGHLIGHT, linewidth=4, solid_capstyle='round',
+                           zorder=21, animated=True)
+        self.trail = Line2D([], [], color=TRAIL, linewidth=3, alpha=0.8, zorder=19, animated=True)
+        self.caption = self.ax.text(0.3, 19.8, '', fontsize=11, weight='bold', va='top',
+                                    color=HIGHLIGHT, zorder=22, animated=True)
+        for artist in (self.box, self.line, self.trail):
+            self.ax.add_artist(artist)
+
+        canvas = self.fig.canvas
+        canvas.draw()
+        self.background = canvas.copy_from_bbox(self.fig.bbox)
+        self.size = canvas.get_width_height()
+        self.redraws = 0
+
+    def _pixels(self):
+        return np.asarray(self.fig.canvas.buffer_rgba())[:, :, :3].copy()
+
+    def _frame(self, outline, route, caption):
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        if route is not None and len(route) > 1:
+            self.line.set_data(route[:, 0], route[:, 1])
+            self.ax.draw_artist(self.line)
+        if outline is not None:
+            x0, y0, x1, y1 = outline
+            self.box.set_bounds(x0 - 0.08, y0 - 0.08, x1 - x0 + 0.16, y1 - y0 + 0.16)
+            self.ax.draw_artist(self.box)
+        self.caption.set_text(caption)
+        self.ax.draw_artist(self.caption)
+        self.redraws += 1
+        return self._pixels()
+
+    def _add_trail(self, route):
+        """把走过的连线画进背景, 之后的帧不必再画"""
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        self.trail.set_data(route[:, 0], route[:, 1])
+        self.ax.draw_artist(self.trail)
+        self.background = canvas.copy_from_bbox(self.fig.bbox)
+
+    def frames(self, travel=TRAVEL_FRAMES, hold=HOLD_FRAMES):
+        """依次产生 (RGB 像素, 重复帧数)"""
+        total = len(self.steps)
+        for index, (name, phase, outline, route) in enumerate(self.steps, 1):
+            caption = f"Step {index}/{total} · {phase}\n{_caption(self.spec, name)}"
+            if route is not None:
+                route = np.asarray(route, dtype=float)
+                for k in range(1, travel + 1):
+                    yield self._frame(None, _partial(route, k / travel), caption), 1
+            yield self._frame(outline, route, caption), hold
+            if route is not None:
+                self._add_trail(route)
+
+    def full_redraw_time(self, repeat=3):
+        """对比用: 整张图重画一次的平均耗时 (秒)"""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            self.fig.canvas.draw()
+        return (time.perf_counter() - start) / repeat
+
+    def close(self):
+        import matplotlib.pyplot as plt
+        plt.close(self.fig)
+
+
+# ============= 编码 (Encoding) =============
+def _palette(pixels):
+    """所有帧共用的调色板: 第一帧加上一条高亮色和轨迹色的色带, 保证这两种颜色有自己的色号"""
+    from PIL import Image
+
+    swatch = np.zeros((32, pixels.shape[1], 3), dtype=np.uint8)
+    swatch[:16] = [int(HIGHLIGHT[i:i + 2], 16) for i in (1, 3, 5)]
+    swatch[16:] = [int(TRAIL[i:i + 2], 16) for i in (1, 3, 5)]
+    return Image.fromarray(np.vstack([pixels, swatch])).quantize(colors=255, method=Image.Quantize.MEDIANCUT)
+
+
+def write_pillow(frames, output, fps, fmt):
+    """GIF / APNG: 调色板图像 (每像素一个字节), 重复帧合并成一帧并延长显示时间"""
+    from PIL import Image
+
+    images, durations, palette = [], [], None
+    for pixels, repeat in frames:
+        palette = palette or _palette(pixels)
+        images.append(Image.fromarray(pixels).quantize(palette=palette, dither=Image.Dither.NONE))
+        durations.append(round(1000 * repeat / fps))
+    options = {'format': 'GIF'} if fmt == 'gif' else {'format': 'PNG', 'default_image': False}
+    images[0].save(output, save_all=True, append_images=images[1:], duration=durations, loop=0, **options)
+    return round(sum(durations) * fps / 1000)
+
+
+def write_mp4(frames, output, fps, size):
+    """MP4: 原始 RGB 像素通过管道交给 ffmpeg, 重复帧原样重复写入"""
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("MP4 output needs ffmpeg on PATH (GIF and APNG only need Pillow)")
+    width, height = size
+    command = [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+               '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+               # yuv420p 要求宽高是偶数
+               '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', '-c:v', 'libx264', output]
+    count = 0
+    with subprocess.Popen(command, stdin=subprocess.PIPE) as process:
+        for pixels, repeat in frames:
+            data = pixels.tobytes()
+            for _ in range(repeat):
+                process.stdin.write(data)
+            count += repeat
+        process.stdin.close()
+        if process.wait():
+            raise RuntimeError(f"ffmpeg exited with status {process.returncode}")
+    return count
+
+
+def export(output='system_flow.gif', fps=FPS, dpi=DPI, travel=TRAVEL_FRAMES, hold=HOLD_FRAMES):
+    """渲染并编码动画, 返回统计信息 dict"""
+    fmt = os.path.splitext(output)[1].lstrip('.').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    start = time.perf_counter()
+    walk = Walkthrough(diagram_spec.load_spec(diagram_spec.spec_path('system_flow')), dpi)
+    setup = time.perf_counter() - start
+    try:
+        start = time.perf_counter()
+        if fmt == 'mp4':
+            count = write_mp4(walk.frames(travel, hold), output, fps, walk.size)
+        else:
+            count = write_pillow(walk.frames(travel, hold), output, fps, fmt)
+        encode = time.perf_counter() - start
+        redraw = walk.full_redraw_time()
+    finally:
+        walk.close()
+    return {'frames': count, 'distinct': walk.redraws, 'setup': setup, 'encode': encode,
+            'redraw': redraw, 'size': walk.size}
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='animate', description='animated walkthrough of the system flow diagram')
+    parser.add_argument('-o', '--output', default='system_flow.gif',
+                        help=f"output file, format by extension: {', '.join(FORMATS)} (default: system_flow.gif)")
+    parser.add_argument('--fps', type=int, default=FPS, help=f'frames per second (default: {FPS})')
+    parser.add_argument('--dpi', type=int, default=DPI, help=f'resolution of the frames (default: {DPI})')
+    parser.add_argument('--travel', type=int, default=TRAVEL_FRAMES, help='frames spent moving along an arrow')
+    parser.add_argument('--hold', type=int, default=HOLD_FRAMES, help='frames each step stays highlighted')
+    args = parser.parse_args(argv)
+
+    try:
+        stats = export(args.output, args.fps, args.dpi, args.travel, args.hold)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    width, height = stats['size']
+    per_frame = stats['encode'] / stats['distinct']
+    print(f"✓ Walkthrough saved as '{args.output}' ({width}x{height}, {stats['frames']} frames, "
+          f"{stats['frames'] / args.fps:.1f}s at {args.fps} fps)")
+    print(f"⏱  setup {stats['setup']:.2f}s, {stats['distinct']} distinct frames rendered and encoded in "
+          f"{stats['encode']:.2f}s ({per_frame * 1000:.0f} ms/frame); a full redraw takes "
+          f"{stats['redraw'] * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Minority Wins Game - 批量绘制 (Batched Artists)
+
+一张图里有大量样式相同的小图元: 小人的四肢、用例椭圆、原型图里的
+按钮和卡片……每个图元都是一个独立的 artist, 绘制时每个都要走一遍
+Python 层的 gc 设置, 导出 SVG/PDF 时每个都是一个单独的元素。
+
+batch_artists(ax) 在画完之后、保存之前调用, 把绘制顺序上相邻且可以
+合并的图元换成一个 PatchCollection / LineCollection:
+
+  * 普通 Patch (矩形、椭圆、圆、圆角框) -> PathCollection (PatchCollection 的基类),
+    每个元素保留自己的填充色、边框色、线宽和线型
+  * 没有标记点的 Line2D -> LineCollection
+
+只有绘制顺序上相邻 (zorder 相同、中间没有别的 artist) 的图元才会合并,
+所以遮挡关系不变。合并的图形按和单独绘制完全相同的变换矩阵光栅化,
+没有合并的 artist 保留原来的裁剪设置, Agg 输出和逐个绘制的结果逐像素
+相同 (tests/test_batching.py)。箭头 (FancyArrowPatch)
+的形状要在绘制时按屏幕坐标计算, 文字也不能合并, 这两类保持原样。
+"""
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
+from matplotlib.patches import FancyArrowPatch, Patch
+from matplotlib.transforms import IdentityTransform
+
+# 少于这个数量的相邻图元不值得合并
+MIN_BATCH = 2
+
+
+def _common_key(artist, ax):
+    """能否合并的公共条件; 不能合并时返回 None"""
+    # add_patch/add_line 会用坐标区背景做裁剪路径 (包装成 TransformedPatchPath),
+    # 集合加入 ax 时同样如此; 其他自定义裁剪路径的图元不合并
+    clip = artist.get_clip_path()
+    if (clip is not None and getattr(clip, '_patch', None) is not ax.patch) \
+            or artist.get_path_effects() or artist.get_sketch_params() is not None \
+            or artist.get_gid() or artist.get_url() or artist.get_picker() \
+            or not artist.get_visible() or artist.get_animated():
+        return None
+    # 带标签的图元会出现在自动生成的图例里, 合并后会丢失
+    label = artist.get_label()
+    if label and not label.startswith('_'):
+        return None
+    return artist.get_zorder(), artist.get_clip_on(), artist.get_snap(), artist.get_rasterized()
+
+
+def _patch_key(patch, ax):
+    if isinstance(patch, FancyArrowPatch) or patch.get_hatch() \
+            or patch.get_transform() != patch.get_patch_transform() + ax.transData:
+        return None
+    common = _common_key(patch, ax)
+    if common is None:
+        return None
+    return ('patch',) + common + (patch.get_joinstyle(), patch.get_capstyle())
+
+
+def _line_key(line, ax):
+    if line.get_transform() != ax.transData \
+            or line.get_marker() not in (None, 'None', 'none', '', ' ') \
+            or line.get_drawstyle() != 'default' or line.get_gapcolor() is not None:
+        return None
+    common = _common_key(line, ax)
+    if common is None:
+        return None
+    if line.is_dashed():
+        style = (line.get_dash_joinstyle(), line.get_dash_capstyle())
+    else:
+        style = (line.get_solid_joinstyle(), line.get_solid_capstyle())
+    return ('line',) + common + style
+
+
+def _batch_key(artist, ax):
+    if isinstance(artist, Patch):
+        return _patch_key(artist, ax)
+    if isinstance(artist, Line2D):
+        return _line_key(artist, ax)
+    return None
+
+
+class PatchBatch(PathCollection):
+    """合并后的一组 Patch: 每个路径带着自己的 patch 变换
+
+    绘制时每个路径的变换矩阵是 patch 变换 + ax.transData, 和单独绘制
+    Patch 时的矩阵完全相同。先把路径变换到数据坐标再交给 transData 在
+    数学上等价, 但浮点舍入不同, 边线正好落在半像素上时吸附到另一行。
+    矩阵在绘制时才计算, 所以 tight_layout 之后、换 dpi 保存依然正确。
+    """
+
+    def __init__(self, paths, patch_transforms, **kwargs):
+        super().__init__(paths, transform=IdentityTransform(), **kwargs)
+        self._patch_transforms = patch_transforms
+
+    def get_transforms(self):
+        data = self.axes.transData
+        return np.array([(t + data).get_matrix() for t in self._patch_transforms])
+
+
+def _patch_collection(group, ax):
+    first = group[0]
+    coll = PatchBatch([p.get_path() for p in group], [p.get_patch_transform() for p in group],
+                      zorder=first.get_zorder())
+    coll.set_facecolor([p.get_facecolor() for p in group])
+    coll.set_edgecolor([p.get_edgecolor() for p in group])
+    # 边框透明或线型为 'None' 时 Patch 不描边
+    coll.set_linewidth([0 if p.get_edgecolor()[3] == 0 or p.get_linestyle() == 'None'
+                        else p.get_linewidth() for p in group])
+    coll.set_linestyle([p.get_linestyle() if p.get_linestyle() != 'None' else '-'
+                        for p in group])
+    coll.set_antialiased([p.get_antialiased() for p in group])
+    coll.set_joinstyle(first.get_joinstyle())
+    coll.set_capstyle(first.get_capstyle())
+    return coll
+
+
+def _line_collection(group, ax):
+    first = group[0]
+    key = _line_key(first, ax)
+    coll = LineCollection([line.get_xydata() for line in group],
+                          colors=[to_rgba(line.get_color(), line.get_alpha()) for line in group],
+                          linewidths=[line.get_linewidth() for line in group],
+                          linestyles=[line.get_linestyle() for line in group],
+                          antialiaseds=[line.get_antialiased() for line in group],
+                          zorder=first.get_zorder(), transform=ax.transData)
+    coll.set_joinstyle(key[-2])
+    coll.set_capstyle(key[-1])
+    return coll
+
+
+def _clip_state(artist):
+    return artist.get_clip_on(), artist.get_clip_box(), artist.get_clip_path()
+
+
+def _set_clip_state(artist, state):
+    """恢复裁剪设置: add_artist 会给没有裁剪路径的 artist 加上坐标区背景"""
+    clip_on, box, path = state
+    artist.set_clip_path(path)
+    artist.set_clip_box(box)
+    artist.set_clip_on(clip_on)
+
+
+def _finish(coll, first):
+    coll.set_snap(first.get_snap())
+    coll.set_rasterized(first.get_rasterized())
+    return coll
+
+
+def batch_artists(ax, min_batch=MIN_BATCH):
+    """把 ax 上绘制顺序相邻、可以合并的图元换成集合, 返回 (合并前, 合并后) 的 artist 数量"""
+    # 只处理用户添加的 artist, 坐标轴、标题、图例等不动
+    owned = {id(a) for group in (ax.patches, ax.lines, ax.texts, ax.collections,
+                                 ax.images, ax.artists) for a in group}
+    children = [a for a in ax.get_children() if id(a) in owned]
+    # Axes.draw 按 zorder 稳定排序, 这里得到的就是实际的绘制顺序
+    ordered = sorted(children, key=lambda a: a.get_zorder())
+
+    runs = []
+    for artist in ordered:
+        key = _batch_key(artist, ax)
+        if runs and key is not None and runs[-1][0] == key:
+            runs[-1][1].append(artist)
+        else:
+            runs.append((key, [artist]))
+
+    if all(key is None or len(group) < min_batch for key, group in runs):
+        return len(children), len(children)
+
+    # 按绘制顺序重新加入, 合并的组换成一个集合。用 add_artist 而不是
+    # add_patch/add_line: 坐标范围已经确定, 不需要再逐个更新数据范围
+    clips = {id(a): _clip_state(a) for a in ordered}
+    for artist in ordered:
+        artist.remove()
+    count = 0
+    for key, group in runs:
+        if key is None or len(group) < min_batch:
+            for artist in group:
+                ax.add_artist(artist)
+                _set_clip_state(artist, clips[id(artist)])
+                count += 1
+            continue
+        if key[0] == 'patch':
+            coll = _patch_collection(group, ax)
+        else:
+            coll = _line_collection(group, ax)
+        ax.add_artist(_finish(coll, group[0]))
+        # 同一组的裁剪路径都是坐标区背景 (_common_key), 沿用第一个的设置
+        _set_clip_state(coll, clips[id(group[0])])
+        count += 1
+    return len(children), count
+
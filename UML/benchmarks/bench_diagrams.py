@@ -0,0 +1,219 @@
+"""
+Minority Wins Game - 图表生成基准测试 (Diagram Benchmarks)
+
+对每个绘图函数在不同 dpi 和输出格式下计时, 报告中位数、p95 延迟和
+峰值内存, 并和保存的基线 (benchmarks/baseline.json) 比较, 变慢超过
+容差的用例标记为 FAIL, 退出码为 1。
+
+每个用例 (函数 × dpi × 格式) 在独立的子进程里运行: 先预热一次, 再
+重复计时; 峰值内存是该子进程的峰值 RSS, 互不影响。绘图函数直接调用,
+不经过渲染缓存。
+
+用法:
+    python UML/benchmarks/bench_diagrams.py                     # 全部用例, 与基线比较
+    python UML/benchmarks/bench_diagrams.py --dpi 72 --format png -k flow
+    python UML/benchmarks/bench_diagrams.py --save-baseline     # 更新基线
+
+基线和机器有关, 换机器后先用 --save-baseline 重新生成。
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+UML_DIR = os.path.dirname(BENCH_DIR)
+BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# 被测函数: 名称 -> (模块, 函数名)
+FUNCTIONS = {
+    'UML.draw_use_case_diagram': ('UML', 'draw_use_case_diagram'),
+    'UML4.draw_use_case_diagram': ('UML4', 'draw_use_case_diagram'),
+    'UML4.draw_wireframes': ('UML4', 'draw_wireframes'),
+    'UML4.draw_system_flow': ('UML4', 'draw_system_flow'),
+    'UML4.draw_architecture_diagram': ('UML4', 'draw_architecture_diagram'),
+}
+DPIS = [72, 150, 300]
+FORMATS = ['png', 'svg', 'pdf']
+
+
+def case_key(func, dpi, fmt):
+    return f"{func}@{dpi}.{fmt}"
+
+
+def percentile(values, p):
+    """最近秩法的百分位数"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+# ============= 子进程: 运行单个用例 (Worker) =============
+def _runner(func):
+    """返回 run(output, dpi), 把函数包装成统一的 "画一张图并保存" 调用"""
+    module_name, func_name = FUNCTIONS[func]
+    module = __import__(module_name)
+    draw = getattr(module, func_name)
+    if module_name == 'UML':
+        import matplotlib.pyplot as plt
+
+        def run(output, dpi):
+            fig, ax = draw()
+            fig.savefig(output, dpi=dpi, bbox_inches='tight')
+            plt.close(fig)
+        return run
+    if func_name == 'draw_wireframes':
+        # 单进程渲染六个界面, 计时不受 CPU 数量影响
+        return lambda output, dpi: draw(output, dpi, jobs=1)
+    return draw
+
+
+def run_case(func, dpi, fmt, repeat, warmup):
+    """在当前进程中运行一个用例, 返回计时结果 dict"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    sys.path.insert(0, UML_DIR)
+    import profiling
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w') as devnull:
+        output = os.path.join(tmp, f'out.{fmt}')
+        # 绘图函数会打印 "✓ ... saved", 计时时丢掉
+        with contextlib.redirect_stdout(devnull):
+            run = _runner(func)
+            for _ in range(warmup):
+                run(output, dpi)
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run(output, dpi)
+                times.append(time.perf_counter() - start)
+        size = os.path.getsize(output)
+    return {
+        'median': statistics.median(times),
+        'p95': percentile(times, 95),
+        'min': min(times),
+        'runs': len(times),
+        'peak_rss_mb': profiling.peak_rss_mb(),
+        'output_bytes': size,
+    }
+
+
+def spawn_case(func, dpi, fmt, repeat, warmup):
+    """在新的子进程中运行一个用例"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', func, str(dpi), fmt,
+           str(repeat), str(warmup)]
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONWARNINGS='ignore')
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else 'worker failed')
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ============= 基线比较 (Baseline) =============
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('cases', {})
+
+
+def save_baseline(path, results):
+    cases = load_baseline(path)
+    cases.update(results)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'python': sys.version.split()[0], 'platform': sys.platform,
+                   'cpus': os.cpu_count(), 'cases': dict(sorted(cases.items()))},
+                  f, indent=2)
+        f.write('\n')
+
+
+def compare(result, base, tolerance, slack, mem_tolerance):
+    """返回 (状态, 说明); 状态为 PASS / FAIL / NEW"""
+    if base is None:
+        return 'NEW', ''
+    limit = base['median'] * (1 + tolerance) + slack
+    change = result['median'] / base['median'] - 1 if base['median'] else 0.0
+    note = f"{change:+.0%}"
+    if result['median'] > limit:
+        return 'FAIL', f"{note} (median limit {limit:.3f}s)"
+    if base.get('peak_rss_mb') and result['peak_rss_mb'] \
+            and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + mem_tolerance):
+        return 'FAIL', f"{note}, memory {result['peak_rss_mb']:.0f}MB > {base['peak_rss_mb']:.0f}MB"
+    return 'PASS', note
+
+
+# ============= 主函数 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark UML diagram generation')
+    parser.add_argument('-k', '--filter', default='',
+                        help='only run functions whose name contains this text')
+    parser.add_argument('--dpi', type=int, nargs='+', default=DPIS, help='dpi values (default: 72 150 300)')
+    parser.add_argument('--format', nargs='+', default=FORMATS, choices=FORMATS, dest='formats',
+                        help='output formats (default: png svg pdf)')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='timed runs per case (default: 5)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs per case (default: 1)')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file (default: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these results as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown of the median (default: 0.25)')
+    parser.add_argument('--slack', type=float, default=0.05,
+                        help='allowed absolute slowdown in seconds, absorbs noise on fast cases (default: 0.05)')
+    parser.add_argument('--mem-tolerance', type=float, default=0.25,
+                        help='allowed relative growth of peak RSS (default: 0.25)')
+    parser.add_argument('--json', metavar='FILE', help='also write the results to FILE')
+    args = parser.parse_args(argv)
+
+    funcs = [f for f in FUNCTIONS if args.filter in f]
+    if not funcs:
+        parser.error(f"no function matches '{args.filter}'")
+    baseline = load_baseline(args.baseline)
+
+    print(f"⏱  Benchmarking {len(funcs)} function(s) × {len(args.dpi)} dpi × "
+          f"{len(args.formats)} format(s), {args.repeat} runs each")
+    print(f"{'case':<44} {'median':>8} {'p95':>8} {'peak MB':>8}  result")
+    results, failed = {}, []
+    for func in funcs:
+        for dpi in args.dpi:
+            for fmt in args.formats:
+                key = case_key(func, dpi, fmt)
+                try:
+                    result = spawn_case(func, dpi, fmt, args.repeat, args.warmup)
+                except RuntimeError as e:
+                    print(f"{key:<44} ❌ {e}")
+                    failed.append(key)
+                    continue
+                results[key] = result
+                if args.save_baseline:
+                    status, note = 'SAVED', ''
+                else:
+                    status, note = compare(result, baseline.get(key), args.tolerance,
+                                           args.slack, args.mem_tolerance)
+                if status == 'FAIL':
+                    failed.append(key)
+                print(f"{key:<44} {result['median']:>7.3f}s {result['p95']:>7.3f}s "
+                      f"{result['peak_rss_mb'] or 0:>8.0f}  {status} {note}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"📦 Baseline saved to '{args.baseline}' ({len(results)} cases)")
+    if failed:
+        print(f"❌ {len(failed)} case(s) failed: {', '.join(failed)}")
+        return 1
+    print("✅ All benchmark cases passed")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        func, dpi, fmt, repeat, warmup = sys.argv[2:7]
+        print(json.dumps(run_case(func, int(dpi), fmt, int(repeat), int(warmup))))
+        sys.exit(0)
+    sys.exit(main())
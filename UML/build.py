@@ -0,0 +1,183 @@
+"""
+Minority Wins Game - 增量构建 (Incremental Build)
+
+像 make 一样只重新生成依赖发生变化的图片。每张图片依赖:
+
+  * 源码: 绘图函数以及它引用到的模块级函数和常量
+  * 数据: specs/*.json 描述文件和 diagram_spec.py、batching.py 等辅助模块
+  * 字体: matplotlib 的字体列表缓存
+  * 设置: 输出格式、dpi、分块光栅化, 以及 matplotlib/numpy/pillow 和 Python 版本
+
+这些依赖的摘要就是渲染缓存键的各个部分 (render_cache.cache_key_components)。
+每次构建后记录在输出目录的 .uml-build.json 里, 下次构建逐项比较, 只重新
+渲染有变化或输出文件丢失、被改动的图表, 并打印每张图片跳过或重建的原因:
+
+    python -m diagrams build                  # 增量构建
+    python -m diagrams build -n               # 只显示会重建什么
+    python -m diagrams build --graph          # 打印依赖图
+"""
+import json
+import os
+import tempfile
+
+import diagrams
+import render_cache
+import UML4
+
+MANIFEST = '.uml-build.json'
+
+
+# ============= 依赖图 (Dependency Graph) =============
+def target(name):
+    """图表的构建目标: 绘图函数所在的源文件和函数名、输出文件、输入文件和设置"""
+    if name in UML4.DIAGRAMS:
+        return {
+            'module': UML4.__file__,
+            'function': UML4.DIAGRAMS[name][4].__name__,
+            'outputs': UML4.diagram_outputs(name),
+            'inputs': UML4.diagram_inputs(name),
+            'settings': UML4.diagram_settings(name),
+        }
+    output, _, _, module_path, func_name = diagrams.EXTRA_DIAGRAMS[name][2:]
+    return {
+        'module': module_path,
+        'function': func_name,
+        'outputs': [output],
+        'inputs': diagrams.extra_inputs(name),
+        'settings': None,
+    }
+
+
+def dependencies(name, dpi):
+    """图表当前依赖的摘要, 和渲染缓存键的组成部分相同"""
+    t = target(name)
+    components = render_cache.cache_key_components(
+        t['module'], t['function'], os.path.splitext(t['outputs'][0])[1], dpi,
+        t['inputs'], t['settings'])
+    # 经过一次 JSON 往返, 和清单里读回来的记录可以直接比较 (元组变成列表)
+    return json.loads(json.dumps(components))
+
+
+def format_graph(name, dpi):
+    """依赖图的文字形式, 每个依赖一行"""
+    t = target(name)
+    deps = dependencies(name, dpi)
+    helpers = [n for n in render_cache.function_dependencies(t['module'], t['function'])
+               if n != t['function']]
+    settings = ', '.join(f"{k}={v}" for k, v in sorted(deps['settings'].items()))
+    lines = [f"{t['outputs'][0]}" + (f" (+{len(t['outputs']) - 1} files)" if len(t['outputs']) > 1 else '')]
+    lines.append(f"  ├─ source   {deps['function']}" + (f" -> {', '.join(helpers)}" if helpers else ''))
+    lines.append(f"  ├─ inputs   {', '.join(sorted(deps['inputs'])) or '-'}")
+    lines.append(f"  ├─ fonts    {(deps['fonts'] or 'unknown')[:12]}")
+    lines.append(f"  ├─ settings {deps['format']} @ {deps['dpi']} dpi" + (f", {settings}" if settings else ''))
+    lines.append("  └─ versions " + ', '.join(f"{k} {v}" for k, v in deps['versions'].items())
+                 + f", python {'.'.join(map(str, deps['python']))}")
+    return '\n'.join(lines)
+
+
+# ============= 构建清单 (Manifest) =============
+def load_manifest(path=MANIFEST):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix='.build-', dir=directory)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _output_state(path):
+    """输出文件的 [大小, mtime], 不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def explain(old, new):
+    """比较上次构建和现在的依赖摘要, 返回变化的说明列表"""
+    reasons = []
+    if old.get('function') != new['function']:
+        reasons.append(f"draw function is now {new['function']}")
+    elif old.get('source') != new['source']:
+        reasons.append(f"source of {new['function']} changed")
+    old_inputs, new_inputs = old.get('inputs', {}), new['inputs']
+    for name in sorted(set(old_inputs) | set(new_inputs)):
+        if name not in old_inputs:
+            reasons.append(f"new input {name}")
+        elif name not in new_inputs:
+            reasons.append(f"{name} is no longer an input")
+        elif old_inputs[name] != new_inputs[name]:
+            reasons.append(f"{name} changed")
+    if old.get('fonts') != new['fonts']:
+        reasons.append("font list changed")
+    for key in ('format', 'dpi', 'settings', 'python'):
+        if old.get(key) != new[key]:
+            reasons.append(f"{key} {old.get(key)} -> {new[key]}")
+    old_versions = old.get('versions', {})
+    for package, version in new['versions'].items():
+        if old_versions.get(package) != version:
+            reasons.append(f"{package} {old_versions.get(package)} -> {version}")
+    return reasons
+
+
+def outdated(name, components, manifest):
+    """需要重建的原因列表; 空列表表示输出是最新的"""
+    record = manifest.get(name)
+    if record is None:
+        return ['no previous build']
+    reasons = []
+    for path in target(name)['outputs']:
+        state = _output_state(path)
+        if state is None:
+            reasons.append(f"{path} is missing")
+        elif record['outputs'].get(path) != state:
+            reasons.append(f"{path} was modified")
+    return reasons + explain(record['components'], components)
+
+
+# ============= 构建 (Build) =============
+def build(names, dpi=300, jobs=1, use_cache=True, force=False, dry_run=False, show_skipped=True):
+    """增量构建 names 中的图表, 返回实际重建的 {name: (耗时, 错误, 命中缓存)}
+
+    show_skipped 为 False 时不打印跳过的图表 (监视模式下每次都打印太吵)。
+    """
+    manifest = load_manifest()
+    stale = {}
+    for name in names:
+        components = dependencies(name, dpi)
+        output = target(name)['outputs'][0]
+        reasons = ['forced rebuild'] if force else outdated(name, components, manifest)
+        if reasons:
+            print(f"🔨 {output}: {'; '.join(reasons)}")
+            stale[name] = components
+        elif show_skipped:
+            inputs = ', '.join(sorted(components['inputs']))
+            print(f"⚡ skip {output}: up to date ({components['function']}, {inputs}, "
+                  f"fonts and settings unchanged)")
+    if dry_run or not stale:
+        return {}
+
+    uml4_names = [name for name in stale if name in UML4.DIAGRAMS]
+    results = UML4.render_all(uml4_names, jobs, dpi, use_cache) if uml4_names else {}
+    for name in stale:
+        if name in diagrams.EXTRA_DIAGRAMS:
+            results[name] = diagrams.render_extra(name, dpi, use_cache)
+
+    # 只记录成功的图表, 失败的下次还会重建
+    manifest = load_manifest()
+    for name, components in stale.items():
+        if results[name][1] is None:
+            manifest[name] = {
+                'components': components,
+                'outputs': {path: _output_state(path) for path in target(name)['outputs']},
+            }
+    save_manifest(manifest)
+    return results
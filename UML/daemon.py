@@ -0,0 +1,337 @@
+"""
+Minority Wins Game - 常驻渲染服务 (Render Daemon)
+
+构建脚本一次流水线里要多次调用图表生成器, 每次都要付出 Python 启动和
+导入 matplotlib 的冷启动时间。这个守护进程只加载一次 UML4 的绘图函数,
+通过 Unix 域套接字接收渲染任务, 在预热好的进程池里执行:
+
+    python daemon.py serve -w 2 &               # 启动服务
+    python daemon.py system_flow --dpi 150      # 客户端, 用法和 python UML4.py 相同
+    python daemon.py use_case --stdout > a.png  # 直接取回图片字节
+    python daemon.py status / stop
+
+客户端只导入标准库, 连接不上时会自动在后台启动服务 (--no-spawn 关闭)。
+
+协议: 每行一个 JSON 请求, 每行一个 JSON 回复::
+
+    {"op": "render", "diagram": "system_flow", "format": "png", "dpi": 150,
+     "cwd": "/path", "output": null, "overrides": {"font.size": 9},
+     "cache": true, "return": "path"}
+    -> {"ok": true, "diagram": "system_flow", "outputs": ["/path/system_flow_diagram.png"],
+        "elapsed": 0.41, "cached": false}
+
+"return": "bytes" 时回复里带 "data": {文件名: base64}, 没有指定 output
+的话文件写在临时目录, 读取后删除。其他操作: ping、list、shutdown。
+"""
+import argparse
+import base64
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FORMATS = ('png', 'svg', 'pdf')
+# 客户端自动启动服务后最多等这么久 (秒)
+SPAWN_TIMEOUT = 30
+
+
+def default_socket_path():
+    """套接字路径: 环境变量 UML_DAEMON_SOCKET, 否则是临时目录下每个用户一个"""
+    return os.environ.get('UML_DAEMON_SOCKET') or os.path.join(
+        tempfile.gettempdir(), f'uml-render-{os.getuid()}.sock')
+
+
+# ============= 服务端 (Server) =============
+def _warm_worker():
+    """进程池初始化: 导入绘图模块并预热字体"""
+    sys.path.insert(0, HERE)
+    import UML4
+    UML4.warm_up()
+
+
+def _render_job(name, dpi, use_cache, output, overrides):
+    """工作进程中执行的任务"""
+    import UML4
+    # 守护进程的进程池已经占满 CPU, 原型图的各个界面在这个进程里按顺序渲染
+    return UML4.render_diagram(name, dpi, use_cache, False, output, overrides, jobs=1)
+
+
+def serve(path=None, workers=None):
+    import socketserver
+    import threading
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    import UML4
+
+    path = path or default_socket_path()
+    workers = workers or os.cpu_count() or 1
+    UML4.warm_up()
+
+    class RenderServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self):
+            self.started = time.time()
+            self.jobs_done = 0
+            self.lock = threading.Lock()
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+            # 在开始接受连接 (启动线程) 之前就把工作进程创建并预热好
+            self.pool.submit(int).result()
+            # 服务会以当前用户的权限写文件, 只允许当前用户连接: bind 时就用 0600
+            # 创建套接字文件, 不留 bind 之后再 chmod 的空档
+            umask = os.umask(0o177)
+            try:
+                super().__init__(path, Handler)
+            finally:
+                os.umask(umask)
+
+        def submit(self, *args):
+            try:
+                return self.pool.submit(_render_job, *args).result()
+            except BrokenProcessPool:
+                # 工作进程崩溃 (例如被 OOM killer 杀掉), 换一个新的进程池
+                with self.lock:
+                    self.pool.shutdown(wait=False)
+                    self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+                raise
+
+        def dispatch(self, request):
+            op = request.get('op', 'render')
+            if op == 'ping':
+                return {'ok': True, 'pid': os.getpid(), 'workers': workers,
+                        'uptime': time.time() - self.started, 'jobs_done': self.jobs_done}
+            if op == 'list':
+                return {'ok': True, 'diagrams': {name: list(entry[:4])
+                                                 for name, entry in UML4.DIAGRAMS.items()}}
+            if op == 'shutdown':
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {'ok': True}
+            if op == 'render':
+                return self.render(request)
+            raise ValueError(f"unknown op '{op}'")
+
+        def render(self, request):
+            name = request.get('diagram')
+            if name not in UML4.DIAGRAMS:
+                raise ValueError(f"unknown diagram '{name}', expected one of: {', '.join(UML4.DIAGRAMS)}")
+            fmt = request.get('format') or 'png'
+            if fmt not in FORMATS:
+                raise ValueError(f"unsupported format '{fmt}', expected one of: {', '.join(FORMATS)}")
+            dpi = int(request.get('dpi') or 300)
+            overrides = request.get('overrides') or None
+            if overrides is not None and not isinstance(overrides, dict):
+                raise ValueError("overrides must be an object of rcParams")
+            want_bytes = request.get('return') == 'bytes'
+
+            tmp = None
+            output = request.get('output')
+            if output:
+                output = os.path.join(request.get('cwd') or os.getcwd(), output)
+            elif want_bytes:
+                tmp = tempfile.mkdtemp(prefix='uml-render-')
+                output = os.path.join(tmp, f"{name}.{fmt}")
+            else:
+                default = os.path.splitext(UML4.DIAGRAMS[name][2])[0] + '.' + fmt
+                output = os.path.join(request.get('cwd') or os.getcwd(), default)
+            try:
+                _, elapsed, error, hit, _ = self.submit(name, dpi, request.get('cache', True),
+                                                        output, overrides)
+                with self.lock:
+                    self.jobs_done += 1
+                reply = {'ok': error is None, 'diagram': name, 'elapsed': elapsed, 'cached': hit,
+                         'outputs': UML4.diagram_outputs(name, output)}
+                if error:
+                    reply['error'] = error
+                elif want_bytes:
+                    data = {}
+                    for out in reply['outputs']:
+                        with open(out, 'rb') as f:
+                            data[os.path.basename(out)] = base64.b64encode(f.read()).decode('ascii')
+                    reply['data'] = data
+                if tmp:
+                    del reply['outputs']
+                return reply
+            finally:
+                if tmp:
+                    shutil.rmtree(tmp, ignore_errors=True)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            # 一个连接上可以依次发送多个请求
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    reply = self.server.dispatch(json.loads(line))
+                except Exception as e:
+                    reply = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+    if os.path.exists(path):
+        try:
+            request({'op': 'ping'}, path)
+        except OSError:
+            os.remove(path)  # 上次没有正常退出留下的套接字文件
+        else:
+            print(f"❌ a render daemon is already listening on {path}")
+            return 1
+
+    server = RenderServer()
+    print(f"🚀 Render daemon listening on {path} (pid {os.getpid()}, {workers} workers)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.shutdown(wait=True, cancel_futures=True)
+        if os.path.exists(path):
+            os.remove(path)
+    print("👋 Render daemon stopped", flush=True)
+    return 0
+
+
+# ============= 客户端 (Client) =============
+def request(message, path=None, timeout=None):
+    """发送一个请求, 返回回复的 dict; 连接不上时抛出 OSError"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path or default_socket_path())
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError('render daemon closed the connection')
+    return json.loads(line)
+
+
+def spawn(path, workers=None):
+    """在后台启动服务, 等它开始监听; 输出写到套接字旁边的 .log 文件"""
+    cmd = [sys.executable, os.path.abspath(__file__), 'serve', '--socket', path]
+    if workers:
+        cmd += ['-w', str(workers)]
+    with open(path + '.log', 'ab') as log:
+        subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                         cwd=HERE, start_new_session=True)
+    deadline = time.time() + SPAWN_TIMEOUT
+    while time.time() < deadline:
+        try:
+            return request({'op': 'ping'}, path, timeout=1)
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"render daemon did not start within {SPAWN_TIMEOUT}s, see {path}.log")
+
+
+def _connect(args):
+    """确认服务在运行, 必要时自动启动"""
+    try:
+        return request({'op': 'ping'}, args.socket)
+    except OSError:
+        if args.no_spawn:
+            raise
+        print(f"🚀 Starting render daemon on {args.socket}...", file=sys.stderr)
+        return spawn(args.socket, args.workers)
+
+
+def cmd_render(args):
+    """和 python UML4.py 相同的用法, 渲染交给守护进程"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        _connect(args)
+    except OSError as e:
+        print(f"❌ render daemon is not running ({e}); start it with: python daemon.py serve")
+        return 1
+    names = args.diagrams or list(request({'op': 'list'}, args.socket)['diagrams'])
+    overrides = dict(item.split('=', 1) for item in args.rc)
+    base = {'op': 'render', 'dpi': args.dpi, 'format': args.format, 'cwd': os.getcwd(),
+            'cache': not args.no_cache, 'overrides': overrides or None}
+    if args.stdout:
+        if len(names) != 1:
+            print("❌ --stdout needs exactly one diagram", file=sys.stderr)
+            return 2
+        message = dict(base, diagram=names[0], output=args.output)
+        message['return'] = 'bytes'
+        reply = request(message, args.socket)
+        if not reply['ok']:
+            print(f"❌ {names[0]}: {reply['error']}", file=sys.stderr)
+            return 1
+        # 第一个文件是主输出
+        sys.stdout.buffer.write(base64.b64decode(next(iter(reply['data'].values()))))
+        return 0
+
+    start = time.perf_counter()
+    # 每个图表一个连接, 服务端在进程池里并行渲染
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        replies = list(pool.map(lambda name: request(dict(base, diagram=name, output=args.output),
+                                                     args.socket), names))
+    failed = 0
+    for name, reply in zip(names, replies):
+        if reply['ok']:
+            print(f"✓ {name}: {reply['elapsed']:.2f}s{' (cached)' if reply['cached'] else ''}"
+                  f" -> {os.path.relpath(reply['outputs'][0])}")
+        else:
+            failed += 1
+            print(f"❌ {name}: {reply['error']}")
+    print(f"⏱  Total: {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(prog='daemon.py',
+                                     description='Minority Wins Game render daemon and client')
+    parser.add_argument('--socket', default=default_socket_path(),
+                        help='Unix socket path (default: $UML_DAEMON_SOCKET or a per-user temp file)')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='worker processes when starting the daemon (default: one per CPU)')
+
+    if argv[:1] == ['serve']:
+        args = parser.parse_args(argv[1:])
+        return serve(args.socket, args.workers)
+    if argv[:1] in (['stop'], ['status']):
+        args = parser.parse_args(argv[1:])
+        try:
+            reply = request({'op': 'shutdown' if argv[0] == 'stop' else 'ping'}, args.socket)
+        except OSError:
+            print(f"💤 no render daemon on {args.socket}")
+            return 1
+        if argv[0] == 'stop':
+            print("👋 Render daemon stopping")
+        else:
+            print(f"✅ pid {reply['pid']}, {reply['workers']} workers, "
+                  f"up {reply['uptime']:.0f}s, {reply['jobs_done']} jobs done")
+        return 0
+
+    parser.add_argument('diagrams', nargs='*', metavar='DIAGRAM',
+                        help='diagrams to render (default: all)')
+    parser.add_argument('-j', '--jobs', type=int, help='accepted for compatibility with UML4.py; '
+                        "the daemon's pool size applies")
+    parser.add_argument('--dpi', type=int, default=300, help='output resolution (default: 300)')
+    parser.add_argument('--format', choices=FORMATS, default='png', help='output format (default: png)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always re-render, ignoring the render cache')
+    parser.add_argument('--rc', action='append', default=[], metavar='KEY=VALUE',
+                        help='matplotlib rcParams override for this render, may be repeated')
+    parser.add_argument('-o', '--output', help='output file (only with a single diagram)')
+    parser.add_argument('--stdout', action='store_true',
+                        help='write the image bytes of a single diagram to stdout')
+    parser.add_argument('--no-spawn', action='store_true',
+                        help='fail instead of starting the daemon when it is not running')
+    args = parser.parse_args(argv)
+    if args.output and len(args.diagrams) != 1:
+        parser.error('--output needs exactly one diagram')
+    if any('=' not in item for item in args.rc):
+        parser.error('--rc expects KEY=VALUE')
+    return cmd_render(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
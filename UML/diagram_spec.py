@@ -0,0 +1,637 @@
+"""
+Minority Wins Game - 图表描述文件 (Diagram Spec)
+
+把原来写死在绘图函数里的坐标、用例列表和关系放到 specs/*.json
+(安装了 PyYAML 时也可以用 .yaml), 解析并校验一次后编译成紧凑的
+渲染计划 (Plan): 一串只包含基本绘图指令的元组。同一个计划可以反复
+渲染, 不需要重新解析或校验。
+
+描述文件结构::
+
+    {
+      "name": "system_flow",
+      "figure": {"size": [16, 20], "xlim": [0, 16], "ylim": [0, 20]},
+      "styles": {"flow": {"color": "#424242", "linewidth": 2}},
+      "elements": [
+        {"type": "box", "xy": [5.5, 16.5], "width": 5, "height": 0.8,
+         "text": "Owner: Start New Game\\nstartGame()"},
+        {"type": "arrow", "style": "flow", "from": [8, 17.6], "to": [8, 17.3]},
+        ...
+      ]
+    }
+
+元素可以用 "style" 引用 styles 里的一个或多个命名样式, 元素自身的字段
+优先 (斜体等字体样式用 "fontstyle", "style" 只用来引用命名样式); 带 "items" 的元素会展开成多个元素, 每一项覆盖公共字段。
+元素类型见 ELEMENT_FIELDS。
+
+用法:
+    plan = load_plan(spec_path('system_flow'))
+    fig = build_figure(plan)
+"""
+import json
+import os
+from collections import namedtuple
+
+import render_cache
+import routing
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'specs')
+
+
+class SpecError(ValueError):
+    """描述文件格式错误, 消息里带有出错元素的位置"""
+
+
+# 编译后的渲染计划
+# figure: (figsize, xlim, ylim, aspect, axis_on)
+# ops: ((opcode, args, kwargs), ...); opcode 是 text/patch/plot/arrow/annotate/actor/legend/title
+# (connector 编译时就布好线, 变成 plot + arrow)
+Plan = namedtuple('Plan', ['name', 'figure', 'ops'])
+
+
+# ============= 字段定义 (Schema) =============
+NUMBER = 'number'
+POINT = 'point'
+POINTS = 'points'
+STRING = 'string'
+NUMBERS = 'numbers'
+STRINGS = 'strings'
+MAPPING = 'mapping'
+LIST = 'list'
+ANY = 'any'
+
+TEXT_KEYS = {
+    'fontsize': NUMBER, 'weight': STRING, 'fontweight': STRING, 'ha': STRING,
+    'va': STRING, 'color': STRING, 'fontstyle': STRING, 'family': STRING,
+    'bbox': MAPPING, 'zorder': NUMBER, 'alpha': NUMBER,
+}
+PATCH_KEYS = {
+    'facecolor': STRING, 'edgecolor': STRING, 'color': STRING, 'linewidth': NUMBER,
+    'linestyle': STRING, 'alpha': NUMBER, 'zorder': NUMBER,
+}
+LINE_KEYS = {
+    'fmt': STRING, 'color': STRING, 'linewidth': NUMBER, 'linestyle': STRING,
+    'alpha': NUMBER, 'zorder': NUMBER,
+}
+ARROW_KEYS = {
+    'arrowstyle': STRING, 'mutation_scale': NUMBER, 'color': STRING,
+    'linewidth': NUMBER, 'linestyle': STRING, 'zorder': NUMBER,
+}
+
+# type -> (必填字段, 可选字段)
+ELEMENT_FIELDS = {
+    'text': ({'at': POINT, 'text': STRING}, TEXT_KEYS),
+    'rectangle': ({'xy': POINT, 'width': NUMBER, 'height': NUMBER}, PATCH_KEYS),
+    'fancy_box': ({'xy': POINT, 'width': NUMBER, 'height': NUMBER},
+                  dict(PATCH_KEYS, boxstyle=STRING)),
+    'ellipse': ({'center': POINT, 'width': NUMBER, 'height': NUMBER}, PATCH_KEYS),
+    'circle': ({'center': POINT, 'radius': NUMBER}, dict(PATCH_KEYS, id=STRING)),
+    'line': ({'x': NUMBERS, 'y': NUMBERS}, LINE_KEYS),
+    'arrow': ({'from': POINT, 'to': POINT},
+              dict(ARROW_KEYS, label=STRING, label_offset=POINT, label_style=MAPPING)),
+    # 流程图: 连接两个带 id 的框/判断框/圆, 自动布正交连线 (见 routing.py)
+    'connector': ({'from': STRING, 'to': STRING},
+                  dict(ARROW_KEYS, label=STRING, label_offset=POINT, label_style=MAPPING)),
+    # 流程图: 圆角框 + 逐行居中的粗体文字
+    'box': ({'xy': POINT, 'width': NUMBER, 'height': NUMBER, 'text': STRING},
+            {'id': STRING, 'facecolor': STRING, 'edgecolor': STRING, 'boxstyle': STRING,
+             'linewidth': NUMBER, 'line_spacing': NUMBER, 'text_style': MAPPING}),
+    # 流程图: 判断框, 多行文字作为一个整体居中
+    'decision': ({'xy': POINT, 'width': NUMBER, 'height': NUMBER, 'text': STRING},
+                 {'id': STRING, 'facecolor': STRING, 'edgecolor': STRING, 'boxstyle': STRING,
+                  'linewidth': NUMBER, 'text_style': MAPPING}),
+    # 用例图: 小人图标, figure 选择 UML4 (simple) 或 UML.py (classic) 的画法
+    'actor': ({'at': POINT, 'label': STRING},
+              {'id': STRING, 'figure': STRING, 'head': MAPPING, 'limb': MAPPING,
+               'label_offset': NUMBER, 'label_style': MAPPING}),
+    # 用例图: 椭圆 + 标签, 标签按行使用 lines 里对应的偏移和样式
+    'use_case': ({'at': POINT, 'width': NUMBER, 'height': NUMBER, 'label': STRING},
+                 dict(PATCH_KEYS, id=STRING, lines=LIST)),
+    # 用例图: 连接两个带 id 的元素, 可选箭头; via 是中间的折点 (自动布局时绕开其他用例)
+    'association': ({'from': STRING, 'to': STRING},
+                    {'from_offset': POINT, 'to_offset': POINT, 'via': POINTS, 'line': MAPPING,
+                     'head': MAPPING}),
+    # 架构图: 服务框 + 组件列表
+    'service': ({'xy': POINT, 'width': NUMBER, 'height': NUMBER, 'title': STRING,
+                 'components': STRINGS},
+                {'facecolor': STRING, 'edgecolor': STRING}),
+    # 架构图: 数据库圆柱
+    'database': ({'xy': POINT, 'width': NUMBER, 'height': NUMBER, 'title': STRING},
+                 {'facecolor': STRING, 'edgecolor': STRING}),
+    'legend': ({'handles': LIST},
+               {'loc': STRING, 'bbox_to_anchor': NUMBERS, 'fontsize': NUMBER,
+                'framealpha': NUMBER}),
+    'title': ({'text': STRING}, {'fontsize': NUMBER, 'fontweight': STRING, 'pad': NUMBER}),
+}
+
+SPEC_KEYS = {'name', 'title', 'description', 'figure', 'styles', 'elements'}
+FIGURE_FIELDS = {'size': POINT, 'xlim': POINT, 'ylim': POINT, 'aspect': STRING, 'axis': ANY}
+LEGEND_HANDLE_KINDS = {'line': LINE_KEYS, 'patch': PATCH_KEYS}
+
+# 各种元素的默认样式, 与原来 UML4.py / UML.py 里辅助函数的默认值一致
+DEFAULTS = {
+    'arrow': {'arrowstyle': '->', 'mutation_scale': 20, 'label_offset': [0, 0]},
+    'connector': {'arrowstyle': '->', 'mutation_scale': 20, 'label_offset': [0, 0]},
+    'box': {'facecolor': '#E3F2FD', 'edgecolor': '#1976D2', 'boxstyle': 'round,pad=0.1',
+            'linewidth': 2, 'line_spacing': 0.3},
+    'decision': {'facecolor': '#FFF9C4', 'edgecolor': '#F57C00', 'boxstyle': 'round,pad=0.05',
+                 'linewidth': 2},
+    'actor': {'figure': 'simple', 'head': {}, 'limb': {'fmt': 'k-', 'linewidth': 2}},
+    'service': {'facecolor': '#E3F2FD', 'edgecolor': '#1976D2'},
+    'database': {'facecolor': '#C8E6C9', 'edgecolor': '#4CAF50'},
+    'association': {'from_offset': [0, 0], 'to_offset': [0, 0], 'line': {'fmt': 'k-'}},
+}
+
+BOX_TEXT = {'fontsize': 9, 'ha': 'center', 'va': 'center', 'weight': 'bold'}
+
+# connector 可以连接的图形, 也是布线时要绕开的障碍物
+ROUTABLE = ('box', 'decision', 'circle')
+
+
+# ============= 读取与校验 (Parse & Validate) =============
+def spec_path(name):
+    """specs 目录下某个图表的描述文件路径, 优先 .json"""
+    for ext in ('.json', '.yaml', '.yml'):
+        path = os.path.join(SPEC_DIR, name + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"no spec named '{name}' in {SPEC_DIR}")
+
+
+def load_spec(path):
+    """读取 JSON/YAML 描述文件, 返回原始 dict (不做校验)"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            # YAML 是可选的, 只在读取 .yaml 描述文件时才导入
+            try:
+                import yaml
+            except ImportError:
+                raise SpecError(f"{path}: reading YAML specs requires PyYAML (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _check(value, kind, where):
+    if kind == ANY:
+        return
+    if kind == NUMBER:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif kind == POINT:
+        ok = (isinstance(value, list) and len(value) == 2
+              and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value))
+    elif kind == POINTS:
+        ok = isinstance(value, list) and all(
+            isinstance(p, list) and len(p) == 2
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in p) for p in value)
+    elif kind == NUMBERS:
+        ok = isinstance(value, list) and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)
+    elif kind == STRINGS:
+        ok = isinstance(value, list) and all(isinstance(v, str) for v in value)
+    elif kind == STRING:
+        ok = isinstance(value, str)
+    elif kind == MAPPING:
+        ok = isinstance(value, dict)
+    elif kind == LIST:
+        ok = isinstance(value, list)
+    else:
+        raise AssertionError(kind)
+    if not ok:
+        raise SpecError(f"{where}: expected {kind}, got {value!r}")
+
+
+def _check_fields(data, required, optional, where):
+    for key, kind in required.items():
+        if key not in data:
+            raise SpecError(f"{where}: missing field '{key}'")
+        _check(data[key], kind, f"{where}.{key}")
+    for key, value in data.items():
+        if key in required:
+            continue
+        if key not in optional:
+            raise SpecError(f"{where}: unknown field '{key}'")
+        _check(value, optional[key], f"{where}.{key}")
+
+
+def _expand(spec, where):
+    """展开 style 引用和 items 分组, 返回 [(位置, 元素 dict)]"""
+    styles = spec.get('styles', {})
+    if not isinstance(styles, dict):
+        raise SpecError(f"{where}.styles: expected mapping")
+    elements = spec.get('elements')
+    if not isinstance(elements, list):
+        raise SpecError(f"{where}: missing list field 'elements'")
+
+    expanded = []
+    for i, element in enumerate(elements):
+        loc = f"{where}.elements[{i}]"
+        if not isinstance(element, dict):
+            raise SpecError(f"{loc}: expected mapping")
+        items = element.get('items')
+        base = {k: v for k, v in element.items() if k != 'items'}
+        if items is None:
+            group = [(loc, base)]
+        elif isinstance(items, list):
+            group = []
+            for j, item in enumerate(items):
+                if not isinstance(item, dict):
+                    raise SpecError(f"{loc}.items[{j}]: expected mapping")
+                group.append((f"{loc}.items[{j}]", dict(base, **item)))
+        else:
+            raise SpecError(f"{loc}.items: expected list")
+
+        for item_loc, item in group:
+            names = item.pop('style', [])
+            names = [names] if isinstance(names, str) else names
+            merged = dict(DEFAULTS.get(item.get('type'), {}))
+            for name in names:
+                if name not in styles:
+                    raise SpecError(f"{item_loc}: unknown style '{name}'")
+                merged.update(styles[name])
+            merged.update(item)
+            expanded.append((f"{item_loc} ({merged.get('type')})", merged))
+    return expanded
+
+
+def validate_spec(spec, where='spec'):
+    """校验整个描述文件, 返回展开后的 [(位置, 元素)]; 出错时抛出 SpecError"""
+    if not isinstance(spec, dict):
+        raise SpecError(f"{where}: expected a mapping at top level")
+    unknown = sorted(set(spec) - SPEC_KEYS)
+    if unknown:
+        raise SpecError(f"{where}: unknown top-level field(s) {', '.join(unknown)}")
+    if not isinstance(spec.get('name'), str):
+        raise SpecError(f"{where}: missing string field 'name'")
+    figure = spec.get('figure')
+    if not isinstance(figure, dict):
+        raise SpecError(f"{where}: missing mapping field 'figure'")
+    _check_fields(figure, {'size': POINT, 'xlim': POINT, 'ylim': POINT},
+                  FIGURE_FIELDS, f"{where}.figure")
+
+    elements = _expand(spec, where)
+    ids = {}
+    for loc, element in elements:
+        kind = element.get('type')
+        if kind not in ELEMENT_FIELDS:
+            raise SpecError(f"{loc}: unknown element type {kind!r}")
+        required, optional = ELEMENT_FIELDS[kind]
+        _check_fields({k: v for k, v in element.items() if k != 'type'},
+                      required, optional, loc)
+        if 'id' in element:
+            if element['id'] in ids:
+                raise SpecError(f"{loc}: duplicate id '{element['id']}'")
+            ids[element['id']] = element
+        if kind == 'actor' and element['figure'] not in ACTOR_FIGURES:
+            raise SpecError(f"{loc}: unknown actor figure '{element['figure']}'")
+        if kind == 'legend':
+            for j, handle in enumerate(element['handles']):
+                hloc = f"{loc}.handles[{j}]"
+                if not isinstance(handle, dict) or handle.get('kind') not in LEGEND_HANDLE_KINDS:
+                    raise SpecError(f"{hloc}: expected a line or patch handle")
+                _check_fields({k: v for k, v in handle.items() if k != 'kind'},
+                              {'label': STRING}, LEGEND_HANDLE_KINDS[handle['kind']], hloc)
+        if kind == 'use_case':
+            for j, line in enumerate(element.get('lines', [])):
+                _check(line, MAPPING, f"{loc}.lines[{j}]")
+                _check_fields(line, {}, dict(TEXT_KEYS, dy=NUMBER), f"{loc}.lines[{j}]")
+
+    for loc, element in elements:
+        if element['type'] in ('association', 'connector'):
+            for end in ('from', 'to'):
+                if element[end] not in ids:
+                    raise SpecError(f"{loc}: {end} refers to unknown id '{element[end]}'")
+                if element['type'] == 'connector' and ids[element[end]]['type'] not in ROUTABLE:
+                    raise SpecError(f"{loc}: {end} must be a {'/'.join(ROUTABLE)}, "
+                                    f"'{element[end]}' is a {ids[element[end]]['type']}")
+    return elements, ids
+
+
+# ============= 编译 (Compile) =============
+def _text(x, y, s, style):
+    return ('text', (x, y, s), dict(style))
+
+
+def _patch(cls, args, style):
+    return ('patch', (cls, tuple(args)), dict(style))
+
+
+def _plot(xs, ys, style):
+    style = dict(style)
+    fmt = style.pop('fmt', None)
+    return ('plot', (tuple(xs), tuple(ys)) + ((fmt,) if fmt else ()), style)
+
+
+def _pick(element, keys):
+    return {k: element[k] for k in keys if k in element}
+
+
+def _actor_simple(x, y):
+    """UML4 的小人: 躯干、水平双臂、两条腿"""
+    return [([x, x], [y - 0.3, y - 1.2]),
+            ([x - 0.3, x + 0.3], [y - 0.8, y - 0.8]),
+            ([x, x - 0.3], [y - 1.2, y - 1.8]),
+            ([x, x + 0.3], [y - 1.2, y - 1.8])]
+
+
+def _actor_classic(x, y):
+    """UML.py 的小人: 躯干、下垂的双臂、两条腿"""
+    return [([x, x], [y - 0.3, y - 0.8]),
+            ([x, x - 0.3], [y - 0.4, y - 0.6]),
+            ([x, x + 0.3], [y - 0.4, y - 0.6]),
+            ([x, x - 0.2], [y - 0.8, y - 1.2]),
+            ([x, x + 0.2], [y - 0.8, y - 1.2])]
+
+
+ACTOR_FIGURES = {'simple': _actor_simple, 'classic': _actor_classic}
+
+
+def _compile_element(element, ids):
+    kind = element['type']
+    if kind == 'text':
+        return [_text(*element['at'], element['text'], _pick(element, TEXT_KEYS))]
+    if kind == 'rectangle':
+        return [_patch('Rectangle', (element['xy'], element['width'], element['height']),
+                       _pick(element, PATCH_KEYS))]
+    if kind == 'fancy_box':
+        style = _pick(element, PATCH_KEYS)
+        if 'boxstyle' in element:
+            style['boxstyle'] = element['boxstyle']
+        return [_patch('FancyBboxPatch', (element['xy'], element['width'], element['height']), style)]
+    if kind == 'ellipse':
+        return [_patch('Ellipse', (element['center'], element['width'], element['height']),
+                       _pick(element, PATCH_KEYS))]
+    if kind == 'circle':
+        return [_patch('Circle', (element['center'], element['radius']), _pick(element, PATCH_KEYS))]
+    if kind == 'line':
+        return [_plot(element['x'], element['y'], _pick(element, LINE_KEYS))]
+    if kind == 'arrow':
+        ops = [('arrow', (tuple(element['from']), tuple(element['to'])), _pick(element, ARROW_KEYS))]
+        if element.get('label'):
+            (x1, y1), (x2, y2) = element['from'], element['to']
+            dx, dy = element['label_offset']
+            ops.append(_text((x1 + x2) / 2 + dx, (y1 + y2) / 2 + dy, element['label'],
+                             element.get('label_style', {})))
+        return ops
+    if kind == 'box':
+        (x, y), w, h = element['xy'], element['width'], element['height']
+        ops = [_patch('FancyBboxPatch', ((x, y), w, h),
+                      {'boxstyle': element['boxstyle'], 'facecolor': element['facecolor'],
+                       'edgecolor': element['edgecolor'], 'linewidth': element['linewidth']})]
+        lines = element['text'].split('\n')
+        spacing = element['line_spacing']
+        y_text = y + h / 2 + spacing / 2 * (len(lines) - 1)
+        for line in lines:
+            ops.append(_text(x + w / 2, y_text, line, dict(BOX_TEXT, **element.get('text_style', {}))))
+            y_text -= spacing
+        return ops
+    if kind == 'decision':
+        (x, y), w, h = element['xy'], element['width'], element['height']
+        return [_patch('FancyBboxPatch', ((x, y), w, h),
+                       {'boxstyle': element['boxstyle'], 'facecolor': element['facecolor'],
+                        'edgecolor': element['edgecolor'], 'linewidth': element['linewidth']}),
+                _text(x + w / 2, y + h / 2, element['text'],
+                      dict(BOX_TEXT, **element.get('text_style', {})))]
+    if kind == 'actor':
+        # 小人本身是一个图标 (见 icons.py), 只光栅化一次; 标签仍然是文字
+        x, y = element['at']
+        ops = [('actor', (element['figure'], x, y), {'head': dict(element['head']), 'limb': dict(element['limb'])})]
+        offset = element.get('label_offset', 2.2)
+        ops.append(_text(x, y - offset, element['label'], element.get('label_style', {})))
+        return ops
+    if kind == 'use_case':
+        (x, y) = element['at']
+        ops = [_patch('Ellipse', ((x, y), element['width'], element['height']),
+                      _pick(element, PATCH_KEYS))]
+        styles = element.get('lines') or [{'ha': 'center', 'va': 'center'}]
+        for line, style in zip(element['label'].split('\n'), styles):
+            style = dict(style)
+            dy = style.pop('dy', 0)
+            ops.append(_text(x, y + dy, line, style))
+        return ops
+    if kind == 'association':
+        (x1, y1), (x2, y2) = ids[element['from']]['at'], ids[element['to']]['at']
+        x1, y1 = x1 + element['from_offset'][0], y1 + element['from_offset'][1]
+        x2, y2 = x2 + element['to_offset'][0], y2 + element['to_offset'][1]
+        via = element.get('via', [])
+        ops = [_plot([x1] + [p[0] for p in via] + [x2], [y1] + [p[1] for p in via] + [y2], element['line'])]
+        head = element.get('head')
+        if head is not None:
+            head = dict(head)
+            # 箭头画在最后一段上
+            if via:
+                x1, y1 = via[-1]
+            if 'fraction' in head:
+                t = head.pop('fraction')
+                tail = (x2 - t * (x2 - x1), y2 - t * (y2 - y1))
+            else:
+                dx, dy = head.pop('back', [0.2, 0])
+                tail = (x2 - dx, y2 - dy)
+            ops.append(('annotate', ('', (x2, y2), tail), {'arrowprops': head}))
+        return ops
+    if kind == 'service':
+        (x, y), w, h = element['xy'], element['width'], element['height']
+        edge = element['edgecolor']
+        ops = [_patch('FancyBboxPatch', ((x, y), w, h),
+                      {'boxstyle': 'round,pad=0.1', 'facecolor': element['facecolor'],
+                       'edgecolor': edge, 'linewidth': 3}),
+               _text(x + w / 2, y + h - 0.3, element['title'],
+                     {'fontsize': 12, 'weight': 'bold', 'ha': 'center', 'va': 'center'})]
+        comp_y = y + h - 1.2
+        for comp in element['components']:
+            ops.append(_patch('Rectangle', ((x + 0.3, comp_y - 0.25), w - 0.6, 0.5),
+                              {'facecolor': 'white', 'edgecolor': edge, 'linewidth': 1}))
+            ops.append(_text(x + w / 2, comp_y, comp, {'fontsize': 9, 'ha': 'center', 'va': 'center'}))
+            comp_y -= 0.7
+        return ops
+    if kind == 'database':
+        (x, y), w, h = element['xy'], element['width'], element['height']
+        style = {'facecolor': element['facecolor'], 'edgecolor': element['edgecolor'], 'linewidth': 2}
+        return [_patch('Rectangle', ((x, y + h / 6), w, h * 2 / 3), style),
+                _patch('Ellipse', ((x + w / 2, y), w, h / 3), style),
+                _patch('Ellipse', ((x + w / 2, y + h), w, h / 3), style),
+                _text(x + w / 2, y + h / 2, element['title'],
+                      {'fontsize': 10, 'weight': 'bold', 'ha': 'center', 'va': 'center'})]
+    if kind == 'legend':
+        handles = tuple((h['kind'], dict(h)) for h in element['handles'])
+        options = {k: v for k, v in element.items() if k not in ('type', 'handles')}
+        if 'bbox_to_anchor' in options:
+            options['bbox_to_anchor'] = tuple(options['bbox_to_anchor'])
+        return [('legend', handles, options)]
+    if kind == 'title':
+        return [('title', (element['text'],), _pick(element, ('fontsize', 'fontweight', 'pad')))]
+    raise AssertionError(kind)
+
+
+def _boxstyle_pad(boxstyle):
+    """'round,pad=0.1' -> 0.1 (matplotlib 的默认值是 0.3)"""
+    for part in boxstyle.split(',')[1:]:
+        key, _, value = part.partition('=')
+        if key.strip() == 'pad':
+            return float(value)
+    return 0.3
+
+
+def _outline(element):
+    """图形的可见轮廓 (x0, y0, x1, y1); 圆角框的 pad 会把轮廓向外扩"""
+    if element['type'] == 'circle':
+        (x, y), r = element['center'], element['radius']
+        return (x - r, y - r, x + r, y + r)
+    (x, y), w, h = element['xy'], element['width'], element['height']
+    pad = _boxstyle_pad(element['boxstyle'])
+    return (x - pad, y - pad, x + w + pad, y + h + pad)
+
+
+def _route_connectors(elements):
+    """按描述文件里的顺序给所有 connector 布线, 返回 {元素下标: 折线}
+
+    布线有状态 (后面的连线会避开前面占用的接口和线段), 所以编译和
+    flow_geometry 都走这里, 得到的路线完全相同。
+    """
+    connectors = [i for i, (_, e) in enumerate(elements) if e['type'] == 'connector']
+    if not connectors:
+        return {}
+    # 有 connector 时才建立障碍物索引
+    routable = [e for _, e in elements if e['type'] in ROUTABLE]
+    router = routing.Router([_outline(e) for e in routable])
+    shapes = {e['id']: i for i, e in enumerate(routable) if 'id' in e}
+    return {i: router.route(shapes[elements[i][1]['from']], shapes[elements[i][1]['to']])
+            for i in connectors}
+
+
+def flow_geometry(spec, where='spec'):
+    """流程图的几何信息: ({id: 轮廓 (x0, y0, x1, y1)}, [(from, to, 折线)]), 供动画等叠加高亮"""
+    elements, _ = validate_spec(spec, where)
+    outlines = {e['id']: _outline(e) for _, e in elements if e['type'] in ROUTABLE and 'id' in e}
+    routes = _route_connectors(elements)
+    return outlines, [(elements[i][1]['from'], elements[i][1]['to'], points) for i, points in routes.items()]
+
+
+def _compile_connector(element, points):
+    style = _pick(element, ARROW_KEYS)
+    ops = []
+    if len(points) > 2:
+        line = {k: v for k, v in style.items() if k not in ('arrowstyle', 'mutation_scale')}
+        ops.append(_plot([p[0] for p in points[:-1]], [p[1] for p in points[:-1]], line))
+        # 箭头接在折线末端, 起点不再缩进
+        style['shrinkA'] = 0
+    ops.append(('arrow', (tuple(points[-2]), tuple(points[-1])), style))
+    if element.get('label'):
+        # 标签放在最长一段的中点
+        (x1, y1), (x2, y2) = max(zip(points, points[1:]),
+                                 key=lambda pq: abs(pq[1][0] - pq[0][0]) + abs(pq[1][1] - pq[0][1]))
+        dx, dy = element['label_offset']
+        ops.append(_text((x1 + x2) / 2 + dx, (y1 + y2) / 2 + dy, element['label'],
+                         element.get('label_style', {})))
+    return ops
+
+
+def compile_spec(spec, where='spec'):
+    """校验并编译描述文件, 返回 Plan"""
+    elements, ids = validate_spec(spec, where)
+    routes = _route_connectors(elements)
+    ops = []
+    for i, (_, element) in enumerate(elements):
+        if element['type'] == 'connector':
+            ops.extend(_compile_connector(element, routes[i]))
+        else:
+            ops.extend(_compile_element(element, ids))
+    figure = spec['figure']
+    return Plan(spec['name'],
+                (tuple(figure['size']), tuple(figure['xlim']), tuple(figure['ylim']),
+                 figure.get('aspect'), bool(figure.get('axis', False))),
+                tuple(ops))
+
+
+_plan_cache = {}
+# 本文件源码的摘要; 和 routing.SOURCE_DIGEST 一起进缓存键, watch 只重新加载
+# routing 时, 之前编译的计划 (里面有布好的连线) 也会失效
+SOURCE_DIGEST = render_cache._file_digest(__file__)
+
+
+def load_plan(path):
+    """读取并编译描述文件; 文件和编译用的代码都没有变化时直接返回之前编译好的计划"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size, SOURCE_DIGEST, routing.SOURCE_DIGEST)
+    cached = _plan_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    plan = compile_spec(load_spec(path), os.path.basename(path))
+    _plan_cache[path] = (stamp, plan)
+    return plan
+
+
+# ============= 渲染 (Render) =============
+def _copy(kwargs):
+    # bbox / arrowprops 之类的嵌套 dict 也复制一份, 保证计划本身不被修改
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in kwargs.items()}
+
+
+def render_plan(plan, ax):
+    """在 ax 上执行渲染计划里的所有指令"""
+    import matplotlib.patches as mpatches
+    from matplotlib.lines import Line2D
+
+    figsize, xlim, ylim, aspect, axis_on = plan.figure
+    ax.set_xlim(*xlim)
+    ax.set_ylim(*ylim)
+    if aspect:
+        ax.set_aspect(aspect)
+    if not axis_on:
+        ax.axis('off')
+
+    for op, args, kwargs in plan.ops:
+        kwargs = _copy(kwargs)
+        if op == 'text':
+            ax.text(*args, **kwargs)
+        elif op == 'patch':
+            cls, patch_args = args
+            ax.add_patch(getattr(mpatches, cls)(*patch_args, **kwargs))
+        elif op == 'plot':
+            ax.plot(*args, **kwargs)
+        elif op == 'arrow':
+            ax.add_patch(mpatches.FancyArrowPatch(*args, **kwargs))
+        elif op == 'annotate':
+            ax.annotate(*args, **kwargs)
+        elif op == 'actor':
+            import icons
+            icons.add_actor(ax, args[1], args[2], args[0], **kwargs)
+        elif op == 'legend':
+            handles = []
+            for kind, handle in args:
+                handle = {k: v for k, v in handle.items() if k != 'kind'}
+                if kind == 'line':
+                    handles.append(Line2D([0], [0], **handle))
+                else:
+                    handles.append(mpatches.Patch(**handle))
+            ax.legend(handles=handles, **kwargs)
+        elif op == 'title':
+            ax.set_title(*args, **kwargs)
+        else:
+            raise SpecError(f"{plan.name}: unknown op {op!r}")
+
+
+def build_figure(plan):
+    """按计划新建一个 figure 并渲染, 返回 (fig, ax)"""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=plan.figure[0])
+    render_plan(plan, ax)
+    return fig, ax
+
+
+if __name__ == "__main__":
+    import sys
+
+    # 校验 specs 目录 (或命令行给出的) 所有描述文件
+    paths = sys.argv[1:] or sorted(os.path.join(SPEC_DIR, n) for n in os.listdir(SPEC_DIR))
+    failed = 0
+    for path in paths:
+        try:
+            plan = load_plan(path)
+        except (SpecError, ValueError) as e:
+            print(f"❌ {e}")
+            failed += 1
+        else:
+            print(f"✓ {os.path.basename(path)}: {len(plan.ops)} ops")
+    sys.exit(1 if failed else 0)
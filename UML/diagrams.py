@@ -0,0 +1,232 @@
+"""
+Minority Wins Game - UML Diagrams Generator
+统一的命令行入口
+
+使用方法 (在 UML 目录下):
+    python -m diagrams --list                    # 列出所有图表
+    python -m diagrams render                    # 渲染全部图表
+    python -m diagrams render system_flow --dpi 150
+    python diagrams.py render use_case -j 2 --output-dir out/
+    python -m diagrams render wireframes --tile-rows 1024   # 分块光栅化, 限制峰值内存
+    python -m diagrams build                     # 增量构建, 只重建依赖变化的图表 (见 build.py)
+    python -m diagrams build --watch system_flow # 常驻进程, 保存文件后自动重建 (见 watch.py)
+    python -m diagrams lint                      # 检查文字互相重叠或压在图形边线上 (见 overlaps.py)
+
+总是使用非交互的 Agg 后端, 不会弹出窗口或阻塞; matplotlib 只在真正
+需要绘图时才导入, 所以 --list 和命中渲染缓存的运行都能很快返回。
+"""
+import os
+
+# 必须在任何模块导入 matplotlib 之前设置
+os.environ['MPLBACKEND'] = 'Agg'
+
+import argparse
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+import diagram_spec
+import render_cache
+import UML4
+
+
+# ============= 图表注册表 (Registry) =============
+def _draw_basic_use_case(output='minority_game_use_case_diagram.png', dpi=300):
+    """UML.py 的基础用例图; UML.py 本身只返回 figure, 这里负责保存"""
+    import matplotlib.pyplot as plt
+    import UML
+
+    fig, _ = UML.draw_use_case_diagram()
+    fig.savefig(output, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✓ Basic Use Case Diagram saved as '{output}'")
+
+
+def _draw_results(output='result_charts.png', dpi=300):
+    """results.py 的对局结果图表, 数据来自 minority-game 的多人测试结果"""
+    import results
+
+    results.draw_results(output, dpi)
+
+
+# UML4 之外的图表:
+# name -> (icon, title, output file, 中文说明, draw function, 源文件, 源文件中的绘图函数)
+EXTRA_DIAGRAMS = {
+    'use_case_basic': ('📊', 'Basic Use Case Diagram', 'minority_game_use_case_diagram.png',
+                       '基础用例图', _draw_basic_use_case, os.path.join(HERE, 'UML.py'),
+                       'draw_use_case_diagram'),
+    'results': ('🎲', 'Game Result Charts', 'result_charts.png',
+                '对局结果图表', _draw_results, os.path.join(HERE, 'results.py'), 'draw_results'),
+}
+
+
+def all_diagrams():
+    names = list(UML4.DIAGRAMS) + list(EXTRA_DIAGRAMS)
+    return {name: (UML4.DIAGRAMS.get(name) or EXTRA_DIAGRAMS[name])[:4] for name in names}
+
+
+# EXTRA_DIAGRAMS 图表的内容和布局所在的模块 (绘图函数只引用了这些模块)
+EXTRA_SOURCES = {
+    'use_case_basic': [os.path.join(HERE, 'scene.py'), os.path.join(HERE, 'puml.py'),
+                       os.path.join(HERE, 'layout.py'), os.path.join(HERE, 'icons.py')],
+    'results': [os.path.join(HERE, 'results.py')],
+}
+
+
+def extra_inputs(name):
+    """EXTRA_DIAGRAMS 图表读取的其他文件, 计入渲染缓存的键"""
+    if name == 'results':
+        import results
+        return EXTRA_SOURCES[name] + list(results.iter_result_files([results.DEFAULT_RESULTS]))
+    return [diagram_spec.__file__, diagram_spec.spec_path(name)] + EXTRA_SOURCES.get(name, [])
+
+
+def render_extra(name, dpi=300, use_cache=True):
+    """渲染 EXTRA_DIAGRAMS 里的图表, 返回值和 UML4.render_all 的一项相同"""
+    output, _, draw, module_path, func_name = EXTRA_DIAGRAMS[name][2:]
+    start = time.perf_counter()
+    try:
+        if use_cache:
+            hit = render_cache.cached_render(lambda: draw(output, dpi), module_path, func_name,
+                                             [output], dpi, inputs=extra_inputs(name))
+        else:
+            draw(output, dpi)
+            hit = False
+    except Exception as e:
+        return time.perf_counter() - start, f"{type(e).__name__}: {e}", False
+    return time.perf_counter() - start, None, hit
+
+
+# ============= 命令 (Commands) =============
+def cmd_list(args):
+    for name, (icon, title, output, note) in all_diagrams().items():
+        print(f"{icon} {name:<16} {title:<24} {output:<36} {note}")
+    return 0
+
+
+def _prepare(args):
+    """检查图表名称并应用公共选项, 返回要处理的图表; 名称有误时返回 None"""
+    unknown = [name for name in args.diagrams if name not in all_diagrams()]
+    if unknown:
+        print(f"❌ unknown diagram(s): {', '.join(unknown)} (see --list)")
+        return None
+    if args.tile_rows:
+        os.environ[UML4.TILE_ROWS_ENV] = str(args.tile_rows)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        os.chdir(args.output_dir)
+    return args.diagrams or list(UML4.DIAGRAMS)
+
+
+def _report(results, start):
+    """逐个打印渲染结果, 返回退出码"""
+    diagrams = all_diagrams()
+    failed = []
+    for name, (elapsed, error, hit) in results.items():
+        if error:
+            failed.append(name)
+            print(f"❌ {name}: {error}")
+        elif hit:
+            print(f"⚡ {name}: '{diagrams[name][2]}' is up to date ({elapsed:.2f}s)")
+        else:
+            print(f"✓ {name}: {elapsed:.2f}s")
+    print(f"⏱  Total: {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+def cmd_render(args):
+    names = _prepare(args)
+    if names is None:
+        return 2
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    uml4_names = [name for name in names if name in UML4.DIAGRAMS]
+    results = UML4.render_all(uml4_names, jobs, args.dpi, not args.no_cache) if uml4_names else {}
+    for name in names:
+        if name in EXTRA_DIAGRAMS:
+            results[name] = render_extra(name, args.dpi, not args.no_cache)
+    return _report({name: results[name] for name in names}, start)
+
+
+def cmd_build(args):
+    import build
+
+    names = _prepare(args)
+    if names is None:
+        return 2
+    if args.graph:
+        for name in names:
+            print(build.format_graph(name, args.dpi))
+        return 0
+    if args.watch:
+        import watch
+        return watch.watch(names, args.dpi, not args.no_cache, args.interval, report=_report)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    results = build.build(names, args.dpi, jobs, not args.no_cache,
+                          force=args.always_make, dry_run=args.dry_run)
+    if not results:
+        if not args.dry_run:
+            print("✅ Nothing to do, all diagrams are up to date")
+        return 0
+    return _report(results, start)
+
+
+def cmd_lint(args):
+    import overlaps
+
+    unknown = [name for name in args.diagrams if name not in all_diagrams()]
+    if unknown:
+        print(f"❌ unknown diagram(s): {', '.join(unknown)} (see --list)")
+        return 2
+    return overlaps.lint(args.diagrams or list(all_diagrams()), args.shapes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='diagrams',
+                                     description='Minority Wins Game UML diagrams')
+    parser.add_argument('--list', action='store_true', help='list the available diagrams')
+    commands = parser.add_subparsers(dest='command')
+    render = commands.add_parser('render', help='render diagrams (default: all UML4 diagrams)')
+    build = commands.add_parser('build', help='rebuild only the diagrams whose dependencies changed')
+    for command in (render, build):
+        command.add_argument('diagrams', nargs='*', metavar='DIAGRAM')
+        command.add_argument('-j', '--jobs', type=int, default=1,
+                             help='number of worker processes, 0 = one per CPU (default: 1)')
+        command.add_argument('--dpi', type=int, default=300, help='output resolution (default: 300)')
+        command.add_argument('--no-cache', action='store_true',
+                             help='always re-render, ignoring the render cache')
+        command.add_argument('--tile-rows', type=int, metavar='N',
+                             help='rasterize PNGs in bands of N pixel rows to bound peak memory')
+        command.add_argument('-o', '--output-dir',
+                             help='write the images here (default: current directory)')
+    build.add_argument('-n', '--dry-run', action='store_true',
+                       help='only print what would be rebuilt and why')
+    build.add_argument('-B', '--always-make', action='store_true',
+                       help='rebuild everything regardless of the recorded dependencies')
+    build.add_argument('--graph', action='store_true', help='print the dependency graph and exit')
+    build.add_argument('--watch', action='store_true',
+                       help='keep a warm process and rebuild affected diagrams whenever a file is saved')
+    build.add_argument('--interval', type=float, default=0.2,
+                       help='seconds between file checks in --watch mode (default: 0.2)')
+    lint = commands.add_parser('lint', help='report overlapping labels and shapes (default: all diagrams)')
+    lint.add_argument('diagrams', nargs='*', metavar='DIAGRAM')
+    lint.add_argument('--shapes', action='store_true', help='also report partially overlapping shapes')
+    args = parser.parse_args(argv)
+
+    if args.list or args.command is None:
+        return cmd_list(args)
+    if args.command == 'build':
+        return cmd_build(args)
+    if args.command == 'lint':
+        return cmd_lint(args)
+    return cmd_render(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
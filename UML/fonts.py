@@ -0,0 +1,258 @@
+"""
+Minority Wins Game - 字体预检 (Font Preflight)
+
+图表里有大量中英文混排的标签和 emoji (⏱ 👥 💰 🅰️)。font.sans-serif 列出的
+'Arial Unicode MS'、'SimHei' 在 Linux 构建机上通常没有安装, matplotlib 每个
+进程都要重新查找字体、逐个文字对象回退, 并为每个缺字的文字对象打印一次
+"Glyph ... missing" 警告。
+
+预检只做一次: 收集所有图表会画的字符 (绘图模块里的字符串常量和 specs/
+描述文件), 按候选字体的优先顺序把每个字符解析到一个具体的字体文件,
+结果缓存在渲染缓存目录的 font-map.json 里。字体列表、候选字体或图表
+文字变化后自动重新解析。
+
+    python fonts.py                 # 预检报告: 每个字体负责哪些字符, 哪些字符没有字体
+    python fonts.py --refresh       # 忽略缓存重新解析
+
+    fonts.apply(plt.rcParams)       # 绘图前调用 (UML4._import_matplotlib)
+
+apply() 把 font.sans-serif 换成实际用到、确实存在的字体族, 不再查找没有安装的
+字体; 预检报告过的缺字警告不再逐个文字对象重复出现。
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import warnings
+
+import diagram_spec
+import render_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 会画出文字的模块; specs/ 下的描述文件总是包括在内。新的绘图模块要加进来,
+# 否则它独有的字符不在预检结果里, 又会逐个文字对象打印缺字警告
+TEXT_MODULES = [os.path.join(HERE, name) for name in
+                ('UML3.py', 'UML4.py', 'results.py', 'simulate.py', 'animate.py')]
+
+# 候选字体族, 按优先顺序; 先用 rcParams 里配置的, 再用这些常见的 CJK / 符号字体。
+# Noto Color Emoji 之类的彩色位图字体 Agg 画不出来, 不在候选之列
+FALLBACK_FAMILIES = [
+    'Noto Sans CJK SC', 'Noto Sans SC', 'Source Han Sans SC', 'WenQuanYi Zen Hei',
+    'WenQuanYi Micro Hei', 'Microsoft YaHei', 'PingFang SC', 'Droid Sans Fallback',
+    'Noto Emoji', 'Segoe UI Emoji', 'Segoe UI Symbol', 'Symbola', 'DejaVu Sans',
+]
+
+CACHE_NAME = 'font-map.json'
+
+# 已经在预检里报告过的缺字, apply() 之后不再逐个文字对象警告
+_silenced = set()
+
+
+# ============= 收集字符 (Glyph Set) =============
+def _module_strings(path):
+    """模块里的字符串常量, 不包括文档字符串"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    docstrings = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.ClassDef)) and node.body:
+            first = node.body[0]
+            if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant):
+                docstrings.add(id(first.value))
+    return [node.value for node in ast.walk(tree)
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in docstrings]
+
+
+def _spec_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _spec_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _spec_strings(item)
+
+
+def text_sources():
+    """预检读取的文件: 绘图模块和 specs/ 下的描述文件"""
+    specs = [os.path.join(diagram_spec.SPEC_DIR, n) for n in sorted(os.listdir(diagram_spec.SPEC_DIR))
+             if n.endswith(('.json', '.yaml', '.yml'))]
+    return [p for p in TEXT_MODULES if os.path.exists(p)] + specs
+
+
+def glyph_set(paths=None):
+    """{字符: 第一次出现的文件名}, 不包括空白和控制字符"""
+    chars = {}
+    for path in paths or text_sources():
+        if path.endswith('.py'):
+            strings = _module_strings(path)
+        else:
+            strings = _spec_strings(diagram_spec.load_spec(path))
+        for s in strings:
+            for ch in s:
+                if ch.isprintable() and not ch.isspace():
+                    chars.setdefault(ch, os.path.basename(path))
+    return chars
+
+
+# ============= 解析字体 (Resolve) =============
+def candidate_families(configured=None):
+    """候选字体族: 配置的在前, 去重"""
+    if configured is None:
+        import matplotlib
+        configured = matplotlib.rcParams['font.sans-serif']
+    families = []
+    for family in list(configured) + FALLBACK_FAMILIES:
+        if family not in families:
+            families.append(family)
+    return families
+
+
+def _family_files():
+    """{字体族: 常规字重的字体文件}, 只包括已安装的字体"""
+    from matplotlib import font_manager
+
+    files = {}
+    for entry in sorted(font_manager.fontManager.ttflist,
+                        key=lambda e: (e.style != 'normal', abs(_weight(e.weight) - 400))):
+        files.setdefault(entry.name, entry.fname)
+    return files
+
+
+def _weight(value):
+    from matplotlib import font_manager
+    return value if isinstance(value, int) else font_manager.weight_dict.get(value, 400)
+
+
+def resolve(chars, families):
+    """把每个字符解析到第一个包含它的候选字体
+
+    返回 (families, fonts, missing):
+      families  实际用到的已安装字体族, 按优先顺序
+      fonts     {字体族: [字体文件, 它负责的字符串]}
+      missing   没有任何候选字体包含的字符
+    """
+    from matplotlib.ft2font import FT2Font
+
+    installed = _family_files()
+    pending = set(chars)
+    fonts = {}
+    for family in families:
+        if not pending or family not in installed:
+            continue
+        charmap = FT2Font(installed[family]).get_charmap()
+        covered = sorted(ch for ch in pending if ord(ch) in charmap)
+        if covered:
+            fonts[family] = [installed[family], ''.join(covered)]
+            pending.difference_update(covered)
+    return list(fonts), fonts, ''.join(sorted(pending))
+
+
+# ============= 缓存 (Cache) =============
+def _cache_path():
+    root = os.environ.get('UML_CACHE_DIR') or render_cache.DEFAULT_CACHE_DIR
+    return os.path.join(root, CACHE_NAME)
+
+
+def _cache_key(paths, families):
+    h = hashlib.sha256()
+    h.update(json.dumps([render_cache.font_fingerprint(), families]).encode('utf-8'))
+    for path in paths:
+        st = os.stat(path)
+        h.update(f"{path}:{st.st_mtime_ns}:{st.st_size}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def preflight(configured=None, refresh=False):
+    """解析所有图表文字用到的字体, 结果缓存在磁盘上; 返回缓存记录 (dict)
+
+    记录: key, families, fonts, missing, sources ({缺字: 出现的文件})
+    """
+    paths = text_sources()
+    families = candidate_families(configured)
+    key = _cache_key(paths, families)
+    path = _cache_path()
+    if not refresh:
+        try:
+            with open(path, encoding='utf-8') as f:
+                record = json.load(f)
+            if record.get('key') == key:
+                return record
+        except (OSError, ValueError):
+            pass
+
+    chars = glyph_set(paths)
+    used, fonts, missing = resolve(chars, families)
+    record = {'key': key, 'families': used, 'fonts': fonts, 'missing': missing,
+              'sources': {ch: chars[ch] for ch in missing}}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.font-map-', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # 缓存目录不可写时每次重新解析
+    return record
+
+
+def apply(rc=None, record=None):
+    """让 rcParams 直接使用预检解析出的字体族, 返回预检记录"""
+    import matplotlib
+
+    rc = matplotlib.rcParams if rc is None else rc
+    record = record or preflight(rc['font.sans-serif'])
+    if record['families']:
+        rc['font.sans-serif'] = record['families']
+    new = set(record['missing']) - _silenced
+    if new:
+        # 每个进程只提示一次, 代替每个文字对象一条的缺字警告
+        _silenced.update(new)
+        codes = '|'.join(str(ord(ch)) for ch in sorted(_silenced))
+        warnings.filterwarnings('ignore', message=rf'Glyph ({codes}) .*missing from font', category=UserWarning)
+        warnings.warn(f"{len(new)} glyph(s) have no installed font and will render as boxes "
+                      f"(run 'python fonts.py' for details)", stacklevel=2)
+    return record
+
+
+# ============= 命令行 =============
+def _sample(chars, limit=40):
+    return chars if len(chars) <= limit else chars[:limit] + f"… (+{len(chars) - limit})"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Resolve the fonts needed by the diagram texts and report missing glyphs')
+    parser.add_argument('--refresh', action='store_true', help='ignore the cached font map')
+    args = parser.parse_args(argv)
+
+    import UML4
+    record = preflight(UML4.RC_PARAMS['font.sans-serif'], refresh=args.refresh)
+    print(f"🔤 Font fallback chain: {' > '.join(record['families']) or '-'}")
+    for family, (path, chars) in record['fonts'].items():
+        print(f"✓ {family:<20} {len(chars):>5} glyphs  {path}")
+        if not chars.isascii():
+            print(f"  {_sample(''.join(ch for ch in chars if not ch.isascii()))}")
+    missing = record['missing']
+    if not missing:
+        print("✅ Every glyph has a font")
+        return 0
+    print(f"❌ {len(missing)} glyph(s) have no installed font:")
+    by_file = {}
+    for ch in missing:
+        by_file.setdefault(record['sources'][ch], []).append(ch)
+    for name, chars in sorted(by_file.items()):
+        print(f"  {name}: {_sample(''.join(chars))}")
+    if any('\u4e00' <= ch <= '\u9fff' for ch in missing):
+        print("💡 Install a CJK font, e.g. apt-get install fonts-noto-cjk (or fonts-wqy-zenhei)")
+    if any(ord(ch) > 0x1F000 for ch in missing):
+        print("💡 Install a monochrome emoji font, e.g. Noto Emoji or Symbola")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Minority Wins Game - 图标图集 (Icon Atlas)
+
+用例图里每个小人都由一个圆和四五条线段组成, 原型图的六个页面反复排版
+同样的 emoji / 符号 ('☰' '👤' '←')。这里把重复出现的图标在第一次用到时
+按当前 dpi 光栅化一次, 缓存在进程内的图集里, 之后每次绘制只是一次
+draw_image (贴图), 不再逐条路径描边或重新排版字形:
+
+    add_actor(ax, 1.5, 6, 'simple', head={'color': '#FF9800'}, limb={'fmt': 'k-', 'linewidth': 2})
+    add_glyph(ax, 9.5, 15.5, '👤', fontsize=20, color='white', ha='right', va='center')
+
+贴图的像素尺寸按保存时的 dpi 和坐标变换计算, 线宽和字号与直接绘制相同;
+位置取整到像素, 和直接绘制最多差半个像素。保存成 SVG/PDF 时图标和
+rasterized=True 的图元一样以保存时的 dpi 嵌入位图。
+
+atlas_stats() 返回图集命中/未命中次数。
+"""
+import math
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.artist import Artist
+from matplotlib.transforms import Bbox
+
+import diagram_spec
+
+# key -> 光栅化结果
+_atlas = {}
+_stats = {'hits': 0, 'misses': 0}
+
+
+# ============= 图集 (Atlas) =============
+def _sprite(key, make):
+    """图集里 key 对应的贴图, 没有时调用 make() 光栅化一次"""
+    value = _atlas.get(key)
+    if value is None:
+        _stats['misses'] += 1
+        value = _atlas[key] = make()
+    else:
+        _stats['hits'] += 1
+    return value
+
+
+def atlas_stats():
+    return dict(_stats, sprites=len(_atlas))
+
+
+def clear():
+    _atlas.clear()
+    _stats.update(hits=0, misses=0)
+
+
+def _canvas(width, height, dpi):
+    """透明背景、width x height 像素的空白 figure"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # 多加一点点, 避免浮点误差让画布少一个像素
+    fig = Figure(figsize=((width + 0.01) / dpi, (height + 0.01) / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    fig.patch.set_alpha(0)
+    return fig
+
+
+def _pixels(fig, width, height):
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[:height, :width].copy()
+
+
+def _key_value(style):
+    """样式 dict -> 可以作为图集 key 的元组"""
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in style.items()))
+
+
+class _SpriteArtist(Artist):
+    """按像素位置贴一张图集里的贴图; 子类提供 _place(renderer) -> (x0, y0, 贴图)"""
+
+    def __init__(self, xy):
+        super().__init__()
+        self.xy = xy
+        self.set_clip_on(False)
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        x0, y0, image = self._place(renderer)
+        gc = renderer.new_gc()
+        self._set_gc_clip(gc)
+        gc.set_alpha(self.get_alpha())
+        # 贴图按画布的行序 (从上往下) 存放, draw_image 的第一行在最下面
+        renderer.draw_image(gc, x0, y0, image[::-1])
+        gc.restore()
+        self.stale = False
+
+    def get_window_extent(self, renderer=None):
+        if renderer is None:
+            renderer = self.figure._get_renderer()
+        x0, y0, image = self._place(renderer)
+        mag = renderer.get_image_magnification()
+        return Bbox.from_bounds(x0, y0, image.shape[1] / mag, image.shape[0] / mag)
+
+
+# ============= 小人 (Actor) =============
+class ActorIcon(_SpriteArtist):
+    """用例图的小人, 画法和 diagram_spec.ACTOR_FIGURES 相同: 头 (半径 0.3 的圆) + 四肢"""
+
+    def __init__(self, xy, figure='simple', head=None, limb=None):
+        super().__init__(xy)
+        self.figure_name = figure
+        self.head = dict(head or {})
+        self.limb = dict(limb or {})
+        self.segments = diagram_spec.ACTOR_FIGURES[figure](0, 0)
+        xs = [x for seg in self.segments for x in seg[0]] + [-0.3, 0.3]
+        ys = [y for seg in self.segments for y in seg[1]] + [0.3]
+        self.extent = (min(xs), max(xs), min(ys), max(ys))
+        # 和直接绘制时的叠放顺序一致: 头是 Patch (默认 zorder 1), 四肢是 Line2D (默认 zorder 2)
+        self.set_zorder(max(self.head.get('zorder', 1), self.limb.get('zorder', 2)))
+
+    def _pad(self, dpi):
+        """线宽超出几何范围的像素数"""
+        lw = max(self.limb.get('linewidth', rcParams['lines.linewidth']),
+                 self.head.get('linewidth', rcParams['patch.linewidth']))
+        return math.ceil(lw * dpi / 72 / 2) + 2
+
+    def _paint(self, fig, xlim, ylim):
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_xlim(*xlim)
+        ax.set_ylim(*ylim)
+        ax.axis('off')
+        from matplotlib.patches import Circle
+        ax.add_patch(Circle((0, 0), 0.3, **self.head))
+        limb = dict(self.limb)
+        fmt = limb.pop('fmt', None)
+        for xs, ys in self.segments:
+            ax.plot(xs, ys, *((fmt,) if fmt else ()), **limb)
+
+    def _place(self, renderer):
+        # 贴图的 dpi: 位图输出就是保存的 dpi, PDF/SVG 按放大倍数换算
+        mag = renderer.get_image_magnification()
+        dpi = renderer.dpi * mag
+        trans = self.axes.transData
+        x, y = self.xy
+        ex0, ex1, ey0, ey1 = self.extent
+        (ox, oy), (px, py) = trans.transform([(0, 0), (1, 1)])
+        # 每个数据单位对应的贴图像素 (保存 PDF/SVG 时乘以放大倍数)
+        sx, sy = abs(px - ox) * mag, abs(py - oy) * mag
+        pad = self._pad(dpi)
+        width = math.ceil((ex1 - ex0) * sx) + 2 * pad
+        height = math.ceil((ey1 - ey0) * sy) + 2 * pad
+        cx, cy = (ex0 + ex1) / 2, (ey0 + ey1) / 2
+        xlim = (cx - width / 2 / sx, cx + width / 2 / sx)
+        ylim = (cy - height / 2 / sy, cy + height / 2 / sy)
+        key = ('actor', self.figure_name, _key_value(self.head), _key_value(self.limb),
+               width, height, round(sx, 4), round(sy, 4), dpi)
+
+        def make():
+            fig = _canvas(width, height, dpi)
+            self._paint(fig, xlim, ylim)
+            return _pixels(fig, width, height)
+
+        image = _sprite(key, make)
+        center_x, center_y = trans.transform((x + cx, y + cy))
+        return round(center_x - width / mag / 2), round(center_y - height / mag / 2), image
+
+
+def add_actor(ax, x, y, figure='simple', head=None, limb=None):
+    """在 (x, y) 画一个小人 (头的圆心), 返回图标 artist"""
+    return ax.add_artist(ActorIcon((x, y), figure, head, limb))
+
+
+# ============= 字形 (Glyph) =============
+class GlyphIcon(_SpriteArtist):
+    """单个 emoji / 符号, 对齐方式和 ax.text 相同"""
+
+    HA = ('left', 'center', 'right')
+    VA = ('top', 'center', 'bottom', 'baseline')
+
+    def __init__(self, xy, text, fontsize=None, color=None, weight=None, ha='left', va='baseline'):
+        super().__init__(xy)
+        if ha not in self.HA or va not in self.VA:
+            raise ValueError(f"unsupported alignment ha={ha!r}, va={va!r}")
+        self.text = text
+        self.props = {'fontsize': fontsize or rcParams['font.size'], 'color': color or rcParams['text.color'],
+                      'weight': weight or rcParams['font.weight']}
+        self.ha, self.va = ha, va
+        self.set_zorder(3)  # 和 Text 的默认 zorder 相同
+
+    def _raster(self, dpi):
+        """光栅化字形, 返回 (贴图, 文字框在贴图中的位置 (x0, y0, 宽, 高), 基线以下的高度)"""
+        size = math.ceil(self.props['fontsize'] * dpi / 72 * (2 + len(self.text)))
+        fig = _canvas(size, size, dpi)
+        text = fig.text(0.5, 0.5, self.text, ha='center', va='center', **self.props)
+        image = _pixels(fig, size, size)
+        renderer = fig.canvas.get_renderer()
+        box = text.get_window_extent(renderer)
+        _, _, descent = renderer.get_text_width_height_descent(
+            self.text, text.get_fontproperties(), ismath=False)
+        pad = 2
+        left, right = max(math.floor(box.x0) - pad, 0), min(math.ceil(box.x1) + pad, size)
+        bottom, top = max(math.floor(box.y0) - pad, 0), min(math.ceil(box.y1) + pad, size)
+        # 画布的行从上往下数, 文字框从下往上量
+        sprite = image[size - top:size - bottom, left:right].copy()
+        return sprite, (box.x0 - left, box.y0 - bottom, box.width, box.height), descent
+
+    def _place(self, renderer):
+        mag = renderer.get_image_magnification()
+        dpi = renderer.dpi * mag
+        key = ('glyph', self.text, _key_value(self.props), dpi)
+        image, (tx, ty, tw, th), descent = _sprite(key, lambda: self._raster(dpi))
+        ax_, ay_ = self.axes.transData.transform(self.xy)
+        # 文字框左下角 (贴图像素), 对齐规则和 Text 相同
+        left = {'left': 0, 'center': -tw / 2, 'right': -tw}[self.ha]
+        bottom = {'bottom': 0, 'center': -th / 2, 'top': -th, 'baseline': -descent}[self.va]
+        return round(ax_ + (left - tx) / mag), round(ay_ + (bottom - ty) / mag), image
+
+
+def add_glyph(ax, x, y, text, fontsize=None, color=None, weight=None, ha='left', va='baseline'):
+    """代替只包含一个图标字符的 ax.text, 返回图标 artist"""
+    return ax.add_artist(GlyphIcon((x, y), text, fontsize, color, weight, ha, va))
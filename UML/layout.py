@@ -0,0 +1,371 @@
+"""
+Minority Wins Game - 分层自动布局 (Layered Layout)
+
+用例图的位置原来都是手工调好的, 只适合十来个节点。这里按 Sugiyama 分层法
+自动排布参与者、用例和关系 (和 PlantUML 'left to right direction' 交给
+Graphviz dot 的做法相同):
+
+  1. 去环: 深度优先遍历, 回边反向
+  2. 分层: 参与者固定在第 0 层, 用例按最长路径分层; 跨多层的边插入虚拟节点
+  3. 减少交叉: 逐层按邻居位置的重心排序, 上下来回扫描, 用累加树
+     (Barth-Jünger-Mutzel) 以 O(E log V) 统计交叉数, 保留最好的一次,
+     连续几轮没有改进就停止
+  4. 坐标: 每个节点向相邻层邻居的平均位置靠拢, 再用保序回归 (PAV)
+     在保持顺序和最小间距的前提下求最近的位置
+
+结果只取决于图的拓扑 (节点、边、节点大小) 和本文件的源码, 按两者的哈希
+缓存在进程内和渲染缓存目录的 layout/ 下, 同样的图第二次布局直接读缓存:
+
+    result = layered(['Player', 'UC1', 'UC2'], [('Player', 'UC1'), ('UC1', 'UC2')], pinned=['Player'])
+    result['layer']['UC2'], result['y']['UC2']    # 第几层, 层内位置 (行, 从上往下)
+    result['routes'][0]                           # 第 0 条边经过的虚拟节点 [(层, 行), ...]
+
+    python layout.py enhanced_use_case_diagram.puml   # 布局报告
+    python layout.py --random 500                     # 随机图计时
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import render_cache
+
+# 本文件源码的摘要, 进缓存键: 算法一改旧的缓存自动失效 (watch 重新加载时重算)
+SOURCE_DIGEST = render_cache._file_digest(__file__)
+# 交叉数连续这么多轮没有减少就停止扫描
+PATIENCE = 3
+MAX_SWEEPS = 24
+# 坐标求解的来回次数
+COORD_PASSES = 8
+# 虚拟节点占的行数 (普通节点默认占 1 行)
+DUMMY_SIZE = 0.5
+
+_memo = {}
+
+
+# ============= 分层 (Layering) =============
+def _acyclic(names, edges, pinned):
+    """去环后的有向边 [(u, v)] (下标), 和每条边是否被反向"""
+    index = {name: i for i, name in enumerate(names)}
+    out = [[] for _ in names]
+    for k, (u, v) in enumerate(edges):
+        out[index[u]].append((index[v], k))
+
+    # 指向参与者的边反向, 参与者总是起点
+    reverse = [index[v] in pinned and index[u] not in pinned for u, v in edges]
+    state = [0] * len(names)  # 0 未访问, 1 在栈上, 2 完成
+    for root in range(len(names)):
+        if state[root]:
+            continue
+        stack = [(root, iter(out[root]))]
+        state[root] = 1
+        while stack:
+            node, it = stack[-1]
+            for nxt, k in it:
+                if reverse[k]:
+                    continue
+                if state[nxt] == 1:
+                    reverse[k] = True
+                elif state[nxt] == 0:
+                    state[nxt] = 1
+                    stack.append((nxt, iter(out[nxt])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+
+    arcs = []
+    for k, (u, v) in enumerate(edges):
+        a, b = index[u], index[v]
+        arcs.append((b, a) if reverse[k] else (a, b))
+    return arcs, reverse
+
+
+def _layers(count, arcs, pinned):
+    """最长路径分层: 参与者在第 0 层, 其他节点至少在第 1 层"""
+    layer = [0 if i in pinned else 1 for i in range(count)]
+    indegree = [0] * count
+    out = [[] for _ in range(count)]
+    for a, b in arcs:
+        if a != b and not (a in pinned and b in pinned):
+            out[a].append(b)
+            indegree[b] += 1
+    queue = [i for i in range(count) if indegree[i] == 0]
+    for node in queue:  # queue 在遍历时增长 (拓扑序)
+        for nxt in out[node]:
+            layer[nxt] = max(layer[nxt], layer[node] + 1)
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                queue.append(nxt)
+    return layer
+
+
+# ============= 减少交叉 (Crossing Minimization) =============
+def _count_crossings(upper, lower, down):
+    """两层之间的交叉数 (累加树, O(E log V))"""
+    position = {v: i for i, v in enumerate(lower)}
+    targets = []
+    for u in upper:
+        targets.extend(sorted(position[v] for v in down[u]))
+    if not targets:
+        return 0
+    first = 1
+    while first < len(lower):
+        first *= 2
+    tree = [0] * (2 * first)
+    crossings = 0
+    for t in targets:
+        # 已经插入、位置在 t 右边的边都和这条边交叉
+        index = t + first
+        tree[index] += 1
+        while index > 1:
+            if index % 2 == 0:
+                crossings += tree[index + 1]
+            index //= 2
+            tree[index] += 1
+    return crossings
+
+
+def _total_crossings(order, down):
+    return sum(_count_crossings(order[i], order[i + 1], down) for i in range(len(order) - 1))
+
+
+def _sort_by_barycenter(layer, fixed, neighbours):
+    """按邻居在相邻层 (已固定) 的平均位置排序; 位置都换算到 [0, 1], 没有邻居的节点留在原处"""
+    fixed_pos = {v: i / max(len(fixed) - 1, 1) for i, v in enumerate(fixed)}
+    scale = max(len(layer) - 1, 1)
+
+    def key(item):
+        i, v = item
+        near = neighbours[v]
+        if not near:
+            return (i / scale, i)
+        return (sum(fixed_pos[u] for u in near) / len(near), i)
+
+    layer[:] = [v for _, v in sorted(enumerate(layer), key=key)]
+
+
+def _minimize_crossings(order, up, down):
+    best = [list(layer) for layer in order]
+    best_crossings = _total_crossings(order, down)
+    stale = sweeps = 0
+    while best_crossings and stale < PATIENCE and sweeps < MAX_SWEEPS:
+        sweeps += 1
+        for i in range(1, len(order)):
+            _sort_by_barycenter(order[i], order[i - 1], up)
+        for i in range(len(order) - 2, -1, -1):
+            _sort_by_barycenter(order[i], order[i + 1], down)
+        crossings = _total_crossings(order, down)
+        if crossings < best_crossings:
+            best, best_crossings, stale = [list(layer) for layer in order], crossings, 0
+        else:
+            stale += 1
+    return best, best_crossings, sweeps
+
+
+# ============= 坐标 (Coordinates) =============
+def _isotonic(targets, gaps):
+    """在 y[i] - y[i-1] >= gaps[i] 的约束下离 targets 最近 (平方和) 的 y, 保序回归 (PAV)"""
+    offsets = []
+    total = 0
+    for gap in gaps:
+        total += gap
+        offsets.append(total)
+    blocks = []  # [平均值, 个数]
+    for t, o in zip(targets, offsets):
+        blocks.append([t - o, 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            mean, n = blocks.pop()
+            blocks[-1][0] = (blocks[-1][0] * blocks[-1][1] + mean * n) / (blocks[-1][1] + n)
+            blocks[-1][1] += n
+    values = []
+    for mean, n in blocks:
+        values.extend([mean] * n)
+    return [v + o for v, o in zip(values, offsets)]
+
+
+def _coordinates(order, up, down, size):
+    y = {}
+    for layer in order:
+        pos = 0
+        for i, v in enumerate(layer):
+            if i:
+                pos += (size[layer[i - 1]] + size[v]) / 2
+            y[v] = pos
+    for n in range(COORD_PASSES):
+        # 先从上往下 (向前一层靠拢), 再从下往上
+        layers = order if n % 2 == 0 else order[::-1]
+        for layer in layers:
+            targets = []
+            for v in layer:
+                near = up[v] + down[v]
+                targets.append(sum(y[u] for u in near) / len(near) if near else y[v])
+            gaps = [0] + [(size[a] + size[b]) / 2 for a, b in zip(layer, layer[1:])]
+            y.update(zip(layer, _isotonic(targets, gaps)))
+    top = min(y.values(), default=0)
+    return {v: value - top for v, value in y.items()}
+
+
+# ============= 布局 (Layout) =============
+def _compute(names, edges, pinned, sizes):
+    index = {name: i for i, name in enumerate(names)}
+    pinned = {index[name] for name in pinned}
+    arcs, reverse = _acyclic(names, edges, pinned)
+    layer = _layers(len(names), arcs, pinned)
+
+    # 跨层的边拆成相邻层之间的短边, 中间插入虚拟节点
+    count = len(names)
+    size = [sizes.get(name, 1) for name in names]
+    up = [[] for _ in names]
+    down = [[] for _ in names]
+    chains = []
+    for a, b in arcs:
+        chain = []
+        if layer[a] != layer[b]:
+            if layer[a] > layer[b]:
+                a, b = b, a
+            prev = a
+            for _ in range(layer[a] + 1, layer[b]):
+                dummy = count
+                count += 1
+                layer.append(layer[prev] + 1)
+                size.append(DUMMY_SIZE)
+                up.append([prev])
+                down.append([])
+                down[prev].append(dummy)
+                chain.append(dummy)
+                prev = dummy
+            down[prev].append(b)
+            up[b].append(prev)
+        chains.append(chain)
+
+    order = [[] for _ in range(max(layer, default=0) + 1)]
+    for v in range(count):
+        order[layer[v]].append(v)
+    order, crossings, sweeps = _minimize_crossings(order, up, down)
+    y = _coordinates(order, up, down, size)
+
+    routes = []
+    for k, chain in enumerate(chains):
+        points = [[layer[d], y[d]] for d in chain]
+        # 路线按原来的方向 (from -> to) 排列
+        forward = layer[index[edges[k][0]]] <= layer[index[edges[k][1]]]
+        routes.append(points if forward else points[::-1])
+    return {
+        'layer': {name: layer[i] for i, name in enumerate(names)},
+        'y': {name: y[i] for i, name in enumerate(names)},
+        'routes': routes,
+        'layers': len(order),
+        'reversed': sum(reverse),
+        'crossings': crossings,
+        'sweeps': sweeps,
+    }
+
+
+def topology_key(names, edges, pinned=(), sizes=None):
+    """图的拓扑 (节点顺序、边、固定在第 0 层的节点、节点大小) 和 layout.py 源码的哈希, 作为缓存的键"""
+    sizes = sizes or {}
+    data = [SOURCE_DIGEST, list(names), [list(e) for e in edges], sorted(pinned),
+            [sizes.get(name, 1) for name in names]]
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _cache_path(key):
+    root = os.environ.get('UML_CACHE_DIR') or render_cache.DEFAULT_CACHE_DIR
+    return os.path.join(root, 'layout', key[:2], key + '.json')
+
+
+def layered(names, edges, pinned=(), sizes=None, cache=True):
+    """分层布局, 返回 dict:
+
+      layer     {节点: 层号}, 参与者 (pinned) 在第 0 层
+      y         {节点: 层内位置}, 单位是行 (1 行 = 一个默认大小的节点), 从上往下
+      routes    每条边经过的虚拟节点 [[层, 行], ...], 相邻层的边为空列表
+      layers / reversed / crossings / sweeps   层数、去环时反向的边数、交叉数、扫描轮数
+
+    names 的顺序是初始顺序 (决定没有约束时的上下次序); sizes 是节点占的行数。
+    """
+    names = list(names)
+    edges = [tuple(e) for e in edges]
+    if len(set(names)) != len(names):
+        raise ValueError("duplicate node names")
+    unknown = {n for e in edges for n in e} - set(names)
+    if unknown:
+        raise ValueError(f"edges refer to unknown node(s): {', '.join(sorted(unknown))}")
+    sizes = dict(sizes or {})
+    if not cache:
+        return _compute(names, edges, set(pinned), sizes)
+
+    key = topology_key(names, edges, pinned, sizes)
+    if key in _memo:
+        return _memo[key]
+    path = _cache_path(key)
+    try:
+        with open(path, encoding='utf-8') as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        result = _compute(names, edges, set(pinned), sizes)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix='.layout-', dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # 缓存目录不可写时每次重新计算
+    _memo[key] = result
+    return result
+
+
+# ============= 命令行 =============
+def random_graph(n, seed=0):
+    """n 个用例、n/20 个参与者的随机用例图 (计时用)"""
+    rng = random.Random(seed)
+    actors = [f"A{i}" for i in range(max(1, n // 20))]
+    cases = [f"UC{i}" for i in range(n)]
+    edges = [(rng.choice(actors), uc) for uc in cases]
+    for _ in range(n // 2):
+        a, b = rng.sample(cases, 2)
+        edges.append((a, b))
+    return actors + cases, edges, actors
+
+
+def _report(label, names, edges, pinned, sizes=None):
+    start = time.perf_counter()
+    result = layered(names, edges, pinned, sizes, cache=False)
+    elapsed = time.perf_counter() - start
+    widths = [0] * result['layers']
+    for layer in result['layer'].values():
+        widths[layer] += 1
+    print(f"📐 {label}: {len(names)} nodes, {len(edges)} edges -> {result['layers']} layers "
+          f"(widest {max(widths, default=0)}), {result['crossings']} crossings after "
+          f"{result['sweeps']} sweeps, {result['reversed']} reversed ({elapsed * 1000:.1f}ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Layered (Sugiyama) layout of use case diagrams')
+    parser.add_argument('files', nargs='*', metavar='FILE', help='.puml files to lay out')
+    parser.add_argument('--random', type=int, nargs='+', metavar='N',
+                        help='time random diagrams with N use cases')
+    args = parser.parse_args(argv)
+    if not args.files and not args.random:
+        parser.error('give .puml FILEs or --random N')
+
+    import puml
+    for path in args.files:
+        with open(path, encoding='utf-8') as f:
+            diagrams = puml.parse(f.read(), os.path.basename(path))
+        for i, diagram in enumerate(diagrams):
+            names, edges, pinned, sizes = puml.layout_graph(diagram)
+            _report(f"{path}[{i}]", names, edges, pinned, sizes)
+    for n in args.random or ():
+        _report(f"random({n})", *random_graph(n))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
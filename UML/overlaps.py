@@ -0,0 +1,259 @@
+"""
+Minority Wins Game - 文字/图形重叠检查 (Overlap Lint)
+
+手工摆放的坐标很容易让标签互相压住, 或者让文字压在方框的边线上
+(例如用例图的中英双语两行标签、箭头旁的说明文字)。这里把每张图
+画一遍, 取出所有文字和图形 (Patch、小人贴图) 在画布上的实际外框,
+用网格哈希找出候选对, 再用 NumPy 一次性做精确的相交判断, 不做
+O(n²) 的两两循环。
+
+报告的问题:
+    text/text   两段文字的外框相交
+    text/shape  文字只有一部分落在图形里, 也就是压在图形的边线上
+    shape/shape 两个图形部分重叠 (只有 --shapes 时检查, 手工布局里常见且多数是有意的)
+
+使用方法 (在 UML 目录下):
+    python overlaps.py                       # 检查全部图表
+    python overlaps.py system_flow wireframes --shapes
+    python -m diagrams lint                  # 同上, 统一入口
+
+有问题时退出码为 1, 可以直接放进 CI 或提交前检查。坐标是图表自己的
+数据坐标, 可以直接对照 specs/*.json 或绘图代码修改。
+"""
+import os
+
+# 必须在任何模块导入 matplotlib 之前设置
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+# 检查时的分辨率; 容差按点 (1/72 英寸) 给出, 和 dpi 无关
+DPI = 100
+TOLERANCE_PT = 1.0
+
+TEXT, SHAPE = 0, 1
+
+
+# ============= 外框提取 (Extraction) =============
+def _label(artist):
+    """报告里显示的名字: 文字取内容, 图形取类名"""
+    import icons
+
+    if isinstance(artist, icons.GlyphIcon):
+        return repr(artist.text)
+    if hasattr(artist, 'get_text'):
+        text = ' / '.join(line.strip() for line in artist.get_text().splitlines() if line.strip())
+        return repr(text if len(text) <= 40 else text[:37] + '...')
+    if isinstance(artist, icons.ActorIcon):
+        return 'actor'
+    return type(artist).__name__
+
+
+def extract(fig):
+    """画一遍 figure, 返回所有坐标轴上的 (artists, kinds, boxes)
+
+    boxes 是 (n, 4) 的像素外框 x0, y0, x1, y1; kinds 是 TEXT / SHAPE。
+    箭头 (FancyArrowPatch) 的外框只是斜线的包围盒, 不参与检查。
+    """
+    from matplotlib.patches import FancyArrowPatch
+    import icons
+
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+    artists, kinds = [], []
+    for ax in fig.axes:
+        for text in ax.texts:
+            if text.get_visible() and text.get_text().strip():
+                artists.append(text)
+                kinds.append(TEXT)
+        for patch in ax.patches:
+            if patch.get_visible() and not isinstance(patch, FancyArrowPatch):
+                artists.append(patch)
+                kinds.append(SHAPE)
+        for artist in ax.artists:
+            if isinstance(artist, icons.GlyphIcon):
+                artists.append(artist)
+                kinds.append(TEXT)
+            elif isinstance(artist, icons.ActorIcon):
+                artists.append(artist)
+                kinds.append(SHAPE)
+
+    boxes = np.array([artist.get_window_extent(renderer).extents for artist in artists],
+                     dtype=float).reshape(-1, 4)
+    return artists, np.array(kinds, dtype=np.int8), boxes
+
+
+# ============= 网格哈希 (Spatial Hash) =============
+def candidate_pairs(boxes, cell=None):
+    """落在同一个网格单元里的外框对, 返回 (m, 2) 的下标数组, 每行 i < j
+
+    单元边长默认取外框尺寸的中位数; 每个外框展开成它覆盖的所有单元,
+    按单元编号排序后, 同一单元里的外框在数组里相邻, 错位比较即可成对。
+    """
+    n = len(boxes)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.intp)
+    if cell is None:
+        cell = max(float(np.median(np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]))), 1.0)
+
+    lo = np.floor(boxes[:, :2] / cell).astype(np.int64)
+    hi = np.floor(boxes[:, 2:] / cell).astype(np.int64)
+    cols = hi[:, 0] - lo[:, 0] + 1
+    counts = cols * (hi[:, 1] - lo[:, 1] + 1)
+
+    # 展开: 第 i 个外框占 counts[i] 行, k 是单元在外框内的序号
+    owner = np.repeat(np.arange(n), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cx = lo[owner, 0] + k % cols[owner]
+    cy = lo[owner, 1] + k // cols[owner]
+    key = (cx - cx.min()) * (cy.max() - cy.min() + 1) + (cy - cy.min())
+
+    order = np.argsort(key, kind='stable')
+    key, owner = key[order], owner[order]
+    pairs = []
+    shift = 1
+    while shift < len(key):
+        same = key[shift:] == key[:-shift]
+        if not same.any():
+            break
+        pairs.append(np.stack([owner[:-shift][same], owner[shift:][same]], axis=1))
+        shift += 1
+    if not pairs:
+        return np.empty((0, 2), dtype=np.intp)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+
+
+# ============= 相交判断 (Intersection) =============
+def _contains(outer, inner, tol):
+    return ((outer[:, 0] <= inner[:, 0] + tol) & (outer[:, 1] <= inner[:, 1] + tol)
+            & (outer[:, 2] >= inner[:, 2] - tol) & (outer[:, 3] >= inner[:, 3] - tol))
+
+
+def find_overlaps(kinds, boxes, tol, shapes=False, pairs=None):
+    """在候选对 (默认由 candidate_pairs 生成) 中找出问题, 返回 (pairs, 类别)
+
+    类别是 'text/text' / 'text/shape' / 'shape/shape'。
+    """
+    if pairs is None:
+        pairs = candidate_pairs(boxes)
+    a, b = boxes[pairs[:, 0]], boxes[pairs[:, 1]]
+    width = np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+    height = np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+    hit = (width > tol) & (height > tol)
+
+    ka, kb = kinds[pairs[:, 0]], kinds[pairs[:, 1]]
+    # 一方完全在另一方里面 (方框里的文字、方框里的小方框) 不算问题
+    nested = _contains(a, b, tol) | _contains(b, a, tol)
+    text_text = hit & (ka == TEXT) & (kb == TEXT)
+    text_shape = hit & (ka != kb) & ~nested
+    shape_shape = hit & (ka == SHAPE) & (kb == SHAPE) & ~nested & shapes
+
+    keep = text_text | text_shape | shape_shape
+    kind = np.where(text_text, 'text/text', np.where(text_shape, 'text/shape', 'shape/shape'))
+    return pairs[keep], kind[keep]
+
+
+# ============= 图表 (Diagrams) =============
+def figures(names):
+    """依次产生 (标签, fig); 每个 figure 用完后由调用方关闭
+
+    和保存图片时一样先 tight_layout, 原型图逐个界面检查。
+    """
+    import matplotlib.pyplot as plt
+    import diagram_spec
+    import UML4
+
+    UML4._import_matplotlib()
+    for name in names:
+        if name == 'wireframes':
+            for screen, draw in UML4.WIREFRAME_SCREENS:
+                fig = plt.figure(figsize=UML4.WIREFRAME_SCREEN_SIZE, dpi=DPI, facecolor='white')
+                ax = fig.add_subplot(1, 1, 1)
+                draw(ax)
+                fig.tight_layout()
+                yield f'wireframes/{screen}', fig
+        elif name == 'use_case_basic':
+            import UML
+            fig, _ = UML.draw_use_case_diagram()
+            fig.set_dpi(DPI)
+            yield name, fig
+        elif name == 'results':
+            import results
+            table = results.load([results.DEFAULT_RESULTS])
+            fig, _ = results.build_figure(table['options'], results.summarize(table), table['question'])
+            fig.set_dpi(DPI)
+            yield name, fig
+        else:
+            fig, _ = diagram_spec.build_figure(diagram_spec.load_plan(diagram_spec.spec_path(name)))
+            fig.set_dpi(DPI)
+            fig.tight_layout()
+            yield name, fig
+
+
+def _data_box(artist, box):
+    """像素外框换算成 artist 所在坐标轴的数据坐标"""
+    (x0, y0), (x1, y1) = artist.axes.transData.inverted().transform([box[:2], box[2:]])
+    return f"({min(x0, x1):.2f}, {min(y0, y1):.2f})-({max(x0, x1):.2f}, {max(y0, y1):.2f})"
+
+
+def check(label, fig, shapes=False):
+    """检查一个 figure, 打印问题, 返回 (问题数, 图元数, 候选对数)"""
+    artists, kinds, boxes = extract(fig)
+    tol = TOLERANCE_PT * fig.dpi / 72
+    candidates = candidate_pairs(boxes)
+    pairs, kind = find_overlaps(kinds, boxes, tol, shapes, candidates)
+    for (i, j), what in zip(pairs, kind):
+        # text/shape 时文字写在前面
+        if kinds[i] == SHAPE and kinds[j] == TEXT:
+            i, j = j, i
+        print(f"   {label}: {what:<11} {_label(artists[i])} {_data_box(artists[i], boxes[i])}"
+              f"  ×  {_label(artists[j])} {_data_box(artists[j], boxes[j])}")
+    return len(pairs), len(artists), len(candidates)
+
+
+def lint(names, shapes=False):
+    """检查给定图表, 返回退出码 (0 = 没有问题)"""
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    total = 0
+    for label, fig in figures(names):
+        t0 = time.perf_counter()
+        issues, count, candidates = check(label, fig, shapes)
+        plt.close(fig)
+        total += issues
+        mark = '❌' if issues else '✓'
+        print(f"{mark} {label}: {issues} overlap(s) among {count} artists, "
+              f"{candidates} candidate pairs of {count * (count - 1) // 2} "
+              f"({time.perf_counter() - t0:.2f}s)")
+    print(f"⏱  Total: {time.perf_counter() - start:.2f}s, {total} overlap(s)")
+    return 1 if total else 0
+
+
+def all_names():
+    import diagrams
+    return list(diagrams.all_diagrams())
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='overlaps', description='report overlapping labels and shapes')
+    parser.add_argument('diagrams', nargs='*', metavar='DIAGRAM')
+    parser.add_argument('--shapes', action='store_true', help='also report partially overlapping shapes')
+    args = parser.parse_args(argv)
+
+    names = all_names()
+    unknown = [name for name in args.diagrams if name not in names]
+    if unknown:
+        print(f"❌ unknown diagram(s): {', '.join(unknown)}")
+        return 2
+    return lint(args.diagrams or names, args.shapes)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
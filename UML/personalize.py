@@ -0,0 +1,381 @@
+"""
+Minority Wins Game - 个性化原型图 (Personalised Wireframes)
+
+给每个玩家生成一张自己的结果界面: 赢家是 results (奖励明细), 揭示了的
+输家是 lost, 没有揭示的是 failed_reveal。界面上的局号、人数、下注、押金、
+奖励等文字是 UML4.WIREFRAME_DATA 里的模板字段, 每条记录只是这些字段不同
+(CSV 也可以生成 commit / reveal 界面)。
+
+版面对所有记录都一样, 所以每种界面只建一次 figure (模板): 画好之后把
+静态部分的像素缓存下来 (copy_from_bbox), 数据文字设为 animated 不进
+缓存。每条记录只做 restore_region + set_text + draw_artist, 取画布像素
+直接交给 Pillow 保存, 不重新建 figure、不重新排版, 也不走 savefig。
+
+数据来源:
+    *.csv         每行一条记录, screen 列选择界面, 其余列是模板字段 (缺的字段用默认值)
+    *.json / 目录  multi-player-test.js 的结果文件, 每个玩家一条记录 (见 records_from_results)
+
+使用方法 (在 UML 目录下):
+    python personalize.py                                  # 默认结果文件, 输出到 personalized/
+    python personalize.py players.csv -o out/ --name '{player}.png' --dpi 80 -j 4
+    python personalize.py runs/ --compare 5                # 顺便和逐条完整绘制比较速度
+"""
+import argparse
+import collections
+import csv
+import math
+import os
+import sys
+import time
+
+import profiling
+import tiled
+import UML4
+
+DPI = 100
+OUTPUT_DIR = 'personalized'
+NAME = '{index:05d}_{screen}.png'
+# 押金占下注的比例 (结果文件里没有押金, 和原型图的默认数据一致)
+DEPOSIT_RATIO = 0.5
+# 输家是否揭示确定不了时, lost 界面上押金的说法
+UNSURE_DEPOSIT = {
+    'deposit_label': 'Deposit (if revealed)',
+    'deposit_note': 'Your deposit is returned only if',
+    'deposit_reason': 'you revealed your choice before the deadline.',
+}
+# 每个工作进程一次领取的记录数
+CHUNK = 64
+# 每个数据字段最多缓存多少种内容的像素块 (最近使用的优先保留)
+TEXT_CACHE = 64
+
+
+# ============= 数据 (Records) =============
+def _amount(value):
+    """金额的显示格式: 最多 4 位小数, 至少 1 位 (2.0, 0.75, 1.0667)"""
+    text = f"{value:.4f}".rstrip('0')
+    return text + '0' if text.endswith('.') else text
+
+
+def _revealed(player, counts, committed):
+    """输家是否揭示: True / False, 确定不了时为 None
+
+    结果文件的 distribution 只有每个选项的揭示人数, 和提交人数相同或为 0 才能确定。
+    """
+    if 'revealed' in player:
+        return bool(player['revealed'])
+    choice = player['choice']
+    if counts[choice] >= committed[choice]:
+        return True
+    return False if counts[choice] == 0 else None
+
+
+def records_from_results(paths, deposit_ratio=DEPOSIT_RATIO, skipped=None):
+    """结果文件里的每个玩家一条记录: {'screen': 界面, 字段: 字符串}
+
+    在 winners 里的玩家是赢家; 选了获胜选项却不在 winners 里的没有揭示;
+    其余是输家, 是否揭示见 _revealed; 确定不了的输家押金说明用
+    UNSURE_DEPOSIT。没有获胜选项的对局 (平局或无人揭示) 不生成记录,
+    路径追加到 skipped。
+    """
+    import results
+
+    for path, data in results.iter_rounds(paths):
+        options = data['vote']['options']
+        analysis = data.get('analysis', {})
+        if analysis.get('winner') not in options:
+            if skipped is not None:
+                skipped.append(path)
+            continue
+        win = options.index(analysis['winner'])
+        counts = [int(analysis.get('distribution', {}).get(str(i), 0)) for i in range(len(options))]
+        stakes = [float(v) for v in analysis.get('optionTotals', ['0'] * len(options))]
+        others = [i for i in range(len(options)) if i != win]
+        committed = collections.Counter(player['choice'] for player in data['players'])
+        game = int(data['vote'].get('id', 0))
+        round_data = {
+            'game': str(game), 'next_game': str(game + 1),
+            'winner': options[win], 'banner': options[win].upper(), 'winner_icon': UML4.option_icon(win),
+            'winner_players': str(counts[win]), 'winner_stake': _amount(stakes[win]),
+            'loser': options[others[0]] if len(others) == 1 else 'Others',
+            'loser_icon': UML4.option_icon(others[0]) if len(others) == 1 else '👥',
+            'loser_players': str(sum(counts) - counts[win]),
+            'loser_stake': _amount(sum(stakes) - stakes[win]),
+        }
+        rewards = {w['playerIndex']: float(w['reward']) for w in data.get('winners', ())}
+
+        for player in data['players']:
+            bet = float(player['betAmount'])
+            deposit = bet * deposit_ratio
+            record = dict(round_data, player=str(player['index']), address=player.get('address', ''),
+                          bet=_amount(bet), deposit=_amount(deposit))
+            if player['index'] in rewards:
+                # 合约支付的是 下注 + 分成, 押金另外退还
+                share = rewards[player['index']] - bet
+                reward = bet + deposit + share
+                record.update(screen='results', share=_amount(share), reward=_amount(reward),
+                              roi=f"{(reward - bet) / bet:+.1%}")
+            elif player['choice'] == win or _revealed(player, counts, committed) is False:
+                record.update(screen='failed_reveal')
+            else:
+                record.update(screen='lost', choice=options[player['choice']],
+                              net=_amount(deposit - bet))
+                if _revealed(player, counts, committed) is None:
+                    record.update(UNSURE_DEPOSIT)
+            yield record
+
+
+def records_from_csv(path):
+    """CSV 表格的每一行一条记录; screen 列必须是 WIREFRAME_DATA 里的界面"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            if row.get('screen') not in UML4.WIREFRAME_DATA:
+                raise ValueError(f"{path}:{line}: screen must be one of {', '.join(UML4.WIREFRAME_DATA)}")
+            yield {key: value for key, value in row.items() if key is not None and value not in (None, '')}
+
+
+def load_records(paths, deposit_ratio=DEPOSIT_RATIO, skipped=None):
+    """按扩展名选择数据来源, 依次产生记录"""
+    for path in paths:
+        if path.lower().endswith('.csv'):
+            yield from records_from_csv(path)
+        else:
+            yield from records_from_results([path], deposit_ratio, skipped)
+
+
+# ============= 模板 (Screen Template) =============
+class ScreenTemplate:
+    """一种界面的模板: 版面只画一次, 之后每条记录只重画数据文字
+
+    每段数据文字按 (字段位置, 内容) 缓存它的"墨迹": 在纯背景上画一次,
+    和背景不同的像素连同位置一起存下来。同一局的局号、人数, 常见的下注
+    金额只画一次, 之后直接把墨迹拷贝到背景上。两段文字的墨迹相交时拷贝
+    无法还原混合后的颜色, 这条记录就全部正常绘制。
+
+    layout 是 UML4.WIREFRAME_LAYOUT_FIELDS 里会改变图形的字段, 画进背景,
+    这些字段不同的记录要用不同的模板。
+    """
+
+    def __init__(self, screen, dpi=DPI, layout=None):
+        UML4._import_matplotlib()
+        np = UML4.np
+        self.screen = screen
+        self.defaults = dict(UML4.WIREFRAME_DATA[screen], **(layout or {}))
+        draw = dict(UML4.WIREFRAME_SCREENS)[screen]
+        with profiling.phase(f'personalize/{screen}', 'build'):
+            self.fig = UML4.plt.figure(figsize=UML4.WIREFRAME_SCREEN_SIZE, dpi=dpi, facecolor='white')
+            ax = self.fig.add_subplot(1, 1, 1)
+            self.slots = draw(ax, self.defaults)
+            self.fig.tight_layout()
+            UML4.batching.batch_artists(ax)
+        with profiling.phase(f'personalize/{screen}', 'background', self.fig):
+            # 数据文字不画进背景, 每条记录单独画
+            for text, _ in self.slots:
+                text.set_animated(True)
+            canvas = self.fig.canvas
+            canvas.draw()
+            self.background = canvas.copy_from_bbox(self.fig.bbox)
+            self.base = np.asarray(canvas.buffer_rgba()).copy()
+            self.png = tiled.PatchedPNG(self.base, dpi)
+        # 抗锯齿的边缘可能超出文字的外框一两个像素
+        self.pad = 2 + dpi // 100
+        self.cache = [collections.OrderedDict() for _ in self.slots]
+        self.hits = self.misses = 0
+
+    def _ink(self, text, renderer, pixels):
+        """在纯背景上画一段文字, 返回它的墨迹 (top, left, 像素, 掩码); 画完恢复背景"""
+        np = UML4.np
+        height, width = self.base.shape[:2]
+        x0, y0, x1, y1 = text.get_window_extent(renderer).extents
+        top, bottom = max(height - math.ceil(y1) - self.pad, 0), min(height - math.floor(y0) + self.pad, height)
+        left, right = max(math.floor(x0) - self.pad, 0), min(math.ceil(x1) + self.pad, width)
+        self.fig.draw_artist(text)
+        region = pixels[top:bottom, left:right]
+        mask = (region != self.base[top:bottom, left:right]).any(axis=2)
+        rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+        if not rows.size:
+            return None
+        r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        ink = (top + r0, left + c0, region[r0:r1, c0:c1].copy(), mask[r0:r1, c0:c1].copy())
+        region[:] = self.base[top:bottom, left:right]
+        return ink
+
+    def render(self, record):
+        """把一条记录画到画布上, 返回 (RGBA 视图, 改动的行范围); 视图在下次 render 前有效"""
+        np = UML4.np
+        canvas = self.fig.canvas
+        renderer = canvas.get_renderer()
+        data = dict(self.defaults, **record)
+        canvas.restore_region(self.background)
+        pixels = np.asarray(canvas.buffer_rgba())
+
+        contents, inks = [], []
+        for (text, template), cache in zip(self.slots, self.cache):
+            content = template.format_map(data)
+            if content in cache:
+                cache.move_to_end(content)
+                self.hits += 1
+            else:
+                text.set_text(content)
+                cache[content] = self._ink(text, renderer, pixels)
+                if len(cache) > TEXT_CACHE:
+                    cache.popitem(last=False)
+                self.misses += 1
+            contents.append(content)
+            if cache[content] is not None:
+                inks.append(cache[content])
+
+        boxes = np.array([(top, top + block.shape[0], left, left + block.shape[1])
+                          for top, left, block, _ in inks]).reshape(-1, 4)
+        overlap = ((boxes[:, None, 0] < boxes[None, :, 1]) & (boxes[None, :, 0] < boxes[:, None, 1])
+                   & (boxes[:, None, 2] < boxes[None, :, 3]) & (boxes[None, :, 2] < boxes[:, None, 3]))
+        if np.triu(overlap, 1).any():
+            for (text, _), content in zip(self.slots, contents):
+                text.set_text(content)
+                self.fig.draw_artist(text)
+        else:
+            for top, left, block, mask in inks:
+                region = pixels[top:top + block.shape[0], left:left + block.shape[1]]
+                region[mask] = block[mask]
+        return pixels, [(top, bottom) for top, bottom, _, _ in boxes]
+
+    def save(self, record, path):
+        """渲染一条记录并保存为 PNG"""
+        pixels, dirty = self.render(record)
+        self.png.save(path, pixels, dirty)
+
+    def close(self):
+        UML4.plt.close(self.fig)
+
+
+# ============= 批量渲染 (Batch) =============
+# 每个进程里已经建好的模板 {(界面, dpi, 图形字段的值): ScreenTemplate}
+_templates = {}
+
+
+def _template(record, dpi):
+    screen = record['screen']
+    fields = UML4.WIREFRAME_LAYOUT_FIELDS.get(screen, ())
+    layout = {field: record[field] for field in fields if field in record}
+    key = (screen, dpi, tuple(sorted(layout.items())))
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = ScreenTemplate(screen, dpi, layout)
+    return template
+
+
+def render_batch(batch, output_dir, name, dpi):
+    """渲染一批 (序号, 记录), 返回保存的路径列表 (也是进程池任务)"""
+    paths = []
+    for index, record in batch:
+        path = os.path.join(output_dir, name.format_map(dict(record, index=index)))
+        _template(record, dpi).save(record, path)
+        paths.append(path)
+    return paths
+
+
+def _batches(records, size):
+    batch = []
+    for item in enumerate(records):
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def personalize(records, output_dir=OUTPUT_DIR, name=NAME, dpi=DPI, jobs=1):
+    """渲染所有记录, 返回保存的图片数
+
+    jobs > 1 时按 CHUNK 条一批分给进程池, 每个工作进程为自己用到的界面各建一次模板。
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    count = 0
+    if jobs <= 1:
+        for batch in _batches(records, CHUNK):
+            count += len(render_batch(batch, output_dir, name, dpi))
+        return count
+
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    task = partial(render_batch, output_dir=output_dir, name=name, dpi=dpi)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for paths in pool.map(task, _batches(records, CHUNK)):
+            count += len(paths)
+    return count
+
+
+def full_render_time(records, dpi=DPI):
+    """逐条完整绘制的平均耗时, 用来对比: 和 draw_wireframes 保存单个界面的方式相同"""
+    import tempfile
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, record in enumerate(records):
+            data = dict(UML4.WIREFRAME_DATA[record['screen']], **record)
+            rgba = UML4.render_wireframe_screen(record['screen'], dpi, data)
+            UML4.mpimg.imsave(os.path.join(tmp, f'{i}.png'), rgba, dpi=dpi)
+    return (time.perf_counter() - start) / max(len(records), 1)
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    import results
+
+    parser = argparse.ArgumentParser(prog='personalize', description='render one wireframe result screen per player')
+    parser.add_argument('paths', nargs='*', metavar='PATH',
+                        help=f'CSV tables, result files or directories (default: {results.DEFAULT_RESULTS})')
+    parser.add_argument('-o', '--output', default=OUTPUT_DIR, help=f'output directory (default: {OUTPUT_DIR})')
+    parser.add_argument('--name', default=NAME,
+                        help=f"PNG file name pattern, fields from the record plus {{index}} (default: {NAME})")
+    parser.add_argument('--dpi', type=int, default=DPI, help=f'output resolution (default: {DPI})')
+    parser.add_argument('--deposit', type=float, default=DEPOSIT_RATIO,
+                        help=f'deposit as a fraction of the bet for result files (default: {DEPOSIT_RATIO})')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes, 0 = one per CPU (default: 1)')
+    parser.add_argument('--compare', type=int, default=0, metavar='N',
+                        help='also time N records rendered from scratch, for comparison')
+    args = parser.parse_args(argv)
+    if not args.name.lower().endswith('.png'):
+        parser.error('--name must end with .png')
+
+    skipped = []
+    try:
+        records = list(load_records(args.paths or [results.DEFAULT_RESULTS], args.deposit, skipped))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    if skipped:
+        print(f"⚠️  Skipped {len(skipped)} round(s) without a winning option")
+    if not records:
+        print("❌ no records to render")
+        return 1
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    start = time.perf_counter()
+    with profiling.session() as timings:
+        try:
+            count = personalize(records, args.output, args.name, args.dpi, jobs)
+        except (KeyError, ValueError) as e:
+            print(f"❌ bad --name pattern or record: {e}")
+            return 1
+    elapsed = time.perf_counter() - start
+    print(f"✓ {count} personalised screens saved in '{args.output}'")
+    if timings:
+        print(profiling.format_summary(timings))
+    hits = sum(t.hits for t in _templates.values())
+    misses = sum(t.misses for t in _templates.values())
+    if hits + misses:
+        print(f"📦 Text cache: {hits / (hits + misses):.0%} of {hits + misses} data texts copied instead of drawn")
+    print(f"⏱  {elapsed:.2f}s, {elapsed / count * 1000:.1f} ms/screen ({count / elapsed:.0f} screens/s)")
+
+    if args.compare:
+        full = full_render_time(records[:args.compare], args.dpi)
+        print(f"📊 From scratch: {full * 1000:.0f} ms/screen, "
+              f"{full / (elapsed / count):.0f}× slower than the template")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Minority Wins Game - PlantUML 批量渲染 (PlantUML Batch Renderer)
+
+`plantuml file.puml` 每次调用都要启动一个 JVM, 文件一多, 大部分时间都
+花在 JVM 启动上。这里启动少量常驻的 `plantuml -pipe` 进程, 把 .puml 源码
+依次写进它的标准输入, 从标准输出读回图片 (每张图后面跟一个分隔行),
+所有文件共用这几个 JVM:
+
+    python plantuml_batch.py                     # 渲染当前目录下所有 .puml
+    python plantuml_batch.py a.puml b.puml -j 2 --timeout 30 -t svg
+
+    results = render_files(['use_case_diagram.puml', 'enhanced_use_case_diagram.puml'])
+
+同时运行的进程数 (jobs) 有上限; 每个文件有超时, 超时的进程会被杀掉,
+下一个文件换一个新进程。
+
+plantuml 命令按以下顺序查找: 环境变量 PLANTUML (任意命令行, 测试时可以
+换成桩程序) > PATH 上的 plantuml > java -jar $PLANTUML_JAR。
+"""
+import argparse
+import glob
+import os
+import queue
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import warnings
+
+DEFAULT_JOBS = 2
+# 单个文件的渲染超时 (秒), 第一个文件还包括 JVM 启动时间
+DEFAULT_TIMEOUT = 60
+FORMATS = ('png', 'svg')
+# 等图片时每隔多久读一次 stderr (秒)
+ERROR_POLL = 0.1
+# plantuml 的语法错误以单独一行 "ERROR" (接着是行号和说明) 或 "Syntax Error" 开头;
+# stderr 上的其他输出 (例如 JVM 的 "Picked up _JAVA_OPTIONS: ...") 只作为警告
+ERROR_LINE = re.compile(r'^(ERROR$|Syntax Error)')
+
+
+def plantuml_command():
+    """返回启动 plantuml 的命令行 (列表); 找不到时抛出 FileNotFoundError"""
+    if os.environ.get('PLANTUML'):
+        return shlex.split(os.environ['PLANTUML'])
+    if shutil.which('plantuml'):
+        return ['plantuml']
+    if os.environ.get('PLANTUML_JAR'):
+        return ['java', '-Djava.awt.headless=true', '-jar', os.environ['PLANTUML_JAR']]
+    raise FileNotFoundError("plantuml not found: install it, or set PLANTUML or PLANTUML_JAR")
+
+
+def count_diagrams(source):
+    """源码里 @startxxx 块的数量, 每个块生成一张图"""
+    return sum(1 for line in source.splitlines() if line.strip().lower().startswith('@start'))
+
+
+def output_paths(path, count, fmt):
+    """和 plantuml 命令行相同的命名: a.png, a_001.png, a_002.png ..."""
+    root = os.path.splitext(path)[0]
+    return [f"{root}.{fmt}" if i == 0 else f"{root}_{i:03d}.{fmt}" for i in range(count)]
+
+
+# ============= 常驻进程 (Pipe Process) =============
+class PlantUMLProcess:
+    """一个常驻的 plantuml -pipe 进程, 一次渲染一个文件"""
+
+    def __init__(self, command, fmt='png'):
+        # 分隔行带随机串, 不会和图片内容冲突
+        self.delimiter = f"@@plantuml-batch-{uuid.uuid4().hex}@@".encode('ascii')
+        self.proc = subprocess.Popen(
+            command + [f'-t{fmt}', '-charset', 'UTF-8', '-pipe',
+                       '-pipedelimitor', self.delimiter.decode('ascii')],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.images = queue.Queue()
+        # stderr 不开线程读: plantuml 先写完一个文件的错误信息再输出它的分隔行,
+        # 所以收到分隔行时这些错误已经在管道里, render() 自己非阻塞读空即可,
+        # 不会漏掉, 也不会算到下一个文件头上
+        os.set_blocking(self.proc.stderr.fileno(), False)
+        self._stderr = b''
+        threading.Thread(target=self._read_images, daemon=True).start()
+
+    def _read_images(self):
+        """把标准输出按分隔行切成一张张图片; 进程退出时放入 None"""
+        buffer = b''
+        while True:
+            chunk = self.proc.stdout.read1(1 << 16)
+            if not chunk:
+                break
+            buffer += chunk
+            while True:
+                index = buffer.find(self.delimiter)
+                if index < 0:
+                    break
+                end = buffer.find(b'\n', index)
+                if end < 0:
+                    break
+                self.images.put(buffer[:index])
+                buffer = buffer[end + 1:]
+        self.images.put(None)
+
+    def _drain_errors(self):
+        """把 stderr 管道里已有的内容读进缓冲区 (不阻塞)"""
+        while True:
+            try:
+                chunk = os.read(self.proc.stderr.fileno(), 1 << 16)
+            except BlockingIOError:
+                return
+            if not chunk:
+                return
+            self._stderr += chunk
+
+    def _take_errors(self):
+        """读空 stderr, 返回到目前为止的错误行并清空缓冲区"""
+        self._drain_errors()
+        text, self._stderr = self._stderr, b''
+        return [line.rstrip() for line in text.decode('utf-8', 'replace').splitlines() if line.strip()]
+
+    @staticmethod
+    def _warn(lines):
+        for line in lines:
+            warnings.warn(f"plantuml: {line}", stacklevel=3)
+
+    def render(self, source, timeout=DEFAULT_TIMEOUT):
+        """渲染一段源码, 返回图片 (bytes) 列表
+
+        语法错误抛出 ValueError, 超时抛出 TimeoutError; stderr 上不是错误的输出转成警告。
+        """
+        count = count_diagrams(source)
+        if count == 0:
+            raise ValueError("no @startuml block found")
+        # 上一个文件之后才出现的输出 (例如 JVM 启动信息) 不属于这个文件
+        self._warn(self._take_errors())
+        if not source.endswith('\n'):
+            source += '\n'
+        self.proc.stdin.write(source.encode('utf-8'))
+        self.proc.stdin.flush()
+        deadline = time.monotonic() + timeout
+        images = []
+        while len(images) < count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.kill()
+                raise TimeoutError(f"no output after {timeout}s")
+            try:
+                image = self.images.get(timeout=min(remaining, ERROR_POLL))
+            except queue.Empty:
+                # 等待期间也要读 stderr, 否则错误输出写满管道会把 plantuml 卡住
+                self._drain_errors()
+                continue
+            if image is None:
+                code = self.proc.wait()
+                detail = '; '.join(self._take_errors()[-3:])
+                raise RuntimeError(f"plantuml exited with code {code}" + (f": {detail}" if detail else ''))
+            images.append(image)
+        lines = self._take_errors()
+        # plantuml 遇到语法错误时仍然输出一张 "错误图片", 错误信息在分隔行之前写到 stderr;
+        # 第一个错误行之前的输出是警告, 从它开始是错误信息
+        first = next((i for i, line in enumerate(lines) if ERROR_LINE.match(line)), len(lines))
+        self._warn(lines[:first])
+        if first < len(lines):
+            raise ValueError('; '.join(lines[first:]))
+        return images
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def kill(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def close(self, timeout=5):
+        if not self.alive():
+            return
+        self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+
+# ============= 批量渲染 (Batch) =============
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def render_files(paths, fmt='png', jobs=DEFAULT_JOBS, timeout=DEFAULT_TIMEOUT, command=None):
+    """用最多 jobs 个常驻 plantuml 进程渲染 paths, 图片写在 .puml 旁边
+
+    返回与 paths 顺序相同的 [(path, 输出文件列表, 耗时秒数, 错误信息或 None)]。
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    command = command or plantuml_command()
+    pending = queue.Queue()
+    for i, path in enumerate(paths):
+        pending.put((i, path))
+    results = [None] * len(paths)
+
+    def worker():
+        process = None
+        try:
+            while True:
+                try:
+                    i, path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                start = time.perf_counter()
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        source = f.read()
+                    if process is None or not process.alive():
+                        process = PlantUMLProcess(command, fmt)
+                    images = process.render(source, timeout)
+                    outputs = output_paths(path, len(images), fmt)
+                    for output, image in zip(outputs, images):
+                        _write_atomic(output, image)
+                    results[i] = (path, outputs, time.perf_counter() - start, None)
+                except (OSError, ValueError, RuntimeError) as e:
+                    # TimeoutError 是 OSError 的子类; 进程已经被杀掉, 下一个文件重新启动
+                    results[i] = (path, [], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+        finally:
+            if process is not None:
+                process.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(max(1, min(jobs, len(paths))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render .puml files through persistent PlantUML processes')
+    parser.add_argument('files', nargs='*', metavar='FILE',
+                        help='.puml files to render (default: all *.puml in the current directory)')
+    parser.add_argument('-t', '--format', choices=FORMATS, default='png', help='output format (default: png)')
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        help=f'number of plantuml processes (default: {DEFAULT_JOBS})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'seconds allowed per file (default: {DEFAULT_TIMEOUT})')
+    args = parser.parse_args(argv)
+
+    files = args.files or sorted(glob.glob('*.puml'))
+    if not files:
+        print("❌ no .puml files found")
+        return 1
+    try:
+        command = plantuml_command()
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    start = time.perf_counter()
+    results = render_files(files, args.format, args.jobs, args.timeout, command)
+    failed = 0
+    for path, outputs, elapsed, error in results:
+        if error:
+            failed += 1
+            print(f"❌ {path}: {error}")
+        else:
+            print(f"✅ {path} -> {', '.join(outputs)} ({elapsed:.2f}s)")
+    print(f"⏱  {len(files)} file(s) in {time.perf_counter() - start:.2f}s "
+          f"with {min(args.jobs, len(files))} plantuml process(es)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Minority Wins Game - 渲染阶段计时 (Phase Profiling)
+
+记录每个图表各个阶段 (构建 artist、tight_layout、合并图元、savefig
+光栅化与 PNG 编码……) 的墙钟时间、CPU 时间、artist 数量和常驻内存
+(阶段内的峰值、阶段结束时的 RSS 和阶段内的增长),
+输出 JSON 报告, 也可以输出 Chrome trace-event 格式
+(在 chrome://tracing 或 https://ui.perfetto.dev 中打开)。
+
+没有启用时 phase() 什么都不做, 绘图函数里的计时点几乎没有开销:
+
+    with profiling.phase('system_flow', 'savefig'):
+        fig.savefig(...)
+
+    with profiling.session() as records:    # 在当前进程 (或工作进程) 中启用
+        draw_system_flow()
+    profiling.write_report('profile.json', records)
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块, 不记录内存
+    resource = None
+
+# 当前进程中正在收集的记录列表, None 表示未启用
+_records = None
+# 还没结束的阶段内到目前为止的峰值 (MB), 嵌套阶段重置高水位前先记进来
+_open_peaks = []
+# 重置高水位之前看到的最大值, peak_rss_mb() 要算上
+_reset_peak = 0.0
+
+
+def enabled():
+    return _records is not None
+
+
+def peak_rss_mb():
+    """进程启动以来的峰值常驻内存 (MB); 平台不支持时返回 None
+
+    只会增加不会减少, 适合每个用例单独一个进程的基准测试; 阶段记录用 hwm_mb()。
+    phase() 重置过高水位时, 把重置前的最大值也算上。
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位是 KB, macOS 是字节
+    peak = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return max(peak, _reset_peak)
+
+
+def hwm_mb():
+    """上次重置以来的峰值常驻内存 (MB), 读取 /proc/self/status 的 VmHWM; 不支持时返回 None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_hwm():
+    """把 VmHWM 重置为当前 RSS (向 /proc/self/clear_refs 写 5, Linux 4.0+); 成功时返回 True"""
+    global _reset_peak
+    before = hwm_mb()
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    if before is not None:
+        _reset_peak = max(_reset_peak, before)
+    return True
+
+
+def rss_mb():
+    """当前常驻内存 (MB), 读取 /proc/self/statm; 没有 /proc 的平台返回 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def count_artists(fig=None):
+    """figure 中 artist 的总数 (递归, 包括坐标轴、刻度等); 没有 figure 时返回 None"""
+    if fig is None:
+        plt = sys.modules.get('matplotlib.pyplot')
+        if plt is None or not plt.get_fignums():
+            return None
+        fig = plt.gcf()
+    return sum(1 for _ in fig.findobj())
+
+
+def _max_or_none(a, b):
+    return max(a, b) if a is not None and b is not None else None
+
+
+def _fold_peak(peak):
+    """把 peak 并入所有还没结束的阶段"""
+    _open_peaks[:] = [_max_or_none(p, peak) for p in _open_peaks]
+
+
+@contextmanager
+def phase(diagram, name, fig=None):
+    """记录一个阶段; fig 为 None 时统计当前 figure 的 artist 数量"""
+    if _records is None:
+        yield
+        return
+    start = time.time()
+    # 外层阶段的峰值先记下来, 再重置高水位, 从这里开始量本阶段的峰值
+    _fold_peak(hwm_mb())
+    _open_peaks.append(rss_mb() if reset_hwm() else None)
+    rss = rss_mb()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        end_rss = rss_mb()
+        peak = _max_or_none(_open_peaks.pop(), hwm_mb())
+        # 嵌套阶段结束, 把它的峰值并入外层阶段
+        _fold_peak(peak)
+        record = {
+            'diagram': diagram,
+            'phase': name,
+            'start': start,
+            'wall': time.perf_counter() - wall,
+            'cpu': time.process_time() - cpu,
+            'artists': count_artists(fig),
+            # 阶段内的峰值 (重置不了 VmHWM 的平台为 None)、结束时的 RSS 和阶段内的增长 (释放内存时为负)
+            'peak_rss_mb': peak,
+            'rss_mb': end_rss,
+            'rss_growth_mb': end_rss - rss if end_rss is not None and rss is not None else None,
+            'pid': os.getpid(),
+        }
+        _records.append(record)
+
+
+@contextmanager
+def session(enable=True):
+    """在当前进程中启用记录, 产出记录列表; 结束后恢复之前的状态
+
+    工作进程里用它把记录收集起来随结果一起返回, 主进程再用 extend() 合并。
+    """
+    global _records
+    previous = _records
+    records = [] if enable else None
+    _records = records
+    try:
+        yield records if records is not None else []
+    finally:
+        _records = previous
+
+
+def extend(records):
+    """把工作进程返回的记录合并到当前会话"""
+    if _records is not None and records:
+        _records.extend(records)
+
+
+# ============= 报告 (Reports) =============
+def summarize(records):
+    """按图表汇总: {diagram: {phase: {wall, cpu, calls, artists, peak_rss_mb, rss_mb, rss_growth_mb}}}
+
+    多次调用时 artists 和三个内存字段取最大值。
+    """
+    summary = {}
+    for r in records:
+        phases = summary.setdefault(r['diagram'], {})
+        entry = phases.setdefault(r['phase'], {'wall': 0.0, 'cpu': 0.0, 'calls': 0,
+                                               'artists': None, 'peak_rss_mb': None, 'rss_mb': None,
+                                               'rss_growth_mb': None})
+        entry['wall'] += r['wall']
+        entry['cpu'] += r['cpu']
+        entry['calls'] += 1
+        for key in ('artists', 'peak_rss_mb', 'rss_mb', 'rss_growth_mb'):
+            if r.get(key) is not None:
+                entry[key] = r[key] if entry[key] is None else max(entry[key], r[key])
+    return summary
+
+
+def write_report(path, records, **meta):
+    """写出 JSON 报告: 元数据、按图表汇总的结果和原始记录"""
+    report = dict(meta, generated=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  summary=summarize(records), records=records)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def write_trace(path, records):
+    """写出 Chrome trace-event 格式; 每个进程一行, 每个阶段一个 'X' 事件"""
+    events = []
+    origin = min((r['start'] for r in records), default=0)
+    for r in records:
+        events.append({
+            'name': r['phase'],
+            'cat': r['diagram'],
+            'ph': 'X',
+            'ts': round((r['start'] - origin) * 1e6),
+            'dur': round(r['wall'] * 1e6),
+            'pid': r['pid'],
+            'tid': r['pid'],
+            'args': {k: r.get(k) for k in ('diagram', 'cpu', 'artists', 'peak_rss_mb', 'rss_mb',
+                                                     'rss_growth_mb')},
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def format_summary(records):
+    """终端里打印的简表, 每个图表一行, 列出各阶段耗时和阶段内的峰值内存"""
+    lines = []
+    for diagram, phases in summarize(records).items():
+        parts = ', '.join(f"{name} {entry['wall']:.2f}s" + (f"/{entry['peak_rss_mb']:.0f}MB"
+                                                            if entry['peak_rss_mb'] is not None else '')
+                          for name, entry in phases.items())
+        lines.append(f"{diagram}: {parts}")
+    return '\n'.join(lines)
@@ -0,0 +1,448 @@
+"""
+Minority Wins Game - PlantUML 用例图子集渲染器 (PlantUML Subset Renderer)
+
+UML2.py 生成的 .puml 只用到很小的一个子集。这里在进程内解析这个子集,
+转换成图表描述 (见 diagram_spec.py), 再用 UML.py 基础用例图的画法
+(specs/use_case_basic.json 里的样式) 渲染, 不需要 Java 和 plantuml:
+
+    python puml.py use_case_diagram.puml enhanced_use_case_diagram.puml
+    python puml.py use_case_diagram.puml -o out.png --dpi 150
+
+    plan = load_plan('use_case_diagram.puml')[0]
+    fig, ax = diagram_spec.build_figure(plan)
+
+支持的语句:
+
+    @startuml / @enduml                   一个文件可以有多个图, 输出命名和 plantuml 相同
+    ' 注释, /' 块注释 '/
+    left to right direction
+    title 文字
+    skinparam ActorBorderColor|UseCaseBorderColor|RectangleBorderColor|ArrowColor 颜色
+    actor Name [#color] / actor "Label" as Name [#color]
+    rectangle "Label" [#color] { ... }    系统边界, 只支持一层
+    usecase "Label" as UCn [#color]
+    A --> B [: 标签]                       关联 (实线箭头)
+    A ..> B [: <<extend>>]                 依赖 (虚线箭头)
+    A ..|> B [: <<include>>]               虚线空心三角箭头
+    legend [位置] ... endlegend            表格竖线会被去掉
+
+其他 skinparam 会被忽略; 其他语句抛出 PumlError, 消息里带行号。
+布局: 分层自动布局 (见 layout.py), 参与者在左边一列, 用例在系统边界里按关系
+从左到右分层, 跨层的关系经过中间的折点绕开其他用例。
+"""
+import argparse
+import math
+import os
+import re
+import sys
+import time
+
+import diagram_spec
+import layout
+import plantuml_batch
+
+# 提供样式的描述文件 (UML.py 的基础用例图)
+BASE_SPEC = 'use_case_basic'
+
+# 布局 (数据坐标, 行距和参与者位置沿用 UML.py 的基础用例图)
+ROW_STEP = 1.5
+COL_STEP = 4
+ACTOR_X = 1
+BOUNDARY_X = 2
+BOUNDARY_Y = 0.5
+FIRST_COL_X = 5
+# 用例中心到系统边界的距离
+MARGIN = 1
+# 参与者 (小人 + 标签) 在布局里占的行数, 用例占 1 行
+ACTOR_ROWS = 2
+LEGEND_LINE = 0.35
+# 连线在用例列外多远处拐弯后水平进出椭圆 (列间空隙是 COL_STEP - 用例宽度)
+COLUMN_ENTRY = 0.4
+
+# skinparam 名称 -> 对应的颜色设置 (解析时不区分大小写)
+SKINPARAMS = {
+    'ActorBorderColor': 'actor_border',
+    'UseCaseBorderColor': 'use_case_border',
+    'RectangleBorderColor': 'boundary_border',
+    'ArrowColor': 'arrow',
+}
+_SKINPARAM_KEYS = {name.lower(): key for name, key in SKINPARAMS.items()}
+
+# 连线运算符 -> (线型, 箭头)
+LINKS = {
+    '-->': ('solid', 'open'),
+    '->': ('solid', 'open'),
+    '..>': ('dashed', 'open'),
+    '..|>': ('dashed', 'triangle'),
+}
+
+
+class PumlError(ValueError):
+    """不支持或写错的 PlantUML 语句, 消息里带有文件名和行号"""
+
+
+# ============= 解析 (Parse) =============
+_COLOR = r'(?:\s+(#\w+))?'
+ACTOR_RE = re.compile(r'actor\s+(?:"([^"]+)"\s+as\s+(\w+)|(\w+))' + _COLOR + r'$', re.I)
+USECASE_RE = re.compile(r'usecase\s+(?:"([^"]+)"|\(([^)]+)\))\s+as\s+(\w+)' + _COLOR + r'$', re.I)
+RECTANGLE_RE = re.compile(r'rectangle\s+"([^"]+)"' + _COLOR + r'\s*\{$', re.I)
+LINK_RE = re.compile(r'(\w+)\s*(-->|->|\.\.\|>|\.\.>)\s*(\w+)(?:\s*:\s*(.+))?$')
+SKINPARAM_RE = re.compile(r'skinparam\s+(\w+)\s+(\S+)$', re.I)
+TITLE_RE = re.compile(r'title\s+(.+)$', re.I)
+LEGEND_RE = re.compile(r'legend(?:\s+(?:top|bottom|left|right|center)){0,2}$', re.I)
+
+
+def _color(value):
+    """PlantUML 颜色 -> matplotlib 颜色: #RRGGBB 原样保留, #Orange 之类去掉 #"""
+    if value is None:
+        return None
+    if re.fullmatch(r'#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})', value):
+        return value
+    return value.lstrip('#').lower()
+
+
+def _new_diagram():
+    return {'title': None, 'colors': {}, 'actors': [], 'boundary': None,
+            'use_cases': [], 'links': [], 'legend': None}
+
+
+def parse(source, where='<string>'):
+    """解析 .puml 源码, 返回每个 @startuml 块的图 (dict) 列表"""
+    diagrams = []
+    diagram = None
+    names = set()
+    in_boundary = in_legend = in_comment = False
+    for lineno, raw in enumerate(source.splitlines(), 1):
+        line = raw.strip()
+        loc = f"{where}:{lineno}"
+        if in_comment:
+            in_comment = "'/" not in line
+            continue
+        if in_legend:
+            if line.lower() == 'endlegend':
+                in_legend = False
+            else:
+                text = ' '.join(cell.strip() for cell in line.split('|') if cell.strip())
+                diagram['legend'].append(text)
+            continue
+        if not line or line.startswith("'"):
+            continue
+        if line.startswith("/'"):
+            in_comment = "'/" not in line[2:]
+            continue
+        if line.lower().startswith('@startuml'):
+            diagram = _new_diagram()
+            names = set()
+            continue
+        if diagram is None:
+            raise PumlError(f"{loc}: expected @startuml, got {line!r}")
+        if line.lower() == '@enduml':
+            if in_boundary:
+                raise PumlError(f"{loc}: rectangle is not closed")
+            diagrams.append(diagram)
+            diagram = None
+            continue
+
+        if line.lower() == 'left to right direction':
+            continue
+        m = SKINPARAM_RE.match(line)
+        if m:
+            key = _SKINPARAM_KEYS.get(m.group(1).lower())
+            if key:
+                diagram['colors'][key] = _color(m.group(2))
+            continue
+        m = TITLE_RE.match(line)
+        if m:
+            diagram['title'] = m.group(1).strip()
+            continue
+        if LEGEND_RE.match(line):
+            diagram['legend'] = []
+            in_legend = True
+            continue
+        m = ACTOR_RE.match(line)
+        if m:
+            label, alias, bare, color = m.groups()
+            name = alias or bare
+            if name in names:
+                raise PumlError(f"{loc}: duplicate name '{name}'")
+            names.add(name)
+            diagram['actors'].append({'name': name, 'label': label or bare, 'color': _color(color)})
+            continue
+        m = RECTANGLE_RE.match(line)
+        if m:
+            if in_boundary or diagram['boundary']:
+                raise PumlError(f"{loc}: only one (non-nested) rectangle is supported")
+            diagram['boundary'] = {'label': m.group(1), 'color': _color(m.group(2))}
+            in_boundary = True
+            continue
+        if line == '}':
+            if not in_boundary:
+                raise PumlError(f"{loc}: unexpected '}}'")
+            in_boundary = False
+            continue
+        m = USECASE_RE.match(line)
+        if m:
+            quoted, paren, name, color = m.groups()
+            if name in names:
+                raise PumlError(f"{loc}: duplicate name '{name}'")
+            names.add(name)
+            diagram['use_cases'].append({'name': name, 'label': quoted or paren, 'color': _color(color)})
+            continue
+        m = LINK_RE.match(line)
+        if m:
+            source_name, op, target, label = m.groups()
+            for name in (source_name, target):
+                if name not in names:
+                    raise PumlError(f"{loc}: '{name}' is used before it is declared")
+            diagram['links'].append({'from': source_name, 'to': target, 'op': op,
+                                     'label': label.strip() if label else None})
+            continue
+        raise PumlError(f"{loc}: unsupported statement {line!r}")
+
+    if diagram is not None:
+        raise PumlError(f"{where}: missing @enduml")
+    if not diagrams:
+        raise PumlError(f"{where}: no @startuml block found")
+    return diagrams
+
+
+# ============= 布局 (Layout) =============
+def _ellipse_offset(center, toward, width, height):
+    """从椭圆中心指向 toward 的射线与椭圆边界的交点, 相对中心的偏移"""
+    dx, dy = toward[0] - center[0], toward[1] - center[1]
+    if dx == 0 and dy == 0:
+        return [0, 0]
+    t = 1 / math.hypot(dx / (width / 2), dy / (height / 2))
+    return [dx * t, dy * t]
+
+
+def _span_columns(centers, source, target, width):
+    """折点 (虚拟节点) 在用例列的中线上; 换成横穿整列的一段 (进入点, 离开点)
+
+    虚拟节点只在它那一行占位, 从上一列斜着连到列的中线会穿过同一列的
+    其他用例; 改成在列的边缘进出, 斜线只出现在列与列之间的空隙里。
+    """
+    via = []
+    for i, (x, y) in enumerate(centers):
+        before = centers[i - 1] if i else source
+        after = centers[i + 1] if i + 1 < len(centers) else target
+        half = width / 2 if after[0] >= before[0] else -width / 2
+        via += [[x - half, y], [x + half, y]]
+    return via
+
+
+def _hits_any(a, b, centers, width, height):
+    """线段 a-b 是否进入任何一个椭圆 (中心 centers, 大小相同)"""
+    rx, ry = width / 2, height / 2
+    for cx, cy in centers:
+        # 缩放成单位圆, 看圆心到线段的距离
+        x1, y1, x2, y2 = (a[0] - cx) / rx, (a[1] - cy) / ry, (b[0] - cx) / rx, (b[1] - cy) / ry
+        dx, dy = x2 - x1, y2 - y1
+        t = max(0, min(1, -(x1 * dx + y1 * dy) / ((dx * dx + dy * dy) or 1)))
+        if (x1 + t * dx) ** 2 + (y1 + t * dy) ** 2 < 1:
+            return True
+    return False
+
+
+def _column_entry(center, toward, width):
+    """用例所在列外侧、和用例同高的折点 (在 toward 那一侧), 连线从这里水平进出椭圆"""
+    side = 1 if toward[0] >= center[0] else -1
+    return [center[0] + side * (width / 2 + COLUMN_ENTRY), center[1]]
+
+
+def layout_graph(diagram):
+    """图的拓扑, 作为 layout.layered 的参数: (节点, 边, 参与者, 节点大小)"""
+    actors = [a['name'] for a in diagram['actors']]
+    names = actors + [u['name'] for u in diagram['use_cases']]
+    edges = [(link['from'], link['to']) for link in diagram['links']]
+    return names, edges, actors, {name: ACTOR_ROWS for name in actors}
+
+
+def to_spec(diagram, name='puml'):
+    """把解析出的图转换成图表描述 (dict), 样式来自 BASE_SPEC"""
+    styles = diagram_spec.load_spec(diagram_spec.spec_path(BASE_SPEC))['styles']
+    colors = diagram['colors']
+    arrow = colors.get('arrow', styles['relationship']['line']['color'])
+    uc_style = styles['use_case']
+    uc_w, uc_h = uc_style['width'], uc_style['height']
+
+    result = layout.layered(*layout_graph(diagram))
+    span = max([*result['y'].values(), *(p[1] for route in result['routes'] for p in route)], default=0)
+
+    def point(layer_, row):
+        """布局坐标 (层, 行) -> 数据坐标; 第 0 层是参与者, 行从上往下"""
+        x = ACTOR_X if layer_ == 0 else FIRST_COL_X + COL_STEP * (layer_ - 1)
+        return [x, BOUNDARY_Y + MARGIN + ROW_STEP * (span - row)]
+
+    cols = max(1, result['layers'] - 1)
+    right = FIRST_COL_X + COL_STEP * (cols - 1) + uc_w / 2 + MARGIN
+    top = BOUNDARY_Y + MARGIN + ROW_STEP * span + MARGIN
+    width, height = right - BOUNDARY_X, top - BOUNDARY_Y
+    legend = diagram['legend'] or []
+    bottom = -(LEGEND_LINE * len(legend) + 0.6) if legend else 0
+    xmax, ymax = right + 1, top + 1
+
+    elements = []
+    positions = {}
+    if diagram['boundary']:
+        boundary = diagram['boundary']
+        edge = colors.get('boundary_border') or boundary['color'] or 'black'
+        elements.append({'type': 'rectangle', 'xy': [BOUNDARY_X, BOUNDARY_Y], 'width': width, 'height': height,
+                         'linewidth': 2, 'edgecolor': edge, 'facecolor': 'none', 'linestyle': '--'})
+        elements.append({'type': 'text', 'at': [BOUNDARY_X + width / 2, top + 0.2],
+                         'text': boundary['label'], 'ha': 'center', 'va': 'center',
+                         'fontsize': 14, 'fontweight': 'bold', 'color': boundary['color'] or edge})
+
+    actors = diagram['actors']
+    for actor in actors:
+        at = point(0, result['y'][actor['name']])
+        # 最下面的参与者的标签不能被裁掉
+        bottom = min(bottom, at[1] - styles['actor']['label_offset'] - 0.5)
+        positions[actor['name']] = ('actor', at)
+        item = {'type': 'actor', 'style': 'actor', 'id': actor['name'], 'at': at, 'label': actor['label']}
+        head = dict(styles['actor']['head'])
+        label_style = dict(styles['actor']['label_style'])
+        if actor['color']:
+            head['facecolor'] = label_style['color'] = actor['color']
+        if colors.get('actor_border'):
+            head['edgecolor'] = colors['actor_border']
+            item['limb'] = dict(styles['actor']['limb'], color=colors['actor_border'])
+        item.update(head=head, label_style=label_style)
+        elements.append(item)
+
+    for use_case in diagram['use_cases']:
+        at = point(result['layer'][use_case['name']], result['y'][use_case['name']])
+        positions[use_case['name']] = ('use_case', at)
+        item = {'type': 'use_case', 'style': 'use_case', 'id': use_case['name'], 'at': at,
+                'label': use_case['label']}
+        if use_case['color']:
+            item['facecolor'] = use_case['color']
+        if colors.get('use_case_border'):
+            item['edgecolor'] = colors['use_case_border']
+        elements.append(item)
+
+    for link, route in zip(diagram['links'], result['routes']):
+        linestyle, head_kind = LINKS[link['op']]
+        (kind1, p1), (kind2, p2) = positions[link['from']], positions[link['to']]
+        via = _span_columns([point(*p) for p in route], p1, p2, uc_w)
+        # 参与者从右手边连出, 用例从椭圆边界朝第一个 (最后一个) 折点连出
+        a1 = [p1[0] + 0.5, p1[1]] if kind1 == 'actor' else p1
+        a2 = [p2[0] + 0.5, p2[1]] if kind2 == 'actor' else p2
+        others = [at for n, (kind, at) in positions.items()
+                  if kind == 'use_case' and n not in (link['from'], link['to'])]
+        # 首尾两段斜穿同一列的其他用例时, 在列外加一个折点, 水平进出椭圆
+        if kind2 == 'use_case' and _hits_any((via[-1] if via else a1), p2, others, uc_w, uc_h):
+            via.append(_column_entry(p2, via[-1] if via else a1, uc_w))
+        if kind1 == 'use_case' and _hits_any(p1, (via[0] if via else a2), others, uc_w, uc_h):
+            via.insert(0, _column_entry(p1, via[0] if via else a2, uc_w))
+        off1 = [0.5, 0] if kind1 == 'actor' else _ellipse_offset(p1, via[0] if via else a2, uc_w, uc_h)
+        off2 = [0.5, 0] if kind2 == 'actor' else _ellipse_offset(p2, via[-1] if via else a1, uc_w, uc_h)
+        start = [p1[0] + off1[0], p1[1] + off1[1]]
+        end = [p2[0] + off2[0], p2[1] + off2[1]]
+        points = [start] + via + [end]
+        last = points[-2]
+        length = math.hypot(end[0] - last[0], end[1] - last[1]) or 1
+        base = styles['relationship' if linestyle == 'solid' else 'extend']
+        line = dict(base['line'], color=arrow)
+        head = {k: v for k, v in base['head'].items() if k not in ('back', 'fraction', 'color')}
+        if head_kind == 'triangle':
+            head.update(arrowstyle='-|>', ec=arrow, fc='white')
+        else:
+            head['color'] = arrow
+        # 箭头画在终点前 0.2 的一小段上
+        head['back'] = [0.2 * (end[0] - last[0]) / length, 0.2 * (end[1] - last[1]) / length]
+        item = {'type': 'association', 'from': link['from'], 'to': link['to'],
+                'from_offset': off1, 'to_offset': off2, 'line': line, 'head': head}
+        if via:
+            item['via'] = via
+        elements.append(item)
+        if link['label']:
+            # 标签放在中间一段的中点
+            (x1, y1), (x2, y2) = points[(len(points) - 1) // 2:][:2]
+            elements.append({'type': 'text', 'at': [(x1 + x2) / 2, (y1 + y2) / 2 + 0.1],
+                             'text': link['label'], 'style': 'link_label'})
+
+    if legend:
+        elements.append({'type': 'text', 'at': [xmax - 0.2, -0.3], 'text': '\n'.join(legend),
+                         'ha': 'right', 'va': 'top', 'fontsize': 9,
+                         'bbox': {'boxstyle': 'round,pad=0.4', 'facecolor': '#FFFDE7',
+                                  'edgecolor': '#9E9E9E'}})
+    if diagram['title']:
+        elements.append({'type': 'title', 'text': diagram['title'], 'fontsize': 16,
+                         'fontweight': 'bold', 'pad': 20})
+
+    return {
+        'name': name,
+        'figure': {'size': [xmax, ymax - bottom], 'xlim': [0, xmax], 'ylim': [bottom, ymax],
+                   'aspect': 'equal'},
+        'styles': {'actor': styles['actor'], 'use_case': uc_style,
+                   'link_label': {'ha': 'center', 'va': 'bottom', 'fontsize': 8, 'fontstyle': 'italic',
+                                  'color': arrow}},
+        'elements': elements,
+    }
+
+
+# ============= 渲染 (Render) =============
+def load_plan(path):
+    """读取 .puml 文件, 返回每个图编译好的渲染计划 (diagram_spec.Plan) 列表"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    where = os.path.basename(path)
+    name = os.path.splitext(where)[0]
+    return [diagram_spec.compile_spec(to_spec(diagram, name), where) for diagram in parse(source, where)]
+
+
+def render_file(path, output=None, dpi=300):
+    """渲染 .puml 文件, 返回写出的图片路径列表
+
+    output 为 None 时和 plantuml 一样写在源文件旁边 (a.png, a_001.png ...);
+    文件里有多个图时 output 作为第一张图的名字, 其余按同样的规则编号。
+    """
+    import matplotlib.pyplot as plt
+
+    plans = load_plan(path)
+    base = output or os.path.splitext(path)[0] + '.png'
+    root, ext = os.path.splitext(base)
+    outputs = plantuml_batch.output_paths(root + '.puml', len(plans), ext.lstrip('.') or 'png')
+    for plan, out in zip(plans, outputs):
+        fig, _ = diagram_spec.build_figure(plan)
+        try:
+            fig.savefig(out, dpi=dpi, bbox_inches='tight')
+        finally:
+            plt.close(fig)
+    return outputs
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the PlantUML use case subset written by UML2.py '
+                                                 'with matplotlib, without Java')
+    parser.add_argument('files', nargs='*', metavar='FILE',
+                        help='.puml files to render (default: all *.puml in the current directory)')
+    parser.add_argument('-o', '--output', help='output image (only with a single FILE)')
+    parser.add_argument('--dpi', type=int, default=300, help='output resolution (default: 300)')
+    args = parser.parse_args(argv)
+
+    files = args.files or sorted(n for n in os.listdir('.') if n.endswith('.puml'))
+    if not files:
+        print("❌ no .puml files found")
+        return 1
+    if args.output and len(files) > 1:
+        parser.error('-o/--output needs exactly one FILE')
+
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    failed = 0
+    for path in files:
+        start = time.perf_counter()
+        try:
+            outputs = render_file(path, args.output, args.dpi)
+        except (OSError, PumlError, diagram_spec.SpecError) as e:
+            failed += 1
+            print(f"❌ {path}: {e}")
+            continue
+        print(f"✅ {path} -> {', '.join(outputs)} ({time.perf_counter() - start:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
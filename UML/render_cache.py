@@ -0,0 +1,384 @@
+"""
+Minority Wins Game - 渲染缓存 (Render Cache)
+
+按内容寻址的图片缓存: 缓存键是图表输入的哈希, 包括绘图函数源码
+(以及它引用到的模块级函数和常量)、额外的输入文件、输出格式、dpi、
+matplotlib/numpy/pillow 版本和 matplotlib 字体缓存。命中时直接复制
+之前生成的文件, 完全跳过 matplotlib 的绘图和 savefig。
+
+缓存目录默认是 ~/.cache/minority-wins-uml, 可以用环境变量
+UML_CACHE_DIR 修改; 容量上限 (MB) 用 UML_CACHE_MAX_MB 修改,
+超过上限时按最近最少使用 (LRU) 淘汰。
+
+这个模块只依赖标准库, 不会导入 matplotlib。
+"""
+import ast
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'minority-wins-uml')
+DEFAULT_MAX_MB = 512
+# 输入文件按相对仓库根目录的路径记录, 不同目录下的同名文件互不覆盖
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 会影响渲染结果的第三方库
+VERSIONED_PACKAGES = ('matplotlib', 'numpy', 'pillow')
+
+_module_index_cache = {}
+
+
+# ============= 缓存键 (Cache Key) =============
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _is_main_guard(node):
+    test = getattr(node, 'test', None)
+    return (isinstance(node, ast.If) and isinstance(test, ast.Compare)
+            and isinstance(test.left, ast.Name) and test.left.id == '__name__')
+
+
+def _module_index(path):
+    """解析模块源码 (不导入), 返回 (顶层定义表, 公共语句列表)
+
+    顶层定义表: name -> (源码片段, 引用到的名字集合), 包括函数、类和
+    对普通名字的赋值。公共语句是其余会影响所有函数的顶层语句, 例如
+    import 和 plt.rcParams[...] = ... 。结果按文件 mtime 缓存。
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _module_index_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source, filename=path)
+    lines = source.splitlines(keepends=True)
+
+    defs = {}
+    common = []
+    for node in tree.body:
+        # 顶层语句按整行截取, 比 ast.get_source_segment 快得多
+        segment = ''.join(lines[node.lineno - 1:node.end_lineno])
+        refs = {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defs[node.name] = (segment, refs)
+        elif isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) for t in node.targets):
+            for target in node.targets:
+                defs[target.id] = (segment, refs)
+        elif _is_main_guard(node):
+            continue  # if __name__ == "__main__": 不影响渲染结果
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue  # 模块文档字符串
+        else:
+            common.append(segment)
+
+    index = (defs, common)
+    _module_index_cache[path] = (mtime, index)
+    return index
+
+
+def function_dependencies(module_path, func_name):
+    """返回 func_name 依赖的模块级名字 (包括它自己), 按名字排序"""
+    defs, _ = _module_index(module_path)
+    if func_name not in defs:
+        raise KeyError(f"{func_name} is not defined in {module_path}")
+    seen = set()
+    pending = [func_name]
+    while pending:
+        name = pending.pop()
+        if name in seen or name not in defs:
+            continue
+        seen.add(name)
+        pending.extend(defs[name][1] - seen)
+    return sorted(seen)
+
+
+def function_digest(module_path, func_name):
+    """绘图函数源码的哈希, 包含它引用到的模块级函数、常量和公共语句
+
+    只修改同一文件里的其他图表不会改变这个值。
+    """
+    defs, common = _module_index(module_path)
+    h = hashlib.sha256()
+    for segment in common:
+        h.update(segment.encode('utf-8'))
+    for name in function_dependencies(module_path, func_name):
+        h.update(name.encode('utf-8'))
+        h.update(defs[name][0].encode('utf-8'))
+    return h.hexdigest()
+
+
+def library_versions():
+    """第三方库的版本号, 直接从 sys.path 下 *.dist-info 目录名读取
+
+    比 importlib.metadata 快得多 (它要导入 email 等模块并解析 METADATA),
+    命中缓存的运行主要就是在算缓存键。目录名里找不到的再交给 importlib.metadata。
+    """
+    versions = dict.fromkeys(VERSIONED_PACKAGES)
+    for entry in sys.path:
+        try:
+            names = os.listdir(entry or '.')
+        except OSError:
+            continue
+        for name in names:
+            if not name.endswith('.dist-info'):
+                continue
+            dist, _, version = name[:-len('.dist-info')].partition('-')
+            dist = dist.lower().replace('_', '-')
+            if dist in versions and versions[dist] is None:
+                versions[dist] = version
+    missing = [package for package, version in versions.items() if version is None]
+    if missing:
+        from importlib import metadata
+        for package in missing:
+            try:
+                versions[package] = metadata.version(package)
+            except metadata.PackageNotFoundError:
+                pass
+    return versions
+
+
+def _matplotlib_cache_dirs():
+    """matplotlib 的配置/缓存目录候选, 与 matplotlib.get_cachedir() 的查找顺序一致"""
+    dirs = []
+    if os.environ.get('MPLCONFIGDIR'):
+        dirs.append(os.environ['MPLCONFIGDIR'])
+    xdg = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    dirs.append(os.path.join(xdg, 'matplotlib'))
+    dirs.append(os.path.join(os.path.expanduser('~'), '.matplotlib'))
+    return dirs
+
+
+def font_fingerprint():
+    """matplotlib 字体列表缓存 (fontlist-v*.json) 的哈希
+
+    安装或删除字体后 matplotlib 会重建这个文件, 缓存随之失效。
+    找不到时返回 None (第一次运行 matplotlib 之前)。
+    """
+    for directory in _matplotlib_cache_dirs():
+        try:
+            names = sorted(n for n in os.listdir(directory)
+                           if n.startswith('fontlist-') and n.endswith('.json'))
+        except OSError:
+            continue
+        if names:
+            return _file_digest(os.path.join(directory, names[-1]))
+    return None
+
+
+def _input_name(path):
+    """输入文件在缓存键里的名字: 相对仓库根目录的路径, 统一用 / 分隔"""
+    return os.path.relpath(os.path.abspath(path), REPO_ROOT).replace(os.sep, '/')
+
+
+def cache_key_components(module_path, func_name, fmt, dpi, inputs=(), settings=None):
+    """组成缓存键的各个部分, 返回一个可以 JSON 序列化的 dict
+
+    inputs 是绘图函数读取的额外文件 (例如图表描述文件),
+    settings 是其他会影响输出的参数。
+    """
+    return {
+        'function': f"{os.path.basename(module_path)}:{func_name}",
+        'source': function_digest(module_path, func_name),
+        'inputs': {_input_name(p): _file_digest(p) for p in inputs},
+        'format': fmt.lower().lstrip('.'),
+        'dpi': dpi,
+        'settings': settings or {},
+        'versions': library_versions(),
+        'fonts': font_fingerprint(),
+        'python': sys.version_info[:2],
+    }
+
+
+def cache_key(components):
+    blob = json.dumps(components, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+# ============= 缓存存储 (Cache Store) =============
+class RenderCache:
+    """磁盘上的 LRU 缓存, 每个条目是一个目录, 保存一次渲染产生的所有文件
+
+    目录结构::
+
+        <root>/objects/<key>/0.png, 1.png, ...
+        <root>/stats.json
+
+    读取条目时更新目录的 mtime, 淘汰时删除 mtime 最旧的条目。
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get('UML_CACHE_DIR') or DEFAULT_CACHE_DIR
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('UML_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.objects = os.path.join(self.root, 'objects')
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry(self, key):
+        return os.path.join(self.objects, key)
+
+    def fetch(self, key, outputs):
+        """命中时把缓存的文件复制到 outputs 并返回 True"""
+        entry = self._entry(key)
+        files = [os.path.join(entry, f"{i}{os.path.splitext(out)[1]}") for i, out in enumerate(outputs)]
+        if not all(os.path.exists(f) for f in files):
+            self.misses += 1
+            return False
+        for cached, output in zip(files, outputs):
+            _atomic_copy(cached, output)
+        os.utime(entry)
+        self.hits += 1
+        return True
+
+    def store(self, key, outputs):
+        """把刚生成的 outputs 保存为一个缓存条目, 然后按容量上限淘汰旧条目"""
+        os.makedirs(self.objects, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.tmp-', dir=self.objects)
+        try:
+            for i, output in enumerate(outputs):
+                shutil.copyfile(output, os.path.join(staging, f"{i}{os.path.splitext(output)[1]}"))
+            try:
+                os.replace(staging, self._entry(key))
+            except OSError:
+                # 另一个进程已经写入了同一个键, 内容相同, 丢弃自己的即可
+                shutil.rmtree(staging, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict()
+
+    def entries(self):
+        """返回 [(mtime, size, path)], 按最近使用时间从旧到新排序"""
+        result = []
+        try:
+            names = os.listdir(self.objects)
+        except FileNotFoundError:
+            return result
+        for name in names:
+            if name.startswith('.tmp-'):
+                continue
+            path = os.path.join(self.objects, name)
+            try:
+                size = sum(e.stat().st_size for e in os.scandir(path))
+                result.append((os.stat(path).st_mtime, size, path))
+            except OSError:
+                continue  # 被并发的淘汰删掉了
+        result.sort()
+        return result
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        shutil.rmtree(self.objects, ignore_errors=True)
+
+    def _stats_path(self):
+        return os.path.join(self.root, 'stats.json')
+
+    def flush_stats(self):
+        """把本进程的命中/未命中/淘汰次数累加到 stats.json"""
+        if not (self.hits or self.misses or self.evictions):
+            return
+        totals = self.load_stats()
+        totals['hits'] += self.hits
+        totals['misses'] += self.misses
+        totals['evictions'] += self.evictions
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.stats-', dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(totals, f)
+        os.replace(tmp, self._stats_path())
+        self.hits = self.misses = self.evictions = 0
+
+    def load_stats(self):
+        try:
+            with open(self._stats_path()) as f:
+                totals = json.load(f)
+        except (OSError, ValueError):
+            totals = {}
+        return {k: totals.get(k, 0) for k in ('hits', 'misses', 'evictions')}
+
+    def stats(self):
+        """累计统计 (包括本进程尚未写入的部分) 以及当前条目数和占用空间"""
+        totals = self.load_stats()
+        totals['hits'] += self.hits
+        totals['misses'] += self.misses
+        totals['evictions'] += self.evictions
+        lookups = totals['hits'] + totals['misses']
+        entries = self.entries()
+        totals.update({
+            'hit_rate': totals['hits'] / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        })
+        return totals
+
+
+def _atomic_copy(src, dst):
+    directory = os.path.dirname(os.path.abspath(dst))
+    fd, tmp = tempfile.mkstemp(prefix='.tmp-', suffix=os.path.splitext(dst)[1], dir=directory)
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def cached_render(render, module_path, func_name, outputs, dpi=300, inputs=(),
+                  settings=None, cache=None):
+    """带缓存地执行一次渲染, 返回 True 表示命中缓存
+
+    render 是无参数的函数, 负责生成 outputs 里的所有文件;
+    outputs 的第一个文件决定缓存键里的输出格式。
+    """
+    cache = cache or RenderCache()
+    fmt = os.path.splitext(outputs[0])[1]
+    key = cache_key(cache_key_components(module_path, func_name, fmt, dpi, inputs, settings))
+    try:
+        if cache.fetch(key, outputs):
+            return True
+        render()
+        cache.store(key, outputs)
+        return False
+    finally:
+        cache.flush_stats()
+
+
+def format_stats(stats):
+    return (f"cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate), {stats['evictions']} evictions, "
+            f"{stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.1f}"
+            f"/{stats['max_bytes'] / 1024 / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    cache = RenderCache()
+    if sys.argv[1:] == ['clear']:
+        cache.clear()
+        print(f"🧹 Cleared {cache.objects}")
+    else:
+        print(f"📦 {cache.root}")
+        print(format_stats(cache.stats()))
@@ -0,0 +1,263 @@
+"""
+Minority Wins Game - 对局结果图表 (Result Charts)
+
+minority-game/scripts/multi-player-test.js 每跑一局就写一个结果文件
+(test-results-multi-player.json): 配置、每个玩家的选项和下注、获胜者
+和奖励。这里读取一个或多个结果文件 (目录会递归查找 *.json), 画出
+三张图:
+
+    选项分布  每个选项被选了多少次、总下注, 以及作为少数派赢了几局
+    下注金额  下注金额的分布, 区分赢家和输家
+    奖励倍数  赢家拿到的奖励是下注的多少倍
+
+结果文件逐个解析, 只把用到的数字追加进按列存放的数组 (array.array),
+解析完的 dict 立即丢弃, 几千个文件也只占几 MB 内存; 统计全部用
+NumPy 的 bincount / histogram 一次完成, 出图时间主要花在渲染上。
+
+使用方法 (在 UML 目录下):
+    python results.py                                  # 默认读取 minority-game 下的测试结果
+    python results.py runs/ -o result_charts.png --dpi 150
+    python -m diagrams render results                  # 同一张图, 走渲染缓存
+"""
+import argparse
+import array
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import profiling
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.normpath(os.path.join(HERE, '..', 'minority-game',
+                                                'test-results-multi-player.json'))
+
+BET_BINS = 20
+PAYOUT_BINS = 20
+FIGURE_SIZE = (18, 6)
+WIN_COLOR = '#4CAF50'
+LOSS_COLOR = '#F44336'
+BAR_COLOR = '#2196F3'
+
+
+# ============= 读取 (Streaming Parser) =============
+def iter_result_files(paths):
+    """展开文件和目录 (递归, 按路径排序), 依次产生 .json 文件路径"""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.json'):
+                    yield os.path.join(root, name)
+
+
+def iter_rounds(paths, skipped=None):
+    """依次产生 (路径, 结果 dict), 一次只有一个文件在内存里
+
+    不是结果文件的 JSON (没有 players 或 vote.options) 跳过, 路径追加到 skipped。
+    """
+    for path in iter_result_files(paths):
+        with open(path, encoding='utf-8') as f:
+            try:
+                data = json.load(f)
+            except ValueError:
+                data = None
+        if not isinstance(data, dict) or 'players' not in data or 'options' not in data.get('vote', {}):
+            if skipped is not None:
+                skipped.append(path)
+            continue
+        yield path, data
+
+
+def load(paths):
+    """读取结果文件, 返回按列存放的 NumPy 数组
+
+    玩家表 (每个玩家一行): round, option, bet, reward
+    对局表 (每局一行):     winner (没有赢家时为 -1), revealed, pool
+    option 和 winner 是 options 列表里的下标, 不同对局里同名的选项合并。
+    """
+    options, option_ids = [], {}
+    player_round, player_option = array.array('i'), array.array('i')
+    bet, reward = array.array('d'), array.array('d')
+    winner, revealed, pool = array.array('i'), array.array('i'), array.array('d')
+    skipped = []
+
+    def option_id(name):
+        index = option_ids.get(name)
+        if index is None:
+            index = option_ids[name] = len(options)
+            options.append(name)
+        return index
+
+    question = None
+    for n, (_, data) in enumerate(iter_rounds(paths, skipped)):
+        names = data['vote']['options']
+        ids = [option_id(name) for name in names]
+        rewards = {w['playerIndex']: float(w['reward']) for w in data.get('winners', ())}
+        for player in data['players']:
+            player_round.append(n)
+            player_option.append(ids[player['choice']])
+            bet.append(float(player['betAmount']))
+            reward.append(rewards.get(player['index'], 0.0))
+
+        analysis = data.get('analysis', {})
+        winner.append(option_id(analysis['winner']) if analysis.get('winner') in option_ids else -1)
+        revealed.append(data.get('phases', {}).get('reveal', {}).get('revealedCount', len(data['players'])))
+        pool.append(sum(float(p['betAmount']) for p in data['players']))
+        question = question or data['vote'].get('question')
+
+    return {
+        'options': options,
+        'question': question,
+        'skipped': skipped,
+        'round': np.frombuffer(player_round, dtype=np.int32),
+        'option': np.frombuffer(player_option, dtype=np.int32),
+        'bet': np.frombuffer(bet),
+        'reward': np.frombuffer(reward),
+        'winner': np.frombuffer(winner, dtype=np.int32),
+        'revealed': np.frombuffer(revealed, dtype=np.int32),
+        'pool': np.frombuffer(pool),
+    }
+
+
+# ============= 统计 (Aggregation) =============
+def summarize(table):
+    """按选项、下注金额和奖励倍数汇总, 全部是向量运算"""
+    k = len(table['options'])
+    option, bet, reward = table['option'], table['bet'], table['reward']
+    won = reward > 0
+    winner = table['winner']
+
+    bet_edges = np.histogram_bin_edges(bet, bins=BET_BINS) if len(bet) else np.linspace(0, 1, BET_BINS + 1)
+    multiple = reward[won] / bet[won]
+    payout_edges = (np.histogram_bin_edges(multiple, bins=PAYOUT_BINS) if len(multiple)
+                    else np.linspace(0, 1, PAYOUT_BINS + 1))
+    return {
+        'rounds': len(winner),
+        'players': len(option),
+        'picks': np.bincount(option, minlength=k),
+        'stakes': np.bincount(option, weights=bet, minlength=k),
+        'wins': np.bincount(winner[winner >= 0], minlength=k),
+        'bet_edges': bet_edges,
+        'bet_won': np.histogram(bet[won], bins=bet_edges)[0],
+        'bet_lost': np.histogram(bet[~won], bins=bet_edges)[0],
+        'payout_edges': payout_edges,
+        'payout': np.histogram(multiple, bins=payout_edges)[0],
+        'mean_multiple': float(multiple.mean()) if len(multiple) else 0.0,
+        'pool': float(table['pool'].sum()),
+        'paid': float(reward.sum()),
+        'reveal_rate': float(table['revealed'].sum() / len(option)) if len(option) else 0.0,
+    }
+
+
+# ============= 绘图 (Charts) =============
+def _draw_options(ax, options, summary):
+    x = np.arange(len(options))
+    bars = ax.bar(x, summary['picks'], color=BAR_COLOR, edgecolor='black', linewidth=1)
+    for bar, stake, wins in zip(bars, summary['stakes'], summary['wins']):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(),
+                f"{stake:.2f} ETH\nwon {wins}×", ha='center', va='bottom', fontsize=9)
+    ax.set_xticks(x, options)
+    ax.set_ylabel('Players')
+    ax.set_title('选项分布 (Option Distribution)', fontweight='bold')
+    ax.margins(y=0.2)
+
+
+def _draw_bets(ax, summary):
+    edges = summary['bet_edges']
+    width = np.diff(edges)
+    ax.bar(edges[:-1], summary['bet_lost'], width=width, align='edge', color=LOSS_COLOR,
+           edgecolor='black', linewidth=0.5, label='Lost')
+    ax.bar(edges[:-1], summary['bet_won'], width=width, align='edge', bottom=summary['bet_lost'],
+           color=WIN_COLOR, edgecolor='black', linewidth=0.5, label='Won')
+    ax.set_xlabel('Bet (ETH)')
+    ax.set_ylabel('Players')
+    ax.set_title('下注金额 (Bet Size)', fontweight='bold')
+    ax.margins(y=0.15)
+    ax.legend()
+
+
+def _draw_payouts(ax, summary):
+    edges = summary['payout_edges']
+    ax.bar(edges[:-1], summary['payout'], width=np.diff(edges), align='edge', color=WIN_COLOR,
+           edgecolor='black', linewidth=0.5)
+    ax.axvline(summary['mean_multiple'], color='black', linestyle='--', linewidth=1.5)
+    ax.text(0.98, 0.95, f"mean {summary['mean_multiple']:.2f}×\n"
+                        f"pool {summary['pool']:.2f} ETH\npaid {summary['paid']:.2f} ETH\n"
+                        f"revealed {summary['reveal_rate']:.0%}",
+            transform=ax.transAxes, ha='right', va='top', fontsize=9,
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+    ax.set_xlabel('Reward / Bet')
+    ax.set_ylabel('Winners')
+    ax.set_title('奖励倍数 (Payout Multiple)', fontweight='bold')
+
+
+def build_figure(options, summary, heading=None):
+    """三张图并排放在一个 figure 里, 返回 (fig, axes)
+
+    summary 的格式和 summarize() 的返回值相同 (simulate.summary 也是这个格式)。
+    """
+    import UML4
+
+    UML4._import_matplotlib()
+    plt = UML4.plt
+    fig, axes = plt.subplots(1, 3, figsize=FIGURE_SIZE)
+    _draw_options(axes[0], options, summary)
+    _draw_bets(axes[1], summary)
+    _draw_payouts(axes[2], summary)
+    heading = heading or f"{summary['rounds']} rounds"
+    fig.suptitle(f"少数派获胜游戏 - 对局结果 (Game Results): {heading}, {summary['players']:,} players",
+                 fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    return fig, axes
+
+
+def draw_results(output='result_charts.png', dpi=300, paths=None):
+    """读取结果文件并保存图表; 没有可用的结果文件时抛出 ValueError"""
+    paths = paths or [DEFAULT_RESULTS]
+    with profiling.phase('results', 'load'):
+        table = load(paths)
+    if not len(table['winner']):
+        raise ValueError(f"no result files found in {', '.join(paths)}")
+    if table['skipped']:
+        print(f"⚠️  Skipped {len(table['skipped'])} file(s) that are not game results")
+    with profiling.phase('results', 'aggregate'):
+        summary = summarize(table)
+    with profiling.phase('results', 'build'):
+        heading = table['question'] if summary['rounds'] == 1 else None
+        fig, _ = build_figure(table['options'], summary, heading)
+    with profiling.phase('results', 'savefig', fig):
+        fig.savefig(output, dpi=dpi, bbox_inches='tight', facecolor='white')
+    import UML4
+    UML4.plt.close(fig)
+    print(f"✓ Result charts saved as '{output}' ({summary['rounds']} rounds, {summary['players']} players)")
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='results', description='charts from multi-player test results')
+    parser.add_argument('paths', nargs='*', metavar='PATH',
+                        help=f'result files or directories (default: {DEFAULT_RESULTS})')
+    parser.add_argument('-o', '--output', default='result_charts.png')
+    parser.add_argument('--dpi', type=int, default=300, help='output resolution (default: 300)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with profiling.session() as records:
+        try:
+            draw_results(args.output, args.dpi, args.paths)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            return 1
+    print(profiling.format_summary(records))
+    print(f"⏱  Total: {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
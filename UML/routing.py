@@ -0,0 +1,313 @@
+"""
+Minority Wins Game - 连线布线 (Connector Routing)
+
+流程图里的箭头原来是手工算好的端点 (from/to 坐标), 回边 (比如 "No / Wait
+for commits") 直接斜穿过中间的框。这里给 diagram_spec 的 connector 元素
+自动布正交连线:
+
+  * 连线接在框、判断框和圆的轮廓上 (四边中点), 起点和终点各有四个候选
+    接口, 一次搜索同时考虑全部组合
+  * 只走水平/竖直线段, 和其他图形保持 CLEARANCE 的间距; 代价是长度加上
+    每个拐弯 BEND_COST, 和已经布好的连线重合的部分另加 SHARE_COST,
+    用别的连线已经占用的接口另加 PORT_COST
+  * 搜索用 A*, 网格只取起点终点附近窗口里的障碍物边界; 障碍物放在均匀
+    网格空间索引里, 窗口和线段的查询只看相交的格子, 图形增加到几百个时
+    每条连线的代价只和附近的图形数有关
+
+    router = Router([(x0, y0, x1, y1), ...])   # 障碍物 (图形的可见轮廓)
+    points = router.route(2, 5)                # 第 2 个图形 -> 第 5 个图形的折线 [(x, y), ...]
+
+    python routing.py --random 100 400         # 随机流程图计时
+"""
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+
+import render_cache
+
+# 本文件源码的摘要, 编译好的渲染计划按它缓存 (见 diagram_spec.load_plan)
+SOURCE_DIGEST = render_cache._file_digest(__file__)
+# 连线和其他图形的最小间距 (数据坐标)
+CLEARANCE = 0.2
+# 每个拐弯折算的长度
+BEND_COST = 0.6
+# 和已经布好的连线重合时每单位长度的附加代价
+SHARE_COST = 1.0
+# 接口已经被别的连线用过时的附加代价 (让进出同一个图形的连线分开)
+PORT_COST = 1.5
+# 搜索窗口: 起点终点外接矩形向外扩展的距离; 找不到路线时按 WINDOW_GROWTH 倍扩大
+WINDOW_PAD = 1.0
+WINDOW_GROWTH = 3
+EPS = 1e-9
+
+# 接口: 边 -> (接口位置, 离开图形的方向)
+SIDES = {
+    'top': (lambda r: ((r[0] + r[2]) / 2, r[3]), (0, 1)),
+    'bottom': (lambda r: ((r[0] + r[2]) / 2, r[1]), (0, -1)),
+    'left': (lambda r: (r[0], (r[1] + r[3]) / 2), (-1, 0)),
+    'right': (lambda r: (r[2], (r[1] + r[3]) / 2), (1, 0)),
+}
+
+
+# ============= 空间索引 (Spatial Index) =============
+class SpatialIndex:
+    """均匀网格空间索引: 每个矩形登记在它覆盖的格子里, 查询只看相交的格子"""
+
+    def __init__(self, rects, cell=None):
+        self.rects = list(rects)
+        if cell is None:
+            # 格子取图形的平均大小, 每个矩形只落在几个格子里
+            sizes = [max(r[2] - r[0], r[3] - r[1]) for r in self.rects]
+            cell = max(sum(sizes) / len(sizes), EPS) if sizes else 1
+        self.cell = cell
+        self.cells = {}
+        for i, rect in enumerate(self.rects):
+            for key in self._keys(*rect):
+                self.cells.setdefault(key, []).append(i)
+
+    def _keys(self, x0, y0, x1, y1):
+        c = self.cell
+        for i in range(math.floor(x0 / c), math.floor(x1 / c) + 1):
+            for j in range(math.floor(y0 / c), math.floor(y1 / c) + 1):
+                yield i, j
+
+    def query(self, x0, y0, x1, y1):
+        """和 (x0, y0, x1, y1) 相交 (包括边界接触) 的矩形下标"""
+        found = set()
+        for key in self._keys(x0, y0, x1, y1):
+            for i in self.cells.get(key, ()):
+                if i not in found:
+                    r = self.rects[i]
+                    if r[0] <= x1 and x0 <= r[2] and r[1] <= y1 and y0 <= r[3]:
+                        found.add(i)
+        return found
+
+
+def _inflate(rect, d):
+    return (rect[0] - d, rect[1] - d, rect[2] + d, rect[3] + d)
+
+
+def _overlaps(a0, a1, r0, r1):
+    """区间 [a0, a1] 是否进入开区间 (r0, r1); a0 == a1 时是一个点"""
+    if a1 - a0 < EPS:
+        return r0 + EPS < a0 < r1 - EPS
+    return a0 < r1 - EPS and a1 > r0 + EPS
+
+
+def _blocks(rect, x0, y0, x1, y1):
+    """水平或竖直线段是否进入矩形内部 (沿边界走不算)"""
+    return (_overlaps(min(x0, x1), max(x0, x1), rect[0], rect[2])
+            and _overlaps(min(y0, y1), max(y0, y1), rect[1], rect[3]))
+
+
+# ============= 布线 (Router) =============
+class Router:
+    """在一组矩形障碍物之间布正交连线; 布好的连线会记下来, 后面的连线尽量不和它重合"""
+
+    def __init__(self, rects, clearance=CLEARANCE):
+        self.rects = [tuple(r) for r in rects]
+        self.clearance = clearance
+        self.inflated = [_inflate(r, clearance) for r in self.rects]
+        self.index = SpatialIndex(self.inflated)
+        xs0, ys0, xs1, ys1 = zip(*self.inflated) if self.inflated else ((0,), (0,), (0,), (0,))
+        self.extent = (min(xs0), min(ys0), max(xs1), max(ys1))
+        # 布好的连线: 水平线 {y: [(x0, x1)]}, 竖直线 {x: [(y0, y1)]}
+        self.used = ({}, {})
+        self.used_ports = set()
+        self.stats = {'routes': 0, 'expanded': 0, 'fallbacks': 0}
+
+    def _ports(self, i):
+        rect = self.rects[i]
+        return [(place(rect), direction) for place, direction in SIDES.values()]
+
+    def _free(self, a, b, ends):
+        """a -> b 这一段是否不穿过任何图形
+
+        起点/终点图形自己只在接口所在的中线上放宽到实际轮廓 (连线要从那里
+        接进去), 其他地方和别的图形一样保持间距。
+        """
+        (x0, y0), (x1, y1) = a, b
+        for i in self.index.query(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)):
+            rect = self.inflated[i]
+            if i in ends:
+                r = self.rects[i]
+                cx, cy = (r[0] + r[2]) / 2, (r[1] + r[3]) / 2
+                if (x0 == x1 and abs(x0 - cx) < EPS) or (y0 == y1 and abs(y0 - cy) < EPS):
+                    rect = r
+            if _blocks(rect, x0, y0, x1, y1):
+                return False
+        return True
+
+    def _grid(self, window, ports):
+        """窗口里的网格线: 障碍物 (加上间距) 的边界、接口所在的线、窗口边界"""
+        wx0, wy0, wx1, wy1 = window
+        xs, ys = {wx0, wx1}, {wy0, wy1}
+        for i in self.index.query(*window):
+            x0, y0, x1, y1 = self.inflated[i]
+            xs.update((x0, x1))
+            ys.update((y0, y1))
+        for (x, y), _ in ports:
+            xs.add(x)
+            ys.add(y)
+        xs = sorted(x for x in xs if wx0 <= x <= wx1)
+        ys = sorted(y for y in ys if wy0 <= y <= wy1)
+        return xs, ys
+
+    def _search(self, source, target, window):
+        starts, goals = self._ports(source), self._ports(target)
+        xs, ys = self._grid(window, starts + goals)
+        xi = {x: i for i, x in enumerate(xs)}
+        yi = {y: j for j, y in enumerate(ys)}
+        goal_nodes = {(xi[x], yi[y]) for (x, y), _ in goals}
+        ends = (source, target)
+
+        def h(node):
+            x, y = xs[node[0]], ys[node[1]]
+            return min(abs(x - xs[g[0]]) + abs(y - ys[g[1]]) for g in goal_nodes)
+
+        # 状态: (网格点, 当前方向); 从接口出发时方向是离开图形的方向
+        best = {}
+        parent = {}
+        heap = []
+        busy = {(xi[x], yi[y]) for (x, y), _ in starts + goals if (x, y) in self.used_ports}
+        for (x, y), direction in starts:
+            state = ((xi[x], yi[y]), direction)
+            cost = PORT_COST if state[0] in busy else 0
+            best[state] = cost
+            parent[state] = None
+            heapq.heappush(heap, (cost + h(state[0]), cost, state))
+        count = 0
+        while heap:
+            _, cost, state = heapq.heappop(heap)
+            if cost > best.get(state, math.inf):
+                continue
+            count += 1
+            node, direction = state
+            if node in goal_nodes and parent[state] is not None:
+                self.stats['expanded'] += count
+                return self._path(state, parent, xs, ys)
+            for step in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if step == (-direction[0], -direction[1]):
+                    continue
+                nxt = (node[0] + step[0], node[1] + step[1])
+                if not (0 <= nxt[0] < len(xs) and 0 <= nxt[1] < len(ys)):
+                    continue
+                a, b = (xs[node[0]], ys[node[1]]), (xs[nxt[0]], ys[nxt[1]])
+                if not self._free(a, b, ends):
+                    continue
+                length = abs(b[0] - a[0]) + abs(b[1] - a[1])
+                new = cost + length + (BEND_COST if step != direction else 0)
+                new += SHARE_COST * self._shared(a, b)
+                if nxt in goal_nodes and nxt in busy:
+                    new += PORT_COST
+                key = (nxt, step)
+                if new < best.get(key, math.inf):
+                    best[key] = new
+                    parent[key] = state
+                    heapq.heappush(heap, (new + h(nxt), new, key))
+        self.stats['expanded'] += count
+        return None
+
+    def _line(self, a, b):
+        """线段所在的线 (已用线段表, 线的坐标) 和线段在线上的区间"""
+        if a[1] == b[1]:
+            return self.used[0], round(a[1], 6), (min(a[0], b[0]), max(a[0], b[0]))
+        return self.used[1], round(a[0], 6), (min(a[1], b[1]), max(a[1], b[1]))
+
+    def _shared(self, a, b):
+        """a -> b 和已经布好的连线重合的长度"""
+        table, key, (lo, hi) = self._line(a, b)
+        return sum(max(0, min(hi, u) - max(lo, v)) for v, u in table.get(key, ()))
+
+    @staticmethod
+    def _path(state, parent, xs, ys):
+        nodes = []
+        while state is not None:
+            nodes.append(state[0])
+            state = parent[state]
+        points = [(xs[i], ys[j]) for i, j in reversed(nodes)]
+        # 去掉直线中间的网格点, 只留拐点
+        simplified = [points[0]]
+        for p, q in zip(points[1:], points[2:]):
+            a = simplified[-1]
+            if not ((a[0] == p[0] == q[0]) or (a[1] == p[1] == q[1])):
+                simplified.append(p)
+        simplified.append(points[-1])
+        return simplified
+
+    def route(self, source, target):
+        """第 source 个图形 -> 第 target 个图形的正交折线 [(x, y), ...], 两端在图形轮廓上
+
+        附近找不到路线时逐步扩大搜索窗口; 实在绕不开时退回两个最近接口之间的直线。
+        """
+        self.stats['routes'] += 1
+        a, b = self.inflated[source], self.inflated[target]
+        box = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+        pad = WINDOW_PAD
+        while True:
+            window = (box[0] - pad, box[1] - pad, box[2] + pad, box[3] + pad)
+            path = self._search(source, target, window)
+            covers = (window[0] < self.extent[0] and window[1] < self.extent[1]
+                      and window[2] > self.extent[2] and window[3] > self.extent[3])
+            if path is not None or covers:
+                break
+            pad *= WINDOW_GROWTH
+        if path is None:
+            self.stats['fallbacks'] += 1
+            pairs = [(p, q) for p, _ in self._ports(source) for q, _ in self._ports(target)]
+            return list(min(pairs, key=lambda pq: math.hypot(pq[0][0] - pq[1][0], pq[0][1] - pq[1][1])))
+        self.used_ports.update((path[0], path[-1]))
+        for p, q in zip(path, path[1:]):
+            table, key, span = self._line(p, q)
+            table.setdefault(key, []).append(span)
+        return path
+
+
+# ============= 命令行 =============
+def random_flowchart(n, seed=0):
+    """n 个框按蛇形排成几列的随机流程图: 相邻步骤相连, 另有 n/5 条回到上面几行的回边 (计时用)"""
+    rng = random.Random(seed)
+    columns = max(1, int(math.sqrt(n / 4)))
+    rects = []
+    cells = {}
+    for k in range(n):
+        row, col = divmod(k, columns)
+        if row % 2:
+            col = columns - 1 - col
+        x, y = col * 5 + rng.uniform(-0.3, 0.3), -row * 1.2
+        rects.append((x, y, x + 3.5, y + 0.7))
+        cells[row, col] = k
+    edges = [(k, k + 1) for k in range(n - 1)]
+    for k in rng.sample(range(columns, n), min(n // 5, max(0, n - columns))):
+        row, col = divmod(k, columns)
+        col = col if row % 2 == 0 else columns - 1 - col
+        target = cells.get((row - rng.randint(1, 3), min(columns - 1, max(0, col + rng.randint(-1, 1)))))
+        if target is not None:
+            edges.append((k, target))
+    return rects, edges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time orthogonal connector routing on random flowcharts')
+    parser.add_argument('--random', type=int, nargs='+', default=[50, 200, 800], metavar='N',
+                        help='number of boxes (default: 50 200 800)')
+    args = parser.parse_args(argv)
+    for n in args.random:
+        rects, edges = random_flowchart(n)
+        start = time.perf_counter()
+        router = Router(rects)
+        for a, b in edges:
+            router.route(a, b)
+        elapsed = time.perf_counter() - start
+        stats = router.stats
+        print(f"🔀 {n} boxes, {len(edges)} connectors: {elapsed * 1000:.0f}ms "
+              f"({elapsed / len(edges) * 1000:.2f}ms each, {stats['expanded'] / len(edges):.0f} states each, "
+              f"{stats['fallbacks']} straight fallbacks)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
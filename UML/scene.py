@@ -0,0 +1,231 @@
+"""
+Minority Wins Game - 用例图场景 (Use Case Scene)
+
+基础用例图的参与者、用例和关系只在这里定义一次 (USE_CASE_SCENE),
+结构和 puml.parse 的解析结果相同。场景构建一次 (布局并编译成
+diagram_spec 渲染计划), 然后由各个输出器共用:
+
+  * PNG / SVG / PDF: 只创建一次 figure, 依次 savefig 成各种格式
+  * PlantUML: 逐行流式写出 .puml 文本 (UML2.py 用它生成 use_case_diagram.puml)
+
+    python scene.py                                  # use_case_scene.{png,svg,pdf,puml}
+    python scene.py -o out/basic -f png,puml --dpi 150
+
+    s = build()
+    emit(s, ['basic.png', 'basic.svg', 'basic.puml'])
+"""
+import argparse
+import os
+import sys
+import time
+
+import diagram_spec
+import puml
+
+# 图片格式由 matplotlib 输出, .puml 由 write_plantuml 输出
+IMAGE_FORMATS = ('png', 'svg', 'pdf')
+FORMATS = IMAGE_FORMATS + ('puml',)
+
+USE_CASE_SCENE = {
+    'title': 'Minority Wins Game - Use Case Diagram',
+    'colors': {
+        'actor_border': 'black',
+        'use_case_border': 'black',
+        'boundary_border': 'orange',
+        'arrow': '#757575',
+    },
+    'actors': [
+        {'name': 'Player', 'label': 'Player', 'color': '#4CAF50'},
+        {'name': 'Owner', 'label': 'Contract Owner', 'color': '#4CAF50'},
+    ],
+    'boundary': {'label': 'Minority Wins Game System', 'color': '#FF9800'},
+    'use_cases': [
+        {'name': 'UC1', 'label': 'Connect Wallet', 'color': '#2196F3'},
+        {'name': 'UC2', 'label': 'Start Game', 'color': '#2196F3'},
+        {'name': 'UC3', 'label': 'Commit Bet', 'color': '#2196F3'},
+        {'name': 'UC4', 'label': 'Reveal Choice', 'color': '#2196F3'},
+        {'name': 'UC5', 'label': 'Finalize Game', 'color': '#2196F3'},
+        {'name': 'UC6', 'label': 'Claim Reward', 'color': '#2196F3'},
+        {'name': 'UC7', 'label': 'Get Game Info', 'color': '#2196F3'},
+        {'name': 'UC8', 'label': 'Calculate Reward', 'color': '#2196F3'},
+        {'name': 'UC9', 'label': 'Check Participants', 'color': '#2196F3'},
+    ],
+    'links': [
+        {'from': 'Player', 'to': 'UC1', 'op': '-->', 'label': None},
+        {'from': 'Player', 'to': 'UC3', 'op': '-->', 'label': None},
+        {'from': 'Player', 'to': 'UC4', 'op': '-->', 'label': None},
+        {'from': 'Player', 'to': 'UC6', 'op': '-->', 'label': None},
+        {'from': 'Player', 'to': 'UC7', 'op': '-->', 'label': None},
+        {'from': 'Player', 'to': 'UC8', 'op': '-->', 'label': None},
+        {'from': 'Player', 'to': 'UC9', 'op': '-->', 'label': None},
+        {'from': 'Owner', 'to': 'UC2', 'op': '-->', 'label': None},
+        {'from': 'Owner', 'to': 'UC5', 'op': '-->', 'label': None},
+        {'from': 'Owner', 'to': 'UC7', 'op': '-->', 'label': None},
+        {'from': 'UC3', 'to': 'UC4', 'op': '..>', 'label': '<<extend>>'},
+        {'from': 'UC4', 'to': 'UC5', 'op': '..>', 'label': '<<extend>>'},
+        {'from': 'UC5', 'to': 'UC6', 'op': '..>', 'label': '<<extend>>'},
+    ],
+    'legend': [
+        'Green = Actors',
+        'Blue = Use Cases',
+        'Orange dashed box = System Boundary',
+        'Dashed arrow = <<extend>>',
+    ],
+}
+
+
+# ============= 场景 (Scene) =============
+def fit_canvas(spec):
+    """按比例缩小 figure, 不超过基础用例图原来的画布 (use_case_basic.json 的 16×12 英寸)
+
+    自动布局按 1 单位 = 1 英寸出图, 用例多时画布会比原来手工排的版面大,
+    保存的像素数 (和耗时、内存) 随之增加; 数据坐标不变, 只缩放 figure。
+    """
+    limit = diagram_spec.load_spec(diagram_spec.spec_path(puml.BASE_SPEC))['figure']['size']
+    width, height = spec['figure']['size']
+    scale = min(limit[0] / width, limit[1] / height, 1)
+    spec['figure']['size'] = [width * scale, height * scale]
+    return spec
+
+
+class Scene:
+    """构建好的场景: 模型 + 布局后的渲染计划; figure 第一次使用时创建, 之后复用"""
+
+    def __init__(self, model, name):
+        self.model = model
+        self.name = name
+        self.plan = diagram_spec.compile_spec(fit_canvas(puml.to_spec(model, name)), name)
+        self._figure = None
+
+    def figure(self):
+        """(fig, ax), 所有图片格式共用同一个 figure"""
+        if self._figure is None:
+            self._figure = diagram_spec.build_figure(self.plan)
+        return self._figure
+
+    def close(self):
+        if self._figure is not None:
+            import matplotlib.pyplot as plt
+            plt.close(self._figure[0])
+            self._figure = None
+
+
+def build(model=None, name='use_case_scene'):
+    """构建场景 (解析、布局、编译都只做这一次)"""
+    return Scene(model or USE_CASE_SCENE, name)
+
+
+# ============= PlantUML 输出 (PlantUML Writer) =============
+def _actor_line(actor):
+    if actor['label'] == actor['name']:
+        line = f"actor {actor['name']}"
+    else:
+        line = f"actor \"{actor['label']}\" as {actor['name']}"
+    return line + (f" {actor['color']}" if actor['color'] else '')
+
+
+def _use_case_line(use_case):
+    line = f"usecase \"{use_case['label']}\" as {use_case['name']}"
+    return line + (f" {use_case['color']}" if use_case['color'] else '')
+
+
+def iter_plantuml(model):
+    """逐行产出模型对应的 PlantUML 文本 (puml.py 能解析回同一个模型)"""
+    yield '@startuml'
+    yield 'left to right direction'
+    yield ''
+    if model.get('title'):
+        yield f"title {model['title']}"
+        yield ''
+    names = {key: name for name, key in puml.SKINPARAMS.items()}
+    colors = model.get('colors', {})
+    for key, color in colors.items():
+        yield f"skinparam {names[key]} {color}"
+    if colors:
+        yield ''
+
+    for actor in model['actors']:
+        yield _actor_line(actor)
+    yield ''
+    boundary = model.get('boundary')
+    if boundary:
+        yield f"rectangle \"{boundary['label']}\"" + (f" {boundary['color']}" if boundary['color'] else '') + ' {'
+        for use_case in model['use_cases']:
+            yield '  ' + _use_case_line(use_case)
+        yield '}'
+    else:
+        yield from (_use_case_line(use_case) for use_case in model['use_cases'])
+    yield ''
+
+    # 每个参与者的连线一组, 用例之间的连线一组, 组之间空一行
+    actors = {actor['name'] for actor in model['actors']}
+    groups = [link['from'] if link['from'] in actors else None for link in model['links']]
+    for i, link in enumerate(model['links']):
+        if i and groups[i] != groups[i - 1]:
+            yield ''
+        yield f"{link['from']} {link['op']} {link['to']}" + (f" : {link['label']}" if link['label'] else '')
+
+    if model.get('legend'):
+        yield ''
+        yield 'legend'
+        yield from (f"  {line}" for line in model['legend'])
+        yield 'endlegend'
+    yield '@enduml'
+
+
+def write_plantuml(model, path):
+    """把模型流式写成 .puml 文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in iter_plantuml(model):
+            f.write(line + '\n')
+    return path
+
+
+# ============= 输出 (Emit) =============
+def emit(scene, outputs, dpi=300):
+    """按扩展名把场景写成各种格式, 图片格式共用同一个 figure; 返回 outputs"""
+    for output in outputs:
+        fmt = os.path.splitext(output)[1].lstrip('.').lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"unsupported format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    for output in outputs:
+        if output.lower().endswith('.puml'):
+            write_plantuml(scene.model, output)
+        else:
+            fig, _ = scene.figure()
+            fig.savefig(output, dpi=dpi, bbox_inches='tight')
+    return outputs
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the use case scene once and write it in several formats')
+    parser.add_argument('-o', '--output', default='use_case_scene',
+                        help='output path without extension (default: use_case_scene)')
+    parser.add_argument('-f', '--formats', default=','.join(FORMATS),
+                        help=f"comma separated formats (default: {','.join(FORMATS)})")
+    parser.add_argument('--dpi', type=int, default=300, help='resolution of the PNG output (default: 300)')
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)}")
+
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    start = time.perf_counter()
+    scene = build()
+    print(f"📦 Scene built: {len(scene.plan.ops)} ops ({(time.perf_counter() - start) * 1000:.1f}ms)")
+    try:
+        for fmt in formats:
+            t = time.perf_counter()
+            output = emit(scene, [f"{args.output}.{fmt}"], args.dpi)[0]
+            print(f"✓ {output} ({time.perf_counter() - t:.2f}s)")
+    finally:
+        scene.close()
+    print(f"⏱  Total: {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Minority Wins Game - 蒙特卡洛模拟 (Monte Carlo Simulator)
+
+按系统流程图 (specs/system_flow.json) 的流程模拟提交-揭示少数派游戏,
+不经过 Hardhat 节点, 一次模拟几百万局:
+
+    提交  每个玩家选一个选项和下注金额, 按下注的 30-70% 付押金
+    揭示  以 reveal_rate 的概率揭示; 不揭示或押金比例不在 30-70% 之间的
+          押金被没收, 留在合约里
+    结算  揭示的下注金额按选项求和, 总额最小 (且大于 0) 的选项是少数派;
+          最小值并列时平局, 退还押金; 没有人揭示时没有赢家
+    领取  少数派赢家拿回押金, 并按下注金额比例分走输家的押金
+
+资金只有押金, 赢家分到的是输家实际付出的押金, 所以
+"押金总额 = 支付总额 + 没收总额" 始终成立。下注金额只决定计票权重和分成
+比例; deposit_range 和 deposit_limits 都取 (1, 1) 就是 contracts/VotingGame.sol
+的全额押金模式。
+玩家行为和 scripts/empirical-analysis.js 相同: 60% 是策略型 (按编号分散
+选择, 其中 30% 随机), 40% 完全随机。
+
+所有局按 CHUNK_ROUNDS 一块, 每块是 (局数, 玩家数) 的 NumPy 数组, 一次算完
+整块; 统计量逐块累加, 内存占用和总局数无关。统计结果可以直接交给
+results.build_figure 画图, 也可以标注到系统流程图的分支上:
+
+    python simulate.py --rounds 1000000                   # 只打印统计
+    python simulate.py --rounds 1000000 --charts sim_charts.png --flow sim_flow.png
+    python simulate.py --players 8 --options 3 --json stats.json
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+
+import numpy as np
+
+import profiling
+
+# 和 scripts/empirical-analysis.js 的 ANALYSIS_CONFIG 对应; 选项和流程图一样是 A / B 两个
+SIM_CONFIG = {
+    'rounds': 100000,
+    'players': 8,
+    'options': ['A', 'B'],
+    'min_bet': 0.05,            # ETH
+    'max_bet': 0.5,
+    'deposit_range': (0.30, 0.70),
+    # 合约接受的押金比例 (minority2.sol 的 MIN_DEPOSIT_RATE / MAX_DEPOSIT_RATE)
+    'deposit_limits': (0.30, 0.70),
+    'reveal_rate': 0.9,
+    'strategic_rate': 0.6,
+    'strategic_noise': 0.3,
+}
+
+# 下注金额精确到 0.001 ETH (和 empirical-analysis.js 的 toFixed(3) 相同), 用整数计票才会出现平局
+BET_UNIT = 0.001
+CHUNK_ROUNDS = 1 << 16
+
+BET_BINS = 20
+PAYOUT_BINS = 20
+# 奖励倍数的直方图范围, 更大的值计入最后一格
+PAYOUT_MAX = 10.0
+
+
+# ============= 模拟 (Simulation) =============
+def simulate_chunk(rng, n, config):
+    """模拟 n 局, 返回每个玩家一格的 (n, 玩家数) 数组和每局一项的数组"""
+    p, k = config['players'], len(config['options'])
+    shape = (n, p)
+
+    # 提交
+    lo, hi = round(config['min_bet'] / BET_UNIT), round(config['max_bet'] / BET_UNIT)
+    bet = rng.integers(lo, hi + 1, shape)
+    rate = rng.uniform(*config['deposit_range'], shape)
+    deposit = bet * rate * BET_UNIT
+    strategic = rng.random(shape) < config['strategic_rate']
+    spread = strategic & (rng.random(shape) >= config['strategic_noise'])
+    choice = np.where(spread, np.arange(p) % k, rng.integers(0, k, shape))
+
+    # 揭示: 押金比例不合法的揭示被拒绝, 和不揭示一样没收押金
+    revealed = rng.random(shape) < config['reveal_rate']
+    low, high = config['deposit_limits']
+    valid = (rate >= low) & (rate <= high)
+    counted = revealed & valid
+
+    # 结算: totals 是每个选项揭示的下注总额 (整数, 并列可以精确判断)
+    totals = np.stack([np.where(counted & (choice == o), bet, 0).sum(axis=1) for o in range(k)], axis=1)
+    masked = np.where(totals > 0, totals, np.iinfo(totals.dtype).max)
+    least = masked.min(axis=1)
+    any_revealed = counted.any(axis=1)
+    tie = any_revealed & ((masked == least[:, None]).sum(axis=1) > 1)
+    winner = np.where(any_revealed & ~tie, masked.argmin(axis=1), -1)
+
+    # 领取: 赢家按下注比例分走揭示了的输家的押金; 平局退还押金
+    won = counted & (choice == winner[:, None])
+    losing = np.where(counted & ~won, deposit, 0).sum(axis=1)
+    winning_total = np.where(winner >= 0, least, 1)
+    payout = np.where(won, deposit + losing[:, None] * bet / winning_total[:, None], 0.0)
+    payout += np.where(counted & tie[:, None], deposit, 0.0)
+
+    return {
+        'bet': bet * BET_UNIT, 'deposit': deposit, 'choice': choice, 'strategic': strategic,
+        'revealed': revealed, 'valid': valid, 'counted': counted, 'won': won, 'payout': payout,
+        'winner': winner, 'tie': tie, 'any_revealed': any_revealed,
+    }
+
+
+def _empty_stats(config):
+    k = len(config['options'])
+    stats = {name: 0 for name in ('rounds', 'players', 'revealed', 'invalid', 'ties', 'no_reveals',
+                                  'winners', 'strategic', 'strategic_wins', 'random_wins')}
+    stats.update({name: 0.0 for name in ('pool', 'paid', 'forfeited', 'multiple_sum')})
+    stats.update({
+        'picks': np.zeros(k, dtype=np.int64), 'stakes': np.zeros(k), 'wins': np.zeros(k, dtype=np.int64),
+        'bet_edges': np.linspace(config['min_bet'], config['max_bet'], BET_BINS + 1),
+        'bet_won': np.zeros(BET_BINS, dtype=np.int64), 'bet_lost': np.zeros(BET_BINS, dtype=np.int64),
+        'payout_edges': np.linspace(0, PAYOUT_MAX, PAYOUT_BINS + 1),
+        'payout': np.zeros(PAYOUT_BINS, dtype=np.int64),
+    })
+    return stats
+
+
+def accumulate(stats, chunk):
+    """把一块模拟结果累加进 stats (原地修改)"""
+    k = len(stats['picks'])
+    won, counted, deposit = chunk['won'], chunk['counted'], chunk['deposit']
+    winner = chunk['winner']
+
+    stats['rounds'] += len(winner)
+    stats['players'] += won.size
+    stats['revealed'] += int(chunk['revealed'].sum())
+    stats['invalid'] += int((chunk['revealed'] & ~chunk['valid']).sum())
+    stats['ties'] += int(chunk['tie'].sum())
+    stats['no_reveals'] += int((~chunk['any_revealed']).sum())
+    stats['winners'] += int(won.sum())
+    stats['strategic'] += int(chunk['strategic'].sum())
+    stats['strategic_wins'] += int((won & chunk['strategic']).sum())
+    stats['random_wins'] += int((won & ~chunk['strategic']).sum())
+
+    stats['pool'] += float(deposit.sum())
+    stats['paid'] += float(chunk['payout'].sum())
+    stats['forfeited'] += float(deposit[~counted].sum())
+
+    choice = chunk['choice'].ravel()
+    stats['picks'] += np.bincount(choice, minlength=k)
+    stats['stakes'] += np.bincount(choice, weights=deposit.ravel(), minlength=k)
+    stats['wins'] += np.bincount(winner[winner >= 0], minlength=k)
+
+    bet = chunk['bet']
+    stats['bet_won'] += np.histogram(bet[won], bins=stats['bet_edges'])[0]
+    stats['bet_lost'] += np.histogram(bet[~won], bins=stats['bet_edges'])[0]
+    multiple = chunk['payout'][won] / deposit[won]
+    stats['multiple_sum'] += float(multiple.sum())
+    stats['payout'] += np.histogram(np.minimum(multiple, PAYOUT_MAX), bins=stats['payout_edges'])[0]
+
+
+def simulate(config=None, seed=None, chunk_rounds=CHUNK_ROUNDS):
+    """按 config (缺省项取 SIM_CONFIG) 模拟, 返回累加后的统计量"""
+    config = dict(SIM_CONFIG, **(config or {}))
+    rng = np.random.default_rng(seed)
+    stats = _empty_stats(config)
+    remaining = config['rounds']
+    while remaining > 0:
+        n = min(chunk_rounds, remaining)
+        accumulate(stats, simulate_chunk(rng, n, config))
+        remaining -= n
+    stats['config'] = config
+    return stats
+
+
+# ============= 输出 (Outputs) =============
+def summary(stats):
+    """转换成 results.summarize 的格式, 可以直接交给 results.build_figure"""
+    return {
+        'rounds': stats['rounds'],
+        'players': stats['players'],
+        'picks': stats['picks'],
+        'stakes': stats['stakes'],
+        'wins': stats['wins'],
+        'bet_edges': stats['bet_edges'],
+        'bet_won': stats['bet_won'],
+        'bet_lost': stats['bet_lost'],
+        'payout_edges': stats['payout_edges'],
+        'payout': stats['payout'],
+        'mean_multiple': stats['multiple_sum'] / stats['winners'] if stats['winners'] else 0.0,
+        'pool': stats['pool'],
+        'paid': stats['paid'],
+        'reveal_rate': stats['revealed'] / stats['players'] if stats['players'] else 0.0,
+    }
+
+
+def _percent(count, total):
+    return f"{count / total:.1%}" if total else "-"
+
+
+# 流程图里的分支 (from, to) -> 计算占比的函数; 比较分支只在两个选项时对应 A / B
+def _flow_branches(stats):
+    rounds, players, revealed = stats['rounds'], stats['players'], stats['revealed']
+    branches = {
+        ('valid_deposit', 'invalid_deposit'): _percent(stats['invalid'], revealed),
+        ('valid_deposit', 'update_game'): _percent(revealed - stats['invalid'], revealed),
+        ('compare', 'tie'): _percent(stats['ties'], rounds),
+        ('calc_reward', 'transfer'): _percent(stats['winners'], players),
+        ('calc_reward', 'no_reward'): _percent(players - stats['winners'], players),
+    }
+    if len(stats['picks']) == 2:
+        branches[('compare', 'a_wins')] = _percent(int(stats['wins'][0]), rounds)
+        branches[('compare', 'b_wins')] = _percent(int(stats['wins'][1]), rounds)
+    return branches
+
+
+def annotate_flow(spec, stats):
+    """在系统流程图描述的分支标签后面加上模拟得到的占比, 返回新的描述"""
+    spec = copy.deepcopy(spec)
+    branches = _flow_branches(stats)
+    for element in spec['elements']:
+        share = branches.get((element.get('from'), element.get('to')))
+        if element['type'] == 'connector' and share is not None:
+            element['label'] = f"{element['label']} ({share})" if element.get('label') else share
+    config = stats['config']
+    spec['elements'].append({
+        'type': 'text', 'at': [8, 18.6], 'ha': 'center', 'fontsize': 9, 'color': 'gray',
+        'text': f"Simulated: {stats['rounds']:,} rounds × {config['players']} players",
+    })
+    return spec
+
+
+def format_stats(stats, elapsed=None):
+    """终端里打印的统计摘要"""
+    config = stats['config']
+    rounds, players = stats['rounds'], stats['players']
+    random_players = players - stats['strategic']
+    wins = ', '.join(f"{name} {_percent(int(count), rounds)}" for name, count in zip(config['options'], stats['wins']))
+    lines = [
+        f"📊 {rounds:,} rounds × {config['players']} players"
+        + (f" in {elapsed:.2f}s ({rounds / elapsed / 1e6:.2f}M rounds/s)" if elapsed else ""),
+        f"   reveal rate {_percent(stats['revealed'], players)}, "
+        f"invalid deposits {_percent(stats['invalid'], stats['revealed'])}",
+        f"   minority wins: {wins}; ties {_percent(stats['ties'], rounds)}, "
+        f"no reveals {_percent(stats['no_reveals'], rounds)}",
+        f"   winners per round {stats['winners'] / rounds:.2f}; win rate strategic "
+        f"{_percent(stats['strategic_wins'], stats['strategic'])}, "
+        f"random {_percent(stats['random_wins'], random_players)}",
+        f"   deposits {stats['pool']:.2f} ETH = paid {stats['paid']:.2f} + forfeited {stats['forfeited']:.2f}",
+    ]
+    return '\n'.join(lines)
+
+
+def to_json(stats):
+    """可以 JSON 序列化的统计量"""
+    return {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in stats.items()}
+
+
+def save_charts(stats, output, dpi=300):
+    import results
+    import UML4
+
+    fig, _ = results.build_figure(stats['config']['options'], summary(stats),
+                                  f"{stats['rounds']:,} simulated rounds")
+    fig.savefig(output, dpi=dpi, bbox_inches='tight', facecolor='white')
+    UML4.plt.close(fig)
+    print(f"✓ Simulated result charts saved as '{output}'")
+
+
+def save_flow(stats, output, dpi=300):
+    import diagram_spec
+    import UML4
+
+    UML4._import_matplotlib()
+    spec = annotate_flow(diagram_spec.load_spec(diagram_spec.spec_path('system_flow')), stats)
+    fig, _ = diagram_spec.build_figure(diagram_spec.compile_spec(spec, 'system_flow (simulated)'))
+    fig.tight_layout()
+    fig.savefig(output, dpi=dpi, bbox_inches='tight', facecolor='white')
+    UML4.plt.close(fig)
+    print(f"✓ Annotated System Flow Diagram saved as '{output}'")
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='simulate', description='Monte Carlo simulation of the minority game')
+    parser.add_argument('--rounds', type=int, default=SIM_CONFIG['rounds'])
+    parser.add_argument('--players', type=int, default=SIM_CONFIG['players'])
+    parser.add_argument('--options', type=int, default=len(SIM_CONFIG['options']),
+                        help='number of options (default: 2, A and B as in the flow diagram)')
+    parser.add_argument('--reveal-rate', type=float, default=SIM_CONFIG['reveal_rate'])
+    parser.add_argument('--deposit', type=float, nargs=2, metavar=('MIN', 'MAX'),
+                        default=SIM_CONFIG['deposit_range'],
+                        help='deposit as a fraction of the bet, also the range the contract accepts '
+                             '(default: 0.3 0.7; 1 1 = VotingGame.sol)')
+    parser.add_argument('--seed', type=int, help='random seed (default: fresh entropy)')
+    parser.add_argument('--charts', metavar='PNG', help='save option / bet / payout charts (see results.py)')
+    parser.add_argument('--flow', metavar='PNG', help='save the system flow diagram annotated with branch shares')
+    parser.add_argument('--json', metavar='PATH', help='write the aggregate statistics as JSON')
+    parser.add_argument('--dpi', type=int, default=300, help='output resolution (default: 300)')
+    args = parser.parse_args(argv)
+
+    options = SIM_CONFIG['options'] if args.options == 2 else [chr(ord('A') + i) for i in range(args.options)]
+    config = {'rounds': args.rounds, 'players': args.players, 'options': options,
+              'reveal_rate': args.reveal_rate, 'deposit_range': tuple(args.deposit),
+              'deposit_limits': tuple(args.deposit)}
+    start = time.perf_counter()
+    with profiling.session() as records:
+        with profiling.phase('simulate', 'simulate'):
+            stats = simulate(config, args.seed)
+        elapsed = time.perf_counter() - start
+        print(format_stats(stats, elapsed))
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(to_json(stats), f, indent=2)
+            print(f"✓ Statistics saved as '{args.json}'")
+        if args.charts:
+            with profiling.phase('simulate', 'charts'):
+                save_charts(stats, args.charts, args.dpi)
+        if args.flow:
+            with profiling.phase('simulate', 'flow'):
+                save_flow(stats, args.flow, args.dpi)
+    if args.charts or args.flow:
+        print(profiling.format_summary(records))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Minority Wins Game - 参数扫描 (Strategy Sweep)
+
+在参数网格上批量运行 simulate.py 的模拟: 玩家数、选项数、策略型玩家比例
+和押金比例 (对应 scripts/empirical-analysis.js 的 ANALYSIS_CONFIG), 每个
+组合是网格的一格。
+
+每一格按 SHARD_ROUNDS 局切成若干分片, 分片分给进程池里的工作进程。结果
+写进一块共享内存里的 NumPy 数组 (分片数 × 指标数), 每个分片只写自己那一行,
+不需要加锁, 结果也不经过 pickle; 主进程最后按固定顺序把分片加起来。
+
+分片的随机数流由 SeedSequence(seed, spawn_key=(格, 分片)) 决定, 和工作进程
+数量、调度顺序无关: 同一个 seed 在 -j 1 和 -j 8 下得到完全相同的结果。
+
+使用方法 (在 UML 目录下):
+    python sweep.py --rounds 1000000 -j 0                 # 默认网格, 每格 100 万局, 每个 CPU 一个进程
+    python sweep.py --players 8 --options 2 3 --strategic 0 0.6 --rounds 100000 --json sweep.json
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import simulate
+
+# 网格的维度和默认取值; deposit 是所有玩家付的押金比例, 合约也只接受这个比例
+GRID = {
+    'players': [4, 8, 16],
+    'options': [2, 3],
+    'strategic': [0.0, 0.3, 0.6, 0.9],
+    'deposit': [0.3, 0.5, 0.7, 1.0],
+}
+SHARD_ROUNDS = 1 << 20
+DEFAULT_SEED = 2024
+
+# 每个分片写回的指标, 都是可以直接相加的计数和金额
+METRICS = ['rounds', 'players', 'revealed', 'invalid', 'ties', 'no_reveals', 'winners',
+           'strategic', 'strategic_wins', 'random_wins', 'pool', 'paid', 'forfeited', 'multiple_sum']
+
+
+# ============= 网格 (Grid) =============
+def cells(grid):
+    """网格的所有组合, 每格是一个 {维度: 取值} 的 dict, 顺序固定"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def cell_config(cell, rounds):
+    """网格的一格对应的 simulate 配置"""
+    options = [chr(ord('A') + i) for i in range(cell['options'])]
+    deposit = (cell['deposit'], cell['deposit'])
+    return dict(simulate.SIM_CONFIG, rounds=rounds, players=cell['players'], options=options,
+                strategic_rate=cell['strategic'], deposit_range=deposit, deposit_limits=deposit)
+
+
+def shards(grid_cells, rounds, shard_rounds=SHARD_ROUNDS):
+    """切分任务: [(分片序号, 格序号, 格内分片序号, 局数)]"""
+    tasks = []
+    for c in range(len(grid_cells)):
+        count = math.ceil(rounds / shard_rounds)
+        for s in range(count):
+            tasks.append((len(tasks), c, s, min(shard_rounds, rounds - s * shard_rounds)))
+    return tasks
+
+
+# ============= 共享内存 (Shared Memory) =============
+# 工作进程里指向共享结果数组的视图 (由 _attach 设置)
+_shm = _results = None
+
+
+def _attach(name, shape):
+    """进程池的 initializer: 把共享内存映射成结果数组
+
+    工作进程和主进程共用同一个 resource_tracker, 共享内存由主进程 unlink。
+    """
+    from multiprocessing import shared_memory
+
+    global _shm, _results
+    _shm = shared_memory.SharedMemory(name=name)
+    _results = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+
+
+def _run_shard(task, grid_cells, seed, results=None):
+    """运行一个分片, 把指标写进结果数组的第 index 行; 返回耗时 (秒)"""
+    index, c, s, rounds = task
+    start = time.perf_counter()
+    rng_seed = np.random.SeedSequence(seed, spawn_key=(c, s))
+    stats = simulate.simulate(cell_config(grid_cells[c], rounds), rng_seed)
+    out = _results if results is None else results
+    out[index] = [stats[name] for name in METRICS]
+    return time.perf_counter() - start
+
+
+def run(grid=None, rounds=1000000, jobs=1, seed=DEFAULT_SEED, shard_rounds=SHARD_ROUNDS):
+    """运行整个网格, 返回 (格列表, (格数, 指标数) 的结果数组, 各分片耗时之和)
+
+    jobs <= 1 时在当前进程里依次运行, 不创建进程池和共享内存。
+    """
+    grid_cells = cells(grid or GRID)
+    tasks = shards(grid_cells, rounds, shard_rounds)
+    shape = (len(tasks), len(METRICS))
+
+    if jobs <= 1:
+        per_shard = np.zeros(shape)
+        busy = sum(_run_shard(task, grid_cells, seed, per_shard) for task in tasks)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        shared = None
+        try:
+            shared = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            shared[:] = 0
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_attach,
+                                     initargs=(shm.name, shape)) as pool:
+                busy = sum(pool.map(partial(_run_shard, grid_cells=grid_cells, seed=seed), tasks))
+            per_shard = shared.copy()
+        finally:
+            # 先释放指向 shm.buf 的数组, 否则出错时 close() 抛出 BufferError, 盖住原来的异常
+            shared = None
+            shm.close()
+            shm.unlink()
+
+    # 按格汇总: 分片按 (格, 分片) 顺序排列, 加法顺序固定
+    owner = np.array([c for _, c, _, _ in tasks])
+    totals = np.zeros((len(grid_cells), len(METRICS)))
+    np.add.at(totals, owner, per_shard)
+    return grid_cells, totals, busy
+
+
+# ============= 输出 (Outputs) =============
+def records(grid_cells, totals):
+    """每格一条记录: 网格取值, totals 下是累加的指标, 另外加上派生的比率"""
+    rows = []
+    for cell, values in zip(grid_cells, totals):
+        t = {name: float(v) for name, v in zip(METRICS, values)}
+        random_players = t['players'] - t['strategic']
+        rows.append(dict(
+            cell, totals=t,
+            strategic_win_rate=t['strategic_wins'] / t['strategic'] if t['strategic'] else None,
+            random_win_rate=t['random_wins'] / random_players if random_players else None,
+            tie_rate=t['ties'] / t['rounds'],
+            winners_per_round=t['winners'] / t['rounds'],
+            mean_multiple=t['multiple_sum'] / t['winners'] if t['winners'] else None,
+        ))
+    return rows
+
+
+def format_table(rows):
+    """终端里打印的表格, 每格一行"""
+    lines = [f"{'players':>7} {'opts':>4} {'strat':>5} {'dep':>4}  {'ties':>6} {'winners':>7} "
+             f"{'strat win':>9} {'rand win':>8} {'payout':>6}"]
+    for r in rows:
+        rate = lambda v: f"{v:.1%}" if v is not None else '-'
+        lines.append(f"{r['players']:>7} {r['options']:>4} {r['strategic']:>5.2f} {r['deposit']:>4.2f}  "
+                     f"{rate(r['tie_rate']):>6} {r['winners_per_round']:>7.2f} "
+                     f"{rate(r['strategic_win_rate']):>9} {rate(r['random_win_rate']):>8} "
+                     f"{r['mean_multiple'] or 0:>5.2f}×")
+    return '\n'.join(lines)
+
+
+# ============= 命令行 =============
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='sweep', description='parameter sweep of the minority game simulation')
+    parser.add_argument('--rounds', type=int, default=1000000, help='rounds per grid cell (default: 1000000)')
+    parser.add_argument('--players', type=int, nargs='+', default=GRID['players'])
+    parser.add_argument('--options', type=int, nargs='+', default=GRID['options'])
+    parser.add_argument('--strategic', type=float, nargs='+', default=GRID['strategic'],
+                        help='share of strategic players')
+    parser.add_argument('--deposit', type=float, nargs='+', default=GRID['deposit'],
+                        help='deposit as a fraction of the bet')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes, 0 = one per CPU (default: 1)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--shard-rounds', type=int, default=SHARD_ROUNDS, help='rounds per task')
+    parser.add_argument('--json', metavar='PATH', help='write one record per grid cell as JSON')
+    args = parser.parse_args(argv)
+    if args.rounds < 1:
+        parser.error('--rounds must be at least 1')
+    if args.shard_rounds < 1:
+        parser.error('--shard-rounds must be at least 1')
+
+    grid = {'players': args.players, 'options': args.options,
+            'strategic': args.strategic, 'deposit': args.deposit}
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    start = time.perf_counter()
+    grid_cells, totals, busy = run(grid, args.rounds, jobs, args.seed, args.shard_rounds)
+    elapsed = time.perf_counter() - start
+
+    rows = records(grid_cells, totals)
+    print(format_table(rows))
+    simulated = int(totals[:, METRICS.index('rounds')].sum())
+    print(f"⏱  {simulated:,} rounds in {len(grid_cells)} cells, {jobs} worker(s): {elapsed:.2f}s "
+          f"({simulated / elapsed / 1e6:.2f}M rounds/s, {busy:.2f}s of shard time)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'seed': args.seed, 'rounds_per_cell': args.rounds, 'grid': grid, 'cells': rows}, f, indent=2)
+        print(f"✓ Sweep results saved as '{args.json}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
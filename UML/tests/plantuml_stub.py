@@ -0,0 +1,39 @@
+"""
+plantuml -pipe 的桩程序 (PlantUML Stub), 测试时通过环境变量 PLANTUML 代替真的 plantuml
+
+按 @startuml ... @enduml 切分标准输入, 每张图输出 "PNG:<图名>" 和分隔行;
+源码里有 "!error" 的图像 plantuml 一样先把错误写到 stderr, 再输出错误图片;
+"!noisy" 的图先往 stderr 写超过管道容量的错误行; "!warn" 的图往 stderr 写一行
+不是错误的信息 (和 JVM 的 _JAVA_OPTIONS 提示一样); "!hang" 的图不输出 (用来测试超时)。
+"""
+import sys
+
+
+def main(argv):
+    fmt = next((arg[2:] for arg in argv if arg.startswith('-t')), 'png')
+    delimiter = argv[argv.index('-pipedelimitor') + 1]
+    out = sys.stdout.buffer
+    block = []
+    for line in sys.stdin:
+        block.append(line)
+        if not line.strip().lower().startswith('@end'):
+            continue
+        name = block[0].split()[1] if len(block[0].split()) > 1 else 'diagram'
+        text = ''.join(block)
+        block = []
+        if '!hang' in text:
+            continue
+        if '!warn' in text:
+            sys.stderr.write("Picked up _JAVA_OPTIONS: -Xmx512m\n")
+            sys.stderr.flush()
+        if '!error' in text:
+            sys.stderr.write(f"ERROR\n2\nSyntax Error? in {name}\n")
+        if '!noisy' in text:
+            sys.stderr.write(f"ERROR\n{'x' * 79}\n" * 4096 + f"Syntax Error? in {name}\n")
+            sys.stderr.flush()
+        out.write(f"{fmt.upper()}:{name}{delimiter}\n".encode('utf-8'))
+        out.flush()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
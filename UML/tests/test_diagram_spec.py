@@ -0,0 +1,38 @@
+"""diagram_spec 渲染计划缓存的测试"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+UML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在复制出来的目录里运行: 改 routing.py 的布线参数, 像 watch 一样只重新加载
+# routing, 再读同一个描述文件
+SCRIPT = '''
+import json, os
+import diagram_spec, routing, watch
+
+path = diagram_spec.spec_path('system_flow')
+before = diagram_spec.load_plan(path)
+source = open(routing.__file__, encoding='utf-8').read()
+with open(routing.__file__, 'w', encoding='utf-8') as f:
+    f.write(source.replace('CLEARANCE = 0.2', 'CLEARANCE = 0.6'))
+reloaded = watch.reload_modules([routing.__file__])
+after = diagram_spec.load_plan(path)
+fresh = diagram_spec.compile_spec(diagram_spec.load_spec(path), 'system_flow')
+print(json.dumps({'reloaded': reloaded, 'clearance': routing.CLEARANCE,
+                  'changed': after.ops != before.ops, 'fresh': after.ops == fresh.ops}))
+'''
+
+
+def test_load_plan_recompiles_after_routing_reload(tmp_path):
+    for name in ('diagram_spec.py', 'routing.py', 'render_cache.py', 'watch.py'):
+        shutil.copy(os.path.join(UML_DIR, name), tmp_path)
+    shutil.copytree(os.path.join(UML_DIR, 'specs'), tmp_path / 'specs')
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    out = subprocess.run([sys.executable, '-c', SCRIPT], cwd=tmp_path, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.splitlines()[-1])
+    assert result['reloaded'] == ['routing'] and result['clearance'] == 0.6
+    assert result['changed'] and result['fresh']
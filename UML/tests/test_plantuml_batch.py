@@ -0,0 +1,93 @@
+"""plantuml_batch 的测试, 用 tests/plantuml_stub.py 代替 plantuml"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import plantuml_batch  # noqa: E402
+
+STUB = [sys.executable, os.path.join(TESTS_DIR, 'plantuml_stub.py')]
+
+
+def write_puml(tmp_path, name, body='A -> B'):
+    path = tmp_path / f"{name}.puml"
+    path.write_text(f"@startuml {name}\n{body}\n@enduml\n", encoding='utf-8')
+    return str(path)
+
+
+def test_renders_all_files_with_one_process(tmp_path):
+    paths = [write_puml(tmp_path, f"d{i}") for i in range(5)]
+    results = plantuml_batch.render_files(paths, jobs=1, command=STUB)
+    for path, (result_path, outputs, _, error) in zip(paths, results):
+        assert result_path == path and error is None
+        assert outputs == [path[:-len('.puml')] + '.png']
+        with open(outputs[0], 'rb') as f:
+            assert f.read() == f"PNG:{os.path.basename(path)[:-5]}".encode('ascii')
+
+
+def test_error_is_reported_for_the_file_that_caused_it(tmp_path):
+    # 错误图片后面紧跟正常文件: 错误不能被当成成功, 也不能算到下一个文件头上
+    for _ in range(20):
+        paths = [write_puml(tmp_path, 'ok1'), write_puml(tmp_path, 'bad', '!error'),
+                 write_puml(tmp_path, 'ok2'), write_puml(tmp_path, 'bad2', '!error')]
+        results = plantuml_batch.render_files(paths, jobs=1, command=STUB)
+        errors = [error for _, _, _, error in results]
+        assert errors[0] is None and errors[2] is None
+        assert errors[1].startswith('ValueError') and 'bad' in errors[1]
+        assert errors[3].startswith('ValueError') and 'bad2' in errors[3]
+        assert results[1][1] == [] and results[3][1] == []
+
+
+def test_large_error_output_does_not_block(tmp_path):
+    # stderr 超过管道容量时 plantuml 会卡在写 stderr 上, 等图片期间必须边等边读
+    paths = [write_puml(tmp_path, 'noisy', '!noisy'), write_puml(tmp_path, 'ok')]
+    results = plantuml_batch.render_files(paths, jobs=1, timeout=10, command=STUB)
+    assert results[0][3].startswith('ValueError') and 'noisy' in results[0][3]
+    assert results[1][3] is None
+
+
+def test_harmless_stderr_is_a_warning(tmp_path):
+    # JVM 之类往 stderr 写的提示不是语法错误: 图片照常保存, 提示转成警告
+    paths = [write_puml(tmp_path, 'noted', '!warn'), write_puml(tmp_path, 'ok')]
+    with pytest.warns(UserWarning, match='_JAVA_OPTIONS'):
+        results = plantuml_batch.render_files(paths, jobs=1, command=STUB)
+    assert [error for _, _, _, error in results] == [None, None]
+    assert os.path.exists(results[0][1][0])
+
+
+def test_warning_before_error_is_not_part_of_the_error(tmp_path):
+    path = write_puml(tmp_path, 'bad', '!warn\n!error')
+    with pytest.warns(UserWarning, match='_JAVA_OPTIONS'):
+        (_, outputs, _, error), = plantuml_batch.render_files([path], jobs=1, command=STUB)
+    assert error.startswith('ValueError: ERROR') and 'Syntax Error? in bad' in error
+    assert '_JAVA_OPTIONS' not in error and outputs == []
+
+
+def test_multiple_diagrams_in_one_file(tmp_path):
+    path = tmp_path / 'multi.puml'
+    path.write_text("@startuml a\nA\n@enduml\n@startuml b\nB\n@enduml\n", encoding='utf-8')
+    (_, outputs, _, error), = plantuml_batch.render_files([str(path)], command=STUB)
+    assert error is None
+    assert [os.path.basename(p) for p in outputs] == ['multi.png', 'multi_001.png']
+
+
+def test_timeout_restarts_process(tmp_path):
+    paths = [write_puml(tmp_path, 'slow', '!hang'), write_puml(tmp_path, 'after')]
+    results = plantuml_batch.render_files(paths, jobs=1, timeout=1, command=STUB)
+    assert results[0][3].startswith('TimeoutError')
+    assert results[1][3] is None
+
+
+def test_svg_format_and_env_command(tmp_path, monkeypatch):
+    monkeypatch.setenv('PLANTUML', ' '.join(STUB))
+    assert plantuml_batch.plantuml_command() == STUB
+    (_, outputs, _, error), = plantuml_batch.render_files([write_puml(tmp_path, 'v')], fmt='svg')
+    assert error is None and outputs[0].endswith('v.svg')
+
+
+def test_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        plantuml_batch.render_files([], fmt='gif', command=STUB)
@@ -0,0 +1,53 @@
+"""puml 布局的测试: 关系连线不能穿过两端以外的用例"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+UML_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, UML_DIR)
+
+import puml  # noqa: E402
+import scene  # noqa: E402
+
+REPO_DIR = os.path.dirname(UML_DIR)
+PUML_FILES = [os.path.join(UML_DIR, 'use_case_diagram.puml'),
+              os.path.join(REPO_DIR, 'use_case_diagram.puml'),
+              os.path.join(REPO_DIR, 'enhanced_use_case_diagram.puml')]
+
+
+def association_crossings(spec, samples=400):
+    """[(from, to, 被穿过的用例)]: 每段连线取样, 落在其他用例椭圆里的点"""
+    width, height = spec['styles']['use_case']['width'], spec['styles']['use_case']['height']
+    nodes = {e['id']: e for e in spec['elements'] if e['type'] in ('actor', 'use_case')}
+    use_cases = [e for e in spec['elements'] if e['type'] == 'use_case']
+    crossings = []
+    for link in (e for e in spec['elements'] if e['type'] == 'association'):
+        (x1, y1), (x2, y2) = nodes[link['from']]['at'], nodes[link['to']]['at']
+        points = ([[x1 + link['from_offset'][0], y1 + link['from_offset'][1]]] + link.get('via', [])
+                  + [[x2 + link['to_offset'][0], y2 + link['to_offset'][1]]])
+        for (ax, ay), (bx, by) in zip(points, points[1:]):
+            for use_case in use_cases:
+                if use_case['id'] in (link['from'], link['to']):
+                    continue
+                cx, cy = use_case['at']
+                for i in range(samples + 1):
+                    t = i / samples
+                    dx, dy = (ax + (bx - ax) * t - cx) / (width / 2), (ay + (by - ay) * t - cy) / (height / 2)
+                    if dx * dx + dy * dy < 1:
+                        crossings.append((link['from'], link['to'], use_case['label']))
+                        break
+    return sorted(set(crossings))
+
+
+@pytest.mark.parametrize('path', PUML_FILES, ids=os.path.basename)
+def test_associations_do_not_cross_use_cases(path):
+    with open(path, encoding='utf-8') as f:
+        diagrams = puml.parse(f.read(), path)
+    for diagram in diagrams:
+        assert association_crossings(puml.to_spec(diagram)) == []
+
+
+def test_scene_associations_do_not_cross_use_cases():
+    assert association_crossings(puml.to_spec(scene.USE_CASE_SCENE)) == []
@@ -0,0 +1,50 @@
+"""tiled 分块保存的测试: 和 savefig(bbox_inches='tight') 对比, 图上带图例"""
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import UML4  # noqa: E402
+import batching  # noqa: E402
+import diagram_spec  # noqa: E402
+import tiled  # noqa: E402
+
+
+def use_case_figure():
+    """和 UML4.draw_use_case_diagram 一样布局、合并图元, 还没保存的用例图"""
+    UML4._import_matplotlib()
+    fig, ax = diagram_spec.build_figure(diagram_spec.load_plan(diagram_spec.spec_path('use_case')))
+    fig.tight_layout()
+    batching.batch_artists(ax)
+    return fig, ax
+
+
+def pixels(path_or_buffer):
+    return np.asarray(Image.open(path_or_buffer).convert('RGBA')).astype(int)
+
+
+# 150 dpi、100 行一条是实测最差的组合: 图例边框正好落在取整临界点上
+@pytest.mark.parametrize('dpi, band_rows', [(150, 100), (100, 64), (150, 37)])
+def test_tiled_matches_tight_savefig(tmp_path, dpi, band_rows):
+    import matplotlib.pyplot as plt
+    fig, ax = use_case_figure()
+    assert ax.get_legend() is not None
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', facecolor='white')
+    output = str(tmp_path / 'tiled.png')
+    tiled.save_tiled(fig, output, dpi, band_rows, facecolor='white')
+    plt.close(fig)
+
+    full, tile = pixels(buf), pixels(output)
+    assert tile.shape == full.shape
+    # 不同的像素不到 0.1%
+    assert (np.abs(full - tile).max(axis=2) > 0).mean() < 0.001
+    # 错开的只有一行: 和原图同一行或上下相邻一行比, 总有一个相差不超过 8/255
+    shifted = np.min([np.abs(full - np.roll(tile, dy, axis=0)).max(axis=2) for dy in (-1, 0, 1)], axis=0)
+    assert shifted.max() <= 8
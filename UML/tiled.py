@@ -0,0 +1,248 @@
+"""
+Minority Wins Game - 分块光栅化 (Tiled Rasterization)
+
+300 dpi 下原型图 (20x24 英寸) 和系统流程图 (16x20 英寸) 的画布有几千万
+像素, savefig 会一次性分配整张 RGBA 画布, 再交给 PIL 编码。这里把图片
+按水平条带 (band) 逐条光栅化, 每条画完立即写进流式 PNG 编码器, 内存中
+只保留一条条带:
+
+    save_tiled(fig, 'system_flow_diagram.png', dpi=300, band_rows=1024)
+
+    with PNGWriter('sheet.png', width, height, dpi=300) as png:
+        for rows in bands:              # (n, width, 4) uint8
+            png.write_rows(rows)
+
+输出尺寸和 bbox_inches='tight' 完全相同, 像素不保证逐一相同。每条条带上下
+多画 BAND_MARGIN 行再裁掉, 避免 Agg 在条带边缘裁剪斜线带来的锯齿差异;
+剩下的是条带平移时的浮点舍入 (约 1e-13 像素):
+  - 大多数边缘像素的抗锯齿最多相差 1/255;
+  - 恰好落在取整临界点上的吸附边缘 (图例边框、水平/竖直线) 和文字会整体
+    错开一行, 这些像素和原图同一位置可能相差很大 (use_case 图 150 dpi、
+    100 行一条时图例边框相差 40/255), 和上下相邻一行比不超过 8/255。
+实测不同的像素不到 0.05%, 见 tests/test_tiled.py。
+"""
+import io
+import os
+import struct
+import zlib
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.transforms import Bbox
+
+# 默认条带高度 (像素行)
+BAND_ROWS = 1024
+# 每条条带上下额外光栅化的行数
+BAND_MARGIN = 32
+# 压缩级别和 PIL / savefig 的默认值相同
+COMPRESS_LEVEL = 6
+# 攒够这么多压缩数据再写一个 IDAT 块
+IDAT_SIZE = 1 << 16
+
+
+# ============= 流式 PNG 编码 (PNG Writer) =============
+def _chunk(tag, data):
+    """一个 PNG 块: 长度 + 类型 + 数据 + CRC"""
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+class PNGWriter:
+    """逐块写出 8 位 RGBA PNG, 每行使用 Up 过滤器, 只保留上一行像素
+
+    先写到同目录下的临时文件, close() 成功后才替换 path; 中途出错时删除
+    临时文件, 不会留下截断的 PNG (增量构建会把它当成最新的输出)。
+    """
+
+    def __init__(self, path, width, height, dpi=None, compress_level=COMPRESS_LEVEL):
+        self.path = path
+        self.width, self.height = width, height
+        self.rows_written = 0
+        self._prev = np.zeros((width, 4), dtype=np.uint8)
+        self._zlib = zlib.compressobj(compress_level)
+        self._pending = []
+        # 临时文件名带进程号, 并行写同一个输出时互不干扰; 权限和直接 open 一样遵循 umask
+        self._tmp = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp, 'wb')
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+        if dpi:
+            # 和 PIL 一样按每米像素数记录分辨率
+            ppm = int(dpi / 0.0254 + 0.5)
+            self._chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+
+    def _chunk(self, tag, data):
+        self._file.write(_chunk(tag, data))
+
+    def _flush(self, force=False):
+        if self._pending and (force or sum(map(len, self._pending)) >= IDAT_SIZE):
+            self._chunk(b'IDAT', b''.join(self._pending))
+            self._pending = []
+
+    def write_rows(self, rows):
+        """写入 (n, width, 4) 的 uint8 像素"""
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        if rows.ndim != 3 or rows.shape[1:] != (self.width, 4):
+            raise ValueError(f"expected rows of shape (n, {self.width}, 4), got {rows.shape}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError(f"too many rows: image height is {self.height}")
+        if not len(rows):
+            return
+        # Up 过滤: 每行减去上一行 (uint8 按 256 取模)
+        filtered = np.empty((len(rows), 1 + self.width * 4), dtype=np.uint8)
+        filtered[:, 0] = 2
+        up = filtered[:, 1:].reshape(rows.shape)
+        np.subtract(rows[1:], rows[:-1], out=up[1:])
+        np.subtract(rows[0], self._prev, out=up[0])
+        self._pending.append(self._zlib.compress(filtered.tobytes()))
+        self._flush()
+        self._prev = rows[-1].copy()
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"PNG incomplete: {self.rows_written}/{self.height} rows written")
+            self._pending.append(self._zlib.flush())
+            self._flush(force=True)
+            self._chunk(b'IEND', b'')
+            self._file.close()
+            os.replace(self._tmp, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        """放弃写入: 关闭并删除临时文件, 原来的 path 保持不变"""
+        self._file.close()
+        try:
+            os.remove(self._tmp)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ============= 局部更新的 PNG 编码 (Patched PNG) =============
+# 每段的行数; 段越小, 改动几行文字时需要重新压缩的数据越少
+PATCH_BAND_ROWS = 16
+# 一个空的结束块, 接在各段的压缩数据后面
+_FINAL_BLOCK = zlib.compressobj(wbits=-15).flush()
+_ADLER_BASE = 65521
+
+
+def _adler32_combine(adler1, adler2, len2):
+    """两段数据各自的 Adler-32 合并成拼接后的 Adler-32 (zlib 的 adler32_combine)"""
+    rem = len2 % _ADLER_BASE
+    sum1 = adler1 & 0xffff
+    sum2 = (rem * sum1 + (adler1 >> 16) + (adler2 >> 16) + _ADLER_BASE - rem) % _ADLER_BASE
+    sum1 = (sum1 + (adler2 & 0xffff) + _ADLER_BASE - 1) % _ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+
+class PatchedPNG:
+    """背景固定、每张图只改动少数几行的 RGBA PNG 编码
+
+    背景按 band_rows 行一段预先过滤、压缩。每段第一行不过滤, 其余行用 Up
+    过滤, 段与段之间互不依赖; 每段用单独的 deflate 压缩器, 以 Z_FULL_FLUSH
+    结尾, 压缩数据可以直接拼接。保存时只有 dirty 标出的段重新压缩。
+    """
+
+    def __init__(self, background, dpi=None, band_rows=PATCH_BAND_ROWS, compress_level=1):
+        self.height, self.width = background.shape[:2]
+        self.band_rows = band_rows
+        self.compress_level = compress_level
+        self.header = b'\x89PNG\r\n\x1a\n' + _chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height,
+                                                                         8, 6, 0, 0, 0))
+        if dpi:
+            ppm = int(dpi / 0.0254 + 0.5)
+            self.header += _chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+        self.bands = [self._encode(background[top:top + band_rows])
+                      for top in range(0, self.height, band_rows)]
+
+    def _encode(self, rows):
+        """过滤并压缩一段, 返回 (压缩数据, Adler-32, 过滤后的长度)"""
+        filtered = np.empty((len(rows), 1 + self.width * 4), dtype=np.uint8)
+        filtered[:, 0] = 2
+        filtered[0, 0] = 0
+        up = filtered[:, 1:].reshape(rows.shape)
+        up[0] = rows[0]
+        np.subtract(rows[1:], rows[:-1], out=up[1:])
+        data = filtered.tobytes()
+        z = zlib.compressobj(self.compress_level, zlib.DEFLATED, -15)
+        return z.compress(data) + z.flush(zlib.Z_FULL_FLUSH), zlib.adler32(data), len(data)
+
+    def encode(self, pixels, dirty):
+        """编码整张图; dirty 是和背景不同的像素行范围 [(top, bottom), ...]"""
+        bands = list(self.bands)
+        for band in {b for top, bottom in dirty for b in range(top // self.band_rows,
+                                                                (bottom - 1) // self.band_rows + 1)}:
+            top = band * self.band_rows
+            bands[band] = self._encode(pixels[top:top + self.band_rows])
+        adler = 1
+        for _, checksum, length in bands:
+            adler = _adler32_combine(adler, checksum, length)
+        stream = b'\x78\x01' + b''.join(band[0] for band in bands) + _FINAL_BLOCK + struct.pack('>I', adler)
+        return self.header + _chunk(b'IDAT', stream) + _chunk(b'IEND', b'')
+
+    def save(self, path, pixels, dirty):
+        with open(path, 'wb') as f:
+            f.write(self.encode(pixels, dirty))
+
+
+# ============= 分块保存 figure (Tiled savefig) =============
+def tight_bbox(fig, dpi):
+    """和 savefig(bbox_inches='tight') 相同的裁剪框 (英寸)"""
+    original = fig.dpi
+    fig.set_dpi(dpi)
+    try:
+        renderer = RendererAgg(1, 1, dpi)
+        fig.draw(renderer)
+        bbox = fig.get_tightbbox(renderer)
+    finally:
+        fig.set_dpi(original)
+    return bbox.padded(matplotlib.rcParams['savefig.pad_inches'])
+
+
+def pixel_size(bbox, dpi):
+    """bbox 光栅化后的 (宽, 高) 像素, 和 savefig 计算画布尺寸的方式相同"""
+    return int(bbox.width * dpi + 1e-8), int(bbox.height * dpi + 1e-8)
+
+
+def iter_bands(fig, bbox, dpi, band_rows=BAND_ROWS, facecolor='white', margin=BAND_MARGIN):
+    """从上到下依次产出 bbox 范围内每条条带的像素, (n, width, 4) uint8"""
+    width, height = pixel_size(bbox, dpi)
+    # tight_layout() 之后 figure 上留着一个占位的布局引擎, savefig 看到布局
+    # 引擎会先按整张图的尺寸分配画布预绘制一遍, 分块就失去了意义。布局已经
+    # 确定, 保存期间先摘掉, 结束后恢复
+    engine, fig._layout_engine = fig._layout_engine, None
+    try:
+        for top in range(0, height, band_rows):
+            bottom = min(top + band_rows, height)
+            # 连同上下边距一起光栅化的行号 [lo, hi), 换算成从底部量起的英寸
+            lo, hi = max(top - margin, 0), min(bottom + margin, height)
+            band = Bbox.from_bounds(bbox.x0, bbox.y0 + (height - hi) / dpi, bbox.width, (hi - lo) / dpi)
+            buf = io.BytesIO()
+            fig.savefig(buf, format='raw', dpi=dpi, bbox_inches=band, facecolor=facecolor)
+            rows = np.frombuffer(buf.getbuffer(), dtype=np.uint8).reshape(hi - lo, width, 4)
+            yield rows[top - lo:bottom - lo]
+    finally:
+        fig._layout_engine = engine
+
+
+def save_tiled(fig, output, dpi, band_rows=BAND_ROWS, facecolor='white'):
+    """按条带光栅化 fig 并流式写成 PNG, 等价于 savefig(bbox_inches='tight')"""
+    bbox = tight_bbox(fig, dpi)
+    width, height = pixel_size(bbox, dpi)
+    with PNGWriter(output, width, height, dpi) as png:
+        for rows in iter_bands(fig, bbox, dpi, band_rows, facecolor):
+            png.write_rows(rows)
@@ -0,0 +1,112 @@
+"""
+Minority Wins Game - 监视模式 (Watch Mode)
+
+常驻一个已经导入 matplotlib、加载好字体的进程, 轮询 UML 目录下的 *.py
+和 specs/ 下的描述文件。保存文件后重新加载改动过的模块, 再做一次增量
+构建 (见 build.py), 只重新渲染受影响的图表:
+
+    python -m diagrams build --watch system_flow --dpi 150
+
+修改 draw_system_flow 或 specs/system_flow.json 只会重建系统流程图, 不用
+再付出解释器启动、导入 matplotlib、加载字体和渲染其他图表的时间。
+Ctrl+C 退出。
+"""
+import importlib
+import os
+import sys
+import time
+
+import diagram_spec
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# 轮询间隔 (秒)
+POLL_INTERVAL = 0.2
+# 发现改动后再等一会儿, 编辑器保存时可能分几次写入
+SETTLE_DELAY = 0.05
+# 模块之间都通过模块属性互相引用, 原地 reload 改动过的模块即可;
+# 按这个顺序重新加载, 被依赖的在前
+RELOAD_ORDER = ['profiling', 'render_cache', 'batching', 'tiled', 'routing', 'diagram_spec', 'icons',
+                'plantuml_batch', 'layout', 'puml', 'scene', 'fonts', 'UML', 'UML4', 'results',
+                'diagrams', 'build']
+
+
+def watched_files():
+    """UML 目录下的 Python 模块和 specs/ 下的图表描述文件"""
+    paths = [os.path.join(HERE, n) for n in os.listdir(HERE) if n.endswith('.py')]
+    paths += [os.path.join(diagram_spec.SPEC_DIR, n) for n in os.listdir(diagram_spec.SPEC_DIR)
+              if n.endswith(('.json', '.yaml', '.yml'))]
+    return sorted(paths)
+
+
+def snapshot():
+    """{path: mtime_ns}; 轮询时比较两次快照"""
+    state = {}
+    for path in watched_files():
+        try:
+            state[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue  # 刚好被编辑器替换
+    return state
+
+
+def changed_files(old, new):
+    return sorted(path for path in set(old) | set(new) if old.get(path) != new.get(path))
+
+
+def reload_modules(paths):
+    """重新加载改动过且已经导入的模块, 返回重新加载的模块名"""
+    changed = {os.path.splitext(os.path.basename(p))[0] for p in paths if p.endswith('.py')}
+    if 'watch' in changed:
+        print("💡 watch.py changed, restart the watcher to pick it up")
+    order = RELOAD_ORDER + sorted(changed - set(RELOAD_ORDER) - {'watch'})
+    reloaded = []
+    for name in order:
+        if name in changed and name in sys.modules:
+            importlib.reload(sys.modules[name])
+            reloaded.append(name)
+    return reloaded
+
+
+def watch(names, dpi=300, use_cache=True, interval=POLL_INTERVAL, report=None):
+    """先做一次增量构建, 然后监视文件, 每次保存后只重建受影响的图表
+
+    report(results, start) 用来打印每次重建的结果 (diagrams._report)。
+    """
+    import build
+    import UML4
+
+    start = time.perf_counter()
+    UML4.warm_up()
+    print(f"🔥 Warm process ready ({time.perf_counter() - start:.2f}s)")
+    start = time.perf_counter()
+    results = build.build(names, dpi, 1, use_cache)
+    if results and report:
+        report(results, start)
+    files = snapshot()
+    print(f"👀 Watching {len(files)} files for changes (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot()
+            if current == files:
+                continue
+            time.sleep(SETTLE_DELAY)
+            current = snapshot()
+            changed = changed_files(files, current)
+            files = current
+            start = time.perf_counter()
+            print(f"\n📝 Changed: {', '.join(os.path.relpath(p, HERE) for p in changed)}")
+            try:
+                reload_modules(changed)
+                results = build.build(names, dpi, 1, use_cache, show_skipped=False)
+            except Exception as e:
+                # 保存了一半的文件 (例如语法错误), 等下一次保存
+                print(f"❌ {type(e).__name__}: {e}")
+                continue
+            if not results:
+                print("⚡ No diagram depends on the changed files")
+            elif report:
+                report(results, start)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    return 0
@@ -209,6 +209,10 @@ async function main() {
         revealRate: (reveals.length / commits.length * 100).toFixed(2) + "%"
     };
 
+    // Record who revealed, so result screens can tell revealed losers from forfeited deposits
+    const revealedIndexes = new Set(reveals.map(r => r.playerIndex));
+    testResults.players.forEach(p => { p.revealed = revealedIndexes.has(p.index - 1); });
+
     console.log(`✅ ${reveals.length}/${commits.length} players revealed`);
     console.log(`   Reveal rate: ${testResults.phases.reveal.revealRate}`);
     console.log(`   Duration: ${revealDuration}ms`);